@@ -12,7 +12,7 @@ export default function NewJobPage() {
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
-    api('/resumes').then((r: any) => setResumes(r.items ?? r)).catch(() => setResumes([]));
+    api('/resumes?fields=file_name,created_at').then((r: any) => setResumes(r.items ?? r)).catch(() => setResumes([]));
   }, []);
 
   async function onCreate() {
@@ -38,6 +38,7 @@ export default function NewJobPage() {
             <input className="border rounded px-3 py-2" placeholder="Job URL" value={url} onChange={e => setUrl(e.target.value)} />
             <select className="border rounded px-3 py-2" value={resumeId} onChange={e => setResumeId(e.target.value)}>
               <option value="">Select resume…</option>
+              <option value="auto">Best match for this posting</option>
               {resumes.map((r: any) => (
                 <option key={r.id} value={r.id}>{r.file_name}</option>
               ))}
@@ -4,7 +4,7 @@ import { Badge, Button, Card, CardBody, CardHeader } from '../components/ui';
 type Job = {
   id: string;
   target_url: string;
-  status: 'queued'|'running'|'succeeded'|'failed';
+  status: 'queued'|'running'|'succeeded'|'failed'|'cancelled';
   live_view_url?: string | null;
   created_at: string;
 };
@@ -1,13 +1,20 @@
 const BASE = process.env.NEXT_PUBLIC_API_BASE_URL || 'http://127.0.0.1:8000';
+// Scopes all requests to one user. Without it the backend uses its default user (the local
+// single-user setup); deployments put an authenticating proxy in front that sets it and run the
+// backend with REQUIRE_USER_HEADER=true.
+const USER_ID = process.env.NEXT_PUBLIC_USER_ID;
+const USER_HEADERS: Record<string, string> = USER_ID ? { 'X-User-Id': USER_ID } : {};
 
 export async function api<T>(path: string, init?: RequestInit): Promise<T> {
   const res = await fetch(`${BASE}${path}`, {
     ...init,
     headers: {
       'Content-Type': 'application/json',
+      ...USER_HEADERS,
       ...(init && init.headers ? init.headers : {}),
     },
-    cache: 'no-store',
+    // Revalidate every time: detail endpoints answer If-None-Match with 304
+    cache: 'no-cache',
   });
   if (!res.ok) {
     const txt = await res.text().catch(() => '');
@@ -19,7 +26,7 @@ export async function api<T>(path: string, init?: RequestInit): Promise<T> {
 export async function uploadFile(path: string, file: File): Promise<any> {
   const form = new FormData();
   form.append('file', file);
-  const res = await fetch(`${BASE}${path}`, { method: 'POST', body: form, cache: 'no-store' });
+  const res = await fetch(`${BASE}${path}`, { method: 'POST', body: form, headers: USER_HEADERS, cache: 'no-store' });
   if (!res.ok) throw new Error(`Upload failed: ${res.status}`);
   return res.json();
 }
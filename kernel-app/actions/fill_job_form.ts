@@ -4,30 +4,34 @@ import { chromium } from 'playwright';
 import os from 'os';
 import path from 'path';
 import fs from 'fs/promises';
+import { createHash } from 'crypto';
 import type { Page, Frame } from 'playwright';
 
-type Profile = {
-  name?: string;
-  email?: string;
-  phone?: string;
-  links?: string[];
-  education?: Array<{ school?: string; degree?: string; start?: string | null; end?: string | null }>;
-  experience?: Array<{ company?: string; title?: string; start?: string | null; end?: string | null; location?: string; bullets?: string[] }>;
-  skills?: string[];
-  address?: string;
-  work_auth?: string | null;
+// Precomputed by the backend (app/services/answer_index.py) per parsed profile + preferences snapshot
+type AnswerIndex = {
+  version: number;
+  answers: Record<string, string>;
+  // normalized phrase -> answer key
+  synonyms: Record<string, string>;
+  // answer keys chosen by clicking the option label (radios/checkboxes)
+  choices: string[];
 };
 
-type Preferences = Record<string, unknown>;
+// A form field the backend has already resolved to an answer key on this domain
+type FieldMapping = { selector: string; key: string };
+type FormMapping = { fingerprint: string; fields: FieldMapping[] };
 
 type Input = {
   url: string;
-  profile: Profile;
-  prefs?: Preferences;
+  answers: AnswerIndex;
+  // Mappings reported by earlier successful runs for this domain/strategy, newest first
+  knownMappings?: FormMapping[];
   r2Assets?: { resumeUrl: string; coverLetterUrl?: string };
   persistenceId?: string;
   steps?: string[];
   takeProofScreenshots?: boolean;
+  // Where to POST the output on finish (the invocation id is appended), so the backend doesn't poll
+  callback?: { url: string; token: string };
 };
 
 type Output = {
@@ -36,75 +40,118 @@ type Output = {
   liveViewUrl?: string;
   screenshots?: string[]; // URLs or notes (for now we return notes)
   notes?: string[];
+  // Field mapping learned (or confirmed) by this run, persisted by the backend
+  mapping?: FormMapping;
 };
 
-function splitName(full?: string | null): { first: string; last: string } {
-  const f = (full || '').trim();
-  if (!f) return { first: '', last: '' };
-  const parts = f.split(/\s+/);
-  if (parts.length === 1) return { first: parts[0], last: '' };
-  return { first: parts[0], last: parts.slice(1).join(' ') };
+// Longest phrase in the synonym table, in words; bounds the n-gram scan
+const MAX_PHRASE_WORDS = 4;
+
+function normalizePhrase(text: string): string {
+  return text.toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim();
 }
 
-function deriveAddressParts(address?: string | null): { city?: string; state?: string; postal?: string; country?: string } {
-  const out: { city?: string; state?: string; postal?: string; country?: string } = {};
-  if (!address) return out;
-  const parts = address.split(',').map(s => s.trim());
-  if (parts.length >= 1) out.city = parts[0];
-  if (parts.length >= 2) out.state = parts[1];
-  if (parts.length >= 3) out.postal = parts[2].match(/[A-Za-z0-9\-\s]+/)?.[0]?.trim();
-  return out;
+function answer(index: AnswerIndex, key: string): string | undefined {
+  return index.answers?.[key] || undefined;
 }
 
-async function smartAutofill(target: Page | Frame, input: Input, notes: string[]): Promise<void> {
-  try {
-    const { first, last } = splitName(input.profile.name);
-    const links = Array.isArray(input.profile.links) ? (input.profile.links as string[]) : [];
-    const linkedin = links.find(u => /linkedin\.com/i.test(u));
-    const github = links.find(u => /github\.com/i.test(u));
-    const website = links.find(u => !/linkedin|github/i.test(u));
-    const addrParts = deriveAddressParts(input.profile.address);
-    const edu = Array.isArray(input.profile.education) && input.profile.education.length > 0 ? input.profile.education[0] : undefined;
-    const exp = Array.isArray(input.profile.experience) && input.profile.experience.length > 0 ? input.profile.experience[0] : undefined;
-
-    const valueByKeyword: Record<string, string | undefined> = {
-      'first name': first,
-      'firstname': first,
-      'given': first,
-      'last name': last,
-      'lastname': last,
-      'surname': last,
-      'family name': last,
-      'full name': input.profile.name || undefined,
-      'name': input.profile.name || undefined,
-      'email': input.profile.email || undefined,
-      'phone': input.profile.phone || undefined,
-      'mobile': input.profile.phone || undefined,
-      'telephone': input.profile.phone || undefined,
-      'linkedin': linkedin,
-      'github': github,
-      'portfolio': website,
-      'website': website,
-      'url': website,
-      'address': input.profile.address || undefined,
-      'street': input.profile.address || undefined,
-      'city': addrParts.city,
-      'town': addrParts.city,
-      'state': addrParts.state,
-      'province': addrParts.state,
-      'zip': addrParts.postal,
-      'postal': addrParts.postal,
-      'country': (input.prefs as any)?.country || undefined,
-      'school': edu?.school,
-      'university': edu?.school,
-      'college': edu?.school,
-      'degree': edu?.degree,
-      'company': exp?.company,
-      'employer': exp?.company,
-      'title': exp?.title,
-      'position': exp?.title,
-    };
+// Resolve a field to an answer key: each attribute text whole, then its word n-grams longest first.
+// Every step is a hash lookup, so cost depends on the field's text length, not the number of answers.
+function lookupAnswerKey(index: AnswerIndex, texts: string[]): string | undefined {
+  const synonyms = index.synonyms || {};
+  const normalized = texts.map(normalizePhrase).filter(Boolean);
+  for (const t of normalized) {
+    const key = synonyms[t];
+    if (key && index.answers[key]) return key;
+  }
+  for (const t of normalized) {
+    const words = t.split(' ');
+    for (let n = Math.min(MAX_PHRASE_WORDS, words.length); n >= 1; n--) {
+      for (let i = 0; i + n <= words.length; i++) {
+        const key = synonyms[words.slice(i, i + n).join(' ')];
+        if (key && index.answers[key]) return key;
+      }
+    }
+  }
+  return undefined;
+}
+
+// Stable selector for a field, or undefined when it has neither id nor name
+function fieldSelector(tag: string, idAttr: string, nameAttr: string): string | undefined {
+  if (idAttr) return `[id="${idAttr.replace(/"/g, '\\"')}"]`;
+  if (nameAttr) return `${tag}[name="${nameAttr.replace(/"/g, '\\"')}"]`;
+  return undefined;
+}
+
+// Identifies a form layout by the tag/type/name/id of its fields, gathered in one round trip
+async function formFingerprint(target: Page | Frame): Promise<string> {
+  const signature = await (target as any).$$eval('input, textarea, select', (els: any[]) =>
+    els
+      .filter(e => !['submit', 'button', 'hidden'].includes((e.getAttribute('type') || '').toLowerCase()))
+      .map(e => `${e.tagName.toLowerCase()}:${e.getAttribute('type') || ''}:${e.getAttribute('name') || ''}:${e.getAttribute('id') || ''}`)
+      .join('\n'),
+  );
+  return createHash('sha256').update(signature).digest('hex').slice(0, 32);
+}
+
+async function fillField(target: Page | Frame, el: any, tag: string, value: string, choice: boolean): Promise<void> {
+  if (choice) {
+    // Option inputs: pick the option whose label carries the answer
+    const lbl = await (target as any).$(`label:has-text("${value}")`);
+    await lbl?.click().catch(() => {});
+  } else if (tag === 'select') {
+    await el.selectOption({ label: value }).catch(async () => {
+      await el.selectOption(value).catch(() => {});
+    });
+  } else {
+    await el.fill(value).catch(() => {});
+  }
+}
+
+// Fill a known form by direct selectors. Returns false if any mapped field is gone.
+async function applyMapping(target: Page | Frame, input: Input, mapping: FormMapping, notes: string[]): Promise<boolean> {
+  const index = input.answers;
+  const choices = new Set(index.choices || []);
+  let complete = true;
+  for (const { selector, key } of mapping.fields) {
+    const v = answer(index, key);
+    if (!v) continue;
+    try {
+      const el = await (target as any).$(selector);
+      if (!el) { complete = false; continue; }
+      const tag = (await el.evaluate((e: any) => e.tagName.toLowerCase())) as string;
+      await fillField(target, el, tag, v, tag === 'input' && choices.has(key));
+    } catch {
+      complete = false;
+    }
+  }
+  notes.push(`Filled ${mapping.fields.length} fields from learned mapping${complete ? '' : ' (incomplete)'}`);
+  return complete;
+}
+
+// Autofill the form: learned selectors when this layout was seen before on the domain, otherwise a
+// full DOM scan whose resolved fields are reported back as the mapping for next time
+async function autofillForm(target: Page | Frame, input: Input, notes: string[]): Promise<FormMapping | undefined> {
+  if (!input.answers?.answers) {
+    notes.push('No answer index provided');
+    return undefined;
+  }
+  const fingerprint = await formFingerprint(target).catch(() => undefined);
+  if (!fingerprint) return undefined;
+  const known = input.knownMappings?.find(m => m.fingerprint === fingerprint);
+  if (known && (await applyMapping(target, input, known, notes))) {
+    return known;
+  }
+  const fields = await smartAutofill(target, input, notes);
+  return { fingerprint, fields };
+}
 
+async function smartAutofill(target: Page | Frame, input: Input, notes: string[]): Promise<FieldMapping[]> {
+  const index = input.answers;
+  const choices = new Set(index.choices || []);
+  const learned: FieldMapping[] = [];
+  const learnedSelectors = new Set<string>();
+  try {
     const elements = await (target as any).$$('input, textarea, select');
     for (const el of elements as any[]) {
       try {
@@ -112,8 +159,9 @@ async function smartAutofill(target: Page | Frame, input: Input, notes: string[]
         const disabled = await el.isDisabled?.();
         if (visible === false || disabled === true) continue;
         const tag = (await el.evaluate((e: any) => e.tagName.toLowerCase())) as string;
+        let type = 'text';
         if (tag === 'input') {
-          const type = (await el.getAttribute('type')) || 'text';
+          type = (await el.getAttribute('type')) || 'text';
           if (['submit', 'button', 'hidden'].includes(type)) continue;
           if (type === 'file') continue; // handled elsewhere
         }
@@ -135,56 +183,30 @@ async function smartAutofill(target: Page | Frame, input: Input, notes: string[]
           }
           return '';
         });
-        const haystack = `${nameAttr} ${idAttr} ${placeholder} ${aria} ${labelText}`.toLowerCase();
-
-        // date handling
-        const dateValue = (key: 'start' | 'end') => {
-          const raw = key === 'start' ? exp?.start || edu?.start : exp?.end || edu?.end;
-          if (!raw) return undefined;
-          const m = String(raw).match(/\d{4}-\d{2}-\d{2}|\d{4}-\d{2}|\d{4}/);
-          return m ? m[0] : String(raw);
-        };
-
-        let filled = false;
-        for (const [k, v] of Object.entries(valueByKeyword)) {
-          if (!v) continue;
-          if (haystack.includes(k)) {
-            if (tag === 'select') {
-              await el.selectOption({ label: v }).catch(async () => {
-                await el.selectOption(v).catch(() => {});
-              });
-            } else {
-              await el.fill(v).catch(() => {});
-            }
-            notes.push(`Smart filled ${k}`);
-            filled = true;
-            break;
-          }
-        }
 
-        if (!filled) {
-          // Generic date start/end
-          if (/start date|start|from/.test(haystack)) {
-            const v = dateValue('start');
-            if (v) { await el.fill(v).catch(() => {}); notes.push('Filled start date'); continue; }
-          }
-          if (/end date|end|to/.test(haystack)) {
-            const v = dateValue('end');
-            if (v) { await el.fill(v).catch(() => {}); notes.push('Filled end date'); continue; }
-          }
-        }
-
-        // Yes/No radios from prefs
-        if (tag !== 'select' && /work authorization|sponsorship|work auth|require sponsorship/.test(haystack)) {
-          const want = (input.prefs as any)?.work_auth || input.profile.work_auth || 'No';
-          const lbl = await (target as any).$(`label:has-text("${String(want)}")`);
-          await lbl?.click().catch(() => {});
+        // Most specific text first: the visible label, then accessibility/placeholder, then attributes
+        const key = lookupAnswerKey(index, [labelText, aria, placeholder, nameAttr, idAttr]);
+        if (!key) continue;
+        const v = index.answers[key];
+
+        const isOption = type === 'radio' || type === 'checkbox';
+        // Choice answers go to option inputs or selects; typed answers never go to option inputs
+        if (isOption ? !choices.has(key) : choices.has(key) && tag !== 'select') continue;
+        // A radio group is one field: record it by name, and click its answer once
+        const selector = isOption ? fieldSelector(tag, '', nameAttr) : fieldSelector(tag, idAttr, nameAttr);
+        if (selector && learnedSelectors.has(selector)) continue;
+        await fillField(target, el, tag, v, isOption);
+        notes.push(`Smart ${isOption ? 'selected' : 'filled'} ${key}`);
+        if (selector) {
+          learnedSelectors.add(selector);
+          learned.push({ selector, key });
         }
       } catch {}
     }
   } catch (e) {
     notes.push(`Smart autofill error: ${String(e)}`);
   }
+  return learned;
 }
 
 function detectAts(url: string): 'greenhouse' | 'lever' | 'workday' | 'generic' {
@@ -205,20 +227,24 @@ async function tryFill(page: Page, selectors: string[], value?: string | null, n
   }
 }
 
-async function genericStrategy(page: Page, input: Input, notes: string[]): Promise<void> {
+async function genericStrategy(page: Page, input: Input, notes: string[]): Promise<FormMapping | undefined> {
+  let mapping: FormMapping | undefined;
   try {
-    await tryFill(page, ['input[placeholder*="Name" i]', 'input[name*="name" i]'], input.profile.name, notes);
-    await tryFill(page, ['input[type="email"]', 'input[name*="email" i]'], input.profile.email, notes);
-    await tryFill(page, ['input[type="tel"]', 'input[name*="phone" i]'], input.profile.phone, notes);
+    await tryFill(page, ['input[placeholder*="Name" i]', 'input[name*="name" i]'], answer(input.answers, 'full_name'), notes);
+    await tryFill(page, ['input[type="email"]', 'input[name*="email" i]'], answer(input.answers, 'email'), notes);
+    await tryFill(page, ['input[type="tel"]', 'input[name*="phone" i]'], answer(input.answers, 'phone'), notes);
+    mapping = await autofillForm(page, input, notes);
   } catch (e) {
     notes.push(`Field fill error: ${String(e)}`);
   }
   if (input.r2Assets?.resumeUrl) {
     notes.push(`Resume available at: ${input.r2Assets.resumeUrl}`);
   }
+  return mapping;
 }
 
-async function greenhouseStrategy(page: Page, input: Input, notes: string[]): Promise<void> {
+async function greenhouseStrategy(page: Page, input: Input, notes: string[]): Promise<FormMapping | undefined> {
+  let mapping: FormMapping | undefined;
   // Click an Apply button/link then fill standard GH fields
   try {
     // Common Apply triggers
@@ -241,8 +267,9 @@ async function greenhouseStrategy(page: Page, input: Input, notes: string[]): Pr
     const target = ghFrame ?? page;
     if (ghFrame) notes.push(`Detected Greenhouse iframe: ${ghFrame.url()}`);
 
-    const firstName = input.profile.name?.split(' ')[0] || input.profile.name || '';
-    const lastName = (input.profile.name?.split(' ').slice(1).join(' ') || '').trim();
+    const index = input.answers;
+    const firstName = answer(index, 'first_name') || '';
+    const lastName = answer(index, 'last_name') || '';
 
     // Fill common Greenhouse fields inside frame or page
     try {
@@ -256,24 +283,21 @@ async function greenhouseStrategy(page: Page, input: Input, notes: string[]): Pr
       }
     } catch {}
     try {
-      if (input.profile.email) {
-        await target.fill?.('input[name="email"], #email, input[type="email"]', input.profile.email).catch(() => {});
+      const email = answer(index, 'email');
+      if (email) {
+        await target.fill?.('input[name="email"], #email, input[type="email"]', email).catch(() => {});
         notes.push('Filled email');
       }
     } catch {}
     try {
-      if (input.profile.phone) {
-        await target.fill?.('input[name="phone"], #phone, input[type="tel"]', input.profile.phone).catch(() => {});
+      const phone = answer(index, 'phone');
+      if (phone) {
+        await target.fill?.('input[name="phone"], #phone, input[type="tel"]', phone).catch(() => {});
         notes.push('Filled phone');
       }
     } catch {}
 
     // Heuristic mapping for common additional fields
-    const links = Array.isArray(input.profile.links) ? input.profile.links as string[] : [];
-    const linkedin = links.find(u => /linkedin\.com/i.test(u));
-    const github = links.find(u => /github\.com/i.test(u));
-    const website = links.find(u => !/linkedin|github/i.test(u));
-
     async function fillByLabel(texts: string[], value?: string) {
       if (!value) return false;
       for (const t of texts) {
@@ -308,45 +332,42 @@ async function greenhouseStrategy(page: Page, input: Input, notes: string[]): Pr
     }
 
     // Fill common link fields
-    await fillByLabel(['LinkedIn', 'LinkedIn Profile'], linkedin);
-    await fillByLabel(['GitHub', 'Github'], github);
-    await fillByLabel(['Website', 'Portfolio', 'Personal Website'], website);
+    await fillByLabel(['LinkedIn', 'LinkedIn Profile'], answer(index, 'linkedin'));
+    await fillByLabel(['GitHub', 'Github'], answer(index, 'github'));
+    await fillByLabel(['Website', 'Portfolio', 'Personal Website'], answer(index, 'website'));
 
     // Address and location-like fields
-    await fillByLabel(['Address', 'Street'], input.profile.address);
-    // If parsed profile had city/state/zip, add here when available
+    await fillByLabel(['Address', 'Street'], answer(index, 'address'));
+    await fillByLabel(['City'], answer(index, 'city'));
+    await fillByLabel(['State', 'Province'], answer(index, 'state'));
+    await fillByLabel(['Zip', 'Postal Code'], answer(index, 'postal_code'));
 
     // Education and Experience (best-effort, single-line)
-    const edu = Array.isArray(input.profile.education) && input.profile.education.length > 0 ? input.profile.education[0] : undefined;
-    const exp = Array.isArray(input.profile.experience) && input.profile.experience.length > 0 ? input.profile.experience[0] : undefined;
-    await fillByLabel(['School', 'University', 'College'], edu?.school);
-    await fillByLabel(['Degree', 'Qualification'], edu?.degree);
-    await fillByLabel(['Company', 'Employer'], exp?.company);
-    await fillByLabel(['Title', 'Job Title', 'Position'], exp?.title);
-
-    // Preferences (EEO-like) best-effort based on provided prefs
-    if (input.prefs && typeof input.prefs === 'object') {
-      const prefs = input.prefs as Record<string, any>;
-      async function selectRadioByLabel(questionLabels: string[], answerText?: string) {
-        if (!answerText) return;
-        for (const q of questionLabels) {
-          try {
-            const qEl = await target.$(`text=${q}`);
-            if (qEl) {
-              const opt = await target.$(`label:has-text("${answerText}")`);
-              if (opt) { await opt.click().catch(() => {}); notes.push(`Selected ${answerText} for ${q}`); return; }
-            }
-          } catch {}
-        }
+    await fillByLabel(['School', 'University', 'College'], answer(index, 'school'));
+    await fillByLabel(['Degree', 'Qualification'], answer(index, 'degree'));
+    await fillByLabel(['Company', 'Employer'], answer(index, 'company'));
+    await fillByLabel(['Title', 'Job Title', 'Position'], answer(index, 'title'));
+
+    // Preferences (EEO-like) best-effort based on the answer index
+    async function selectRadioByLabel(questionLabels: string[], answerText?: string) {
+      if (!answerText) return;
+      for (const q of questionLabels) {
+        try {
+          const qEl = await target.$(`text=${q}`);
+          if (qEl) {
+            const opt = await target.$(`label:has-text("${answerText}")`);
+            if (opt) { await opt.click().catch(() => {}); notes.push(`Selected ${answerText} for ${q}`); return; }
+          }
+        } catch {}
       }
-      await selectRadioByLabel(['Gender', 'Sex'], prefs['gender'] as string);
-      await selectRadioByLabel(['Veteran'], prefs['veteran'] as string);
-      await selectRadioByLabel(['Disability'], prefs['disability'] as string);
-      await selectRadioByLabel(['Work Authorization', 'Work authorisation'], prefs['work_auth'] as string || (input.profile.work_auth as string | undefined));
     }
+    await selectRadioByLabel(['Gender', 'Sex'], answer(index, 'gender'));
+    await selectRadioByLabel(['Veteran'], answer(index, 'veteran_status'));
+    await selectRadioByLabel(['Disability'], answer(index, 'disability_status'));
+    await selectRadioByLabel(['Work Authorization', 'Work authorisation'], answer(index, 'work_authorization'));
 
-    // Run smart autofill across remaining fields
-    await smartAutofill(target, input, notes);
+    // Fill remaining fields: learned selectors for a known layout, else a full scan
+    mapping = await autofillForm(target, input, notes);
 
     // Resume upload (download to temp file and attach to file input inside GH iframe)
     if (input.r2Assets?.resumeUrl) {
@@ -368,6 +389,26 @@ async function greenhouseStrategy(page: Page, input: Input, notes: string[]): Pr
       }
     }
 
+    // Cover letter generated by the backend, if this posting has a cover letter input
+    if (input.r2Assets?.coverLetterUrl) {
+      try {
+        const fileInput = await target.$(
+          '#cover_letter input[type="file"], input[type="file"][name*="cover" i], input[type="file"][id*="cover" i]'
+        );
+        if (fileInput) {
+          const res = await fetch(input.r2Assets.coverLetterUrl);
+          const tmp = path.join(os.tmpdir(), `cover-letter-${Date.now()}.pdf`);
+          await fs.writeFile(tmp, Buffer.from(await res.arrayBuffer()));
+          await (fileInput as any).setInputFiles(tmp);
+          notes.push('Uploaded cover letter from R2');
+        } else {
+          notes.push('No file input found for cover letter upload');
+        }
+      } catch (e) {
+        notes.push(`Cover letter upload failed: ${String(e)}`);
+      }
+    }
+
     // Try to submit the application if a submit button is visible
     try {
       const submitBtn = await target.$('button[type="submit"], button:has-text("Submit Application"), input[type="submit"]');
@@ -384,12 +425,26 @@ async function greenhouseStrategy(page: Page, input: Input, notes: string[]): Pr
   } catch (e) {
     notes.push(`Greenhouse flow error: ${String(e)}`);
   }
+  return mapping;
+}
+
+// Best effort: a lost callback only delays the job until the backend's next status poll
+async function sendCallback(input: Input | undefined, invocationId: string, output: Output): Promise<void> {
+  if (!input?.callback) return;
+  try {
+    await fetch(`${input.callback.url}/${encodeURIComponent(invocationId)}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${input.callback.token}` },
+      body: JSON.stringify(output),
+      signal: AbortSignal.timeout(10_000),
+    });
+  } catch {}
 }
 
 const kernel = new Kernel();
 const app = kernel.app('kernel-job-agent');
 
-app.action('fill_job_form', async (ctx: KernelContext, payload?: Input): Promise<Output> => {
+async function fillJobForm(ctx: KernelContext, payload?: Input): Promise<Output> {
   const notes: string[] = [];
   
   if (!payload) {
@@ -424,11 +479,9 @@ app.action('fill_job_form', async (ctx: KernelContext, payload?: Input): Promise
     }
     notes.push(`Detected ATS: ${ats}`);
 
-    if (ats === 'greenhouse') {
-      await greenhouseStrategy(page, input, notes);
-    } else {
-      await genericStrategy(page, input, notes);
-    }
+    const mapping = ats === 'greenhouse'
+      ? await greenhouseStrategy(page, input, notes)
+      : await genericStrategy(page, input, notes);
 
     if (input.takeProofScreenshots) {
       notes.push('Screenshot step available (upload wiring later)');
@@ -440,6 +493,7 @@ app.action('fill_job_form', async (ctx: KernelContext, payload?: Input): Promise
       liveViewUrl: kBrowser.browser_live_view_url,
       screenshots: [],
       notes,
+      mapping,
     };
   } catch (e) {
     notes.push(`Error: ${String(e)}`);
@@ -453,6 +507,12 @@ app.action('fill_job_form', async (ctx: KernelContext, payload?: Input): Promise
   } finally {
     try { await browser.close(); } catch {}
   }
+}
+
+app.action('fill_job_form', async (ctx: KernelContext, payload?: Input): Promise<Output> => {
+  const output = await fillJobForm(ctx, payload);
+  await sendCallback(payload, ctx.invocation_id, output);
+  return output;
 });
 
 
@@ -83,7 +83,7 @@ def do_run_migrations(connection: Connection) -> None:
 async def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
     connectable: AsyncEngine = create_async_engine(
-        get_url(), poolclass=pool.NullPool, connect_args={"ssl": True}
+        get_url(), poolclass=pool.NullPool, connect_args={"ssl": get_settings().DATABASE_SSL}
     )
 
     async with connectable.connect() as connection:
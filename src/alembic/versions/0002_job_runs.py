@@ -0,0 +1,44 @@
+"""job run traces
+
+Revision ID: 0002_job_runs
+Revises: 0001_initial
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision = "0002_job_runs"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # job_runs: one row per run_job execution with its trace spans
+    op.create_table(
+        "job_runs",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("job_application_id", pg.UUID(as_uuid=True), sa.ForeignKey("job_applications.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("trace_id", sa.String(length=32), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("strategy", sa.String(length=32), nullable=True),
+        sa.Column("kernel_invocation_id", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("notes", pg.JSONB(), nullable=True),
+        sa.Column("spans", pg.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column("started_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+    )
+    op.create_index("ix_job_runs_job_application_id", "job_runs", ["job_application_id"])
+    op.create_index("ix_job_runs_strategy_started_at", "job_runs", ["strategy", "started_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_runs_strategy_started_at", table_name="job_runs")
+    op.drop_index("ix_job_runs_job_application_id", table_name="job_runs")
+    op.drop_table("job_runs")
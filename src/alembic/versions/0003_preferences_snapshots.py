@@ -0,0 +1,51 @@
+"""versioned preferences snapshots
+
+Revision ID: 0003_preferences_snapshots
+Revises: 0002_job_runs
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_preferences_snapshots"
+down_revision = "0002_job_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("user_preferences", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+    # preferences_snapshots: immutable copy per version
+    op.create_table(
+        "preferences_snapshots",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, unique=True),
+        sa.Column("data", pg.JSONB(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    # Backfill the current version of the existing single row
+    op.execute(
+        "INSERT INTO preferences_snapshots (id, version, data) "
+        "SELECT gen_random_uuid(), version, data FROM user_preferences LIMIT 1"
+    )
+
+    op.add_column(
+        "job_applications",
+        sa.Column(
+            "preferences_snapshot_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("preferences_snapshots.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("job_applications", "preferences_snapshot_id")
+    op.drop_table("preferences_snapshots")
+    op.drop_column("user_preferences", "version")
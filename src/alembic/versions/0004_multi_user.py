@@ -0,0 +1,230 @@
+"""multi-user data model and partitioned job history
+
+Revision ID: 0004_multi_user
+Revises: 0003_preferences_snapshots
+Create Date: 2026-10-19
+"""
+
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+from sqlalchemy.dialects.postgresql import ENUM as PGEnum
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_multi_user"
+down_revision = "0003_preferences_snapshots"
+branch_labels = None
+depends_on = None
+
+# Existing single-user data is assigned to this user (matches the DEFAULT_USER_EMAIL default)
+DEFAULT_USER_ID = "00000000-0000-0000-0000-000000000001"
+DEFAULT_USER_EMAIL = "owner@localhost"
+MONTHS_AHEAD = 3
+
+JOB_COLUMNS = (
+    "id, user_id, target_url, resume_id, cover_letter_r2_key, preferences_snapshot_id, status, "
+    "kernel_session_id, persistence_id, live_view_url, result_summary, error, created_at, updated_at"
+)
+
+
+def _add_months(d: date, months: int) -> date:
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(table: str, first_month: date, last_month: date) -> None:
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    month = first_month
+    while month <= last_month:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+
+
+def _job_columns(partitioned: bool) -> list:
+    cols = [
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("target_url", sa.Text(), nullable=False),
+        sa.Column("resume_id", pg.UUID(as_uuid=True), sa.ForeignKey("resumes.id", ondelete="RESTRICT"), nullable=False),
+        sa.Column("cover_letter_r2_key", sa.Text(), nullable=True),
+        sa.Column(
+            "preferences_snapshot_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("preferences_snapshots.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column(
+            "status",
+            PGEnum("queued", "running", "succeeded", "failed", name="job_status", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("kernel_session_id", sa.Text(), nullable=True),
+        sa.Column("persistence_id", sa.Text(), nullable=True),
+        sa.Column("live_view_url", sa.Text(), nullable=True),
+        sa.Column("result_summary", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    ]
+    if partitioned:
+        cols.insert(1, sa.Column("user_id", pg.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False))
+    return cols
+
+
+def upgrade() -> None:
+    # users
+    op.create_table(
+        "users",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("email", sa.Text(), nullable=False, unique=True),
+        sa.Column("name", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.execute(f"INSERT INTO users (id, email) VALUES ('{DEFAULT_USER_ID}', '{DEFAULT_USER_EMAIL}')")
+
+    # user-scoped foreign keys on existing tables
+    for table in ("resumes", "user_preferences", "preferences_snapshots"):
+        op.add_column(table, sa.Column("user_id", pg.UUID(as_uuid=True), nullable=True))
+        op.execute(f"UPDATE {table} SET user_id = '{DEFAULT_USER_ID}'")
+        op.alter_column(table, "user_id", nullable=False)
+        op.create_foreign_key(f"{table}_user_id_fkey", table, "users", ["user_id"], ["id"], ondelete="CASCADE")
+    op.create_index("ix_resumes_user_id_created_at", "resumes", ["user_id", "created_at"])
+    op.create_unique_constraint("user_preferences_user_id_key", "user_preferences", ["user_id"])
+    op.drop_constraint("preferences_snapshots_version_key", "preferences_snapshots", type_="unique")
+    op.create_unique_constraint(
+        "uq_preferences_snapshots_user_id_version", "preferences_snapshots", ["user_id", "version"]
+    )
+
+    # Rebuild job_applications / application_artifacts as range-partitioned tables
+    op.drop_constraint("job_runs_job_application_id_fkey", "job_runs", type_="foreignkey")
+    op.rename_table("application_artifacts", "application_artifacts_old")
+    op.execute("ALTER INDEX application_artifacts_pkey RENAME TO application_artifacts_old_pkey")
+    op.rename_table("job_applications", "job_applications_old")
+    op.execute("ALTER INDEX job_applications_pkey RENAME TO job_applications_old_pkey")
+
+    op.create_table(
+        "job_applications",
+        *_job_columns(partitioned=True),
+        sa.PrimaryKeyConstraint("id", "created_at", name="job_applications_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index("ix_job_applications_user_id_created_at", "job_applications", ["user_id", "created_at"])
+    op.create_index(
+        "ix_job_applications_user_id_status_created_at", "job_applications", ["user_id", "status", "created_at"]
+    )
+
+    op.create_table(
+        "application_artifacts",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("job_application_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("job_created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("type", sa.String(length=32), nullable=False),
+        sa.Column("r2_key", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id", "job_created_at", name="application_artifacts_pkey"),
+        sa.ForeignKeyConstraint(
+            ["job_application_id", "job_created_at"],
+            ["job_applications.id", "job_applications.created_at"],
+            ondelete="CASCADE",
+            name="fk_application_artifacts_job_application",
+        ),
+        postgresql_partition_by="RANGE (job_created_at)",
+    )
+    op.create_index("ix_application_artifacts_job_application_id", "application_artifacts", ["job_application_id"])
+
+    bind = op.get_bind()
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM job_applications_old")).scalar()
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    first_month = oldest.date().replace(day=1) if oldest else this_month
+    last_month = _add_months(this_month, MONTHS_AHEAD)
+    _create_partitions("job_applications", first_month, last_month)
+    _create_partitions("application_artifacts", first_month, last_month)
+
+    op.execute(
+        f"INSERT INTO job_applications ({JOB_COLUMNS}) "
+        f"SELECT {JOB_COLUMNS.replace('user_id', repr(DEFAULT_USER_ID) + '::uuid', 1)} FROM job_applications_old"
+    )
+    op.execute(
+        "INSERT INTO application_artifacts (id, job_application_id, job_created_at, type, r2_key, created_at) "
+        "SELECT a.id, a.job_application_id, j.created_at, a.type, a.r2_key, a.created_at "
+        "FROM application_artifacts_old a JOIN job_applications_old j ON j.id = a.job_application_id"
+    )
+
+    # job_runs references the partitioned parent through (id, created_at)
+    op.add_column("job_runs", sa.Column("job_created_at", sa.TIMESTAMP(timezone=True), nullable=True))
+    op.execute(
+        "UPDATE job_runs r SET job_created_at = j.created_at FROM job_applications_old j "
+        "WHERE j.id = r.job_application_id"
+    )
+    op.execute("DELETE FROM job_runs WHERE job_created_at IS NULL")
+    op.alter_column("job_runs", "job_created_at", nullable=False)
+    op.create_foreign_key(
+        "fk_job_runs_job_application",
+        "job_runs",
+        "job_applications",
+        ["job_application_id", "job_created_at"],
+        ["id", "created_at"],
+        ondelete="CASCADE",
+    )
+
+    op.drop_table("application_artifacts_old")
+    op.drop_table("job_applications_old")
+
+
+def downgrade() -> None:
+    # Collapse partitions back into plain tables and drop user scoping
+    op.drop_constraint("fk_job_runs_job_application", "job_runs", type_="foreignkey")
+    op.drop_column("job_runs", "job_created_at")
+
+    op.rename_table("application_artifacts", "application_artifacts_part")
+    op.execute("ALTER INDEX application_artifacts_pkey RENAME TO application_artifacts_part_pkey")
+    op.rename_table("job_applications", "job_applications_part")
+    op.execute("ALTER INDEX job_applications_pkey RENAME TO job_applications_part_pkey")
+
+    op.create_table(
+        "job_applications",
+        *_job_columns(partitioned=False),
+        sa.PrimaryKeyConstraint("id", name="job_applications_pkey"),
+    )
+    plain_columns = JOB_COLUMNS.replace("user_id, ", "", 1)
+    op.execute(f"INSERT INTO job_applications ({plain_columns}) SELECT {plain_columns} FROM job_applications_part")
+    op.create_table(
+        "application_artifacts",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("job_application_id", pg.UUID(as_uuid=True), sa.ForeignKey("job_applications.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("type", sa.String(length=32), nullable=False),
+        sa.Column("r2_key", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO application_artifacts (id, job_application_id, type, r2_key, created_at) "
+        "SELECT id, job_application_id, type, r2_key, created_at FROM application_artifacts_part"
+    )
+    op.drop_table("application_artifacts_part")
+    op.drop_table("job_applications_part")
+    op.create_foreign_key(
+        "job_runs_job_application_id_fkey",
+        "job_runs",
+        "job_applications",
+        ["job_application_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+    op.drop_constraint("uq_preferences_snapshots_user_id_version", "preferences_snapshots", type_="unique")
+    # Only the default user's preferences fit the single-user schema
+    op.execute(f"DELETE FROM preferences_snapshots WHERE user_id <> '{DEFAULT_USER_ID}'")
+    op.execute(f"DELETE FROM user_preferences WHERE user_id <> '{DEFAULT_USER_ID}'")
+    op.create_unique_constraint("preferences_snapshots_version_key", "preferences_snapshots", ["version"])
+    op.drop_constraint("user_preferences_user_id_key", "user_preferences", type_="unique")
+    op.drop_index("ix_resumes_user_id_created_at", table_name="resumes")
+    for table in ("resumes", "user_preferences", "preferences_snapshots"):
+        op.drop_constraint(f"{table}_user_id_fkey", table, type_="foreignkey")
+        op.drop_column(table, "user_id")
+    op.drop_table("users")
@@ -0,0 +1,32 @@
+"""job priority, deadline and queue time
+
+Revision ID: 0005_job_scheduling
+Revises: 0004_multi_user
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_job_scheduling"
+down_revision = "0004_multi_user"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Columns added to the partitioned parent propagate to every partition
+    op.add_column("job_applications", sa.Column("priority", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("job_applications", sa.Column("deadline", sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column("job_applications", sa.Column("queued_at", sa.TIMESTAMP(timezone=True), nullable=True))
+    # Startup recovery scans queued jobs in arrival order
+    op.create_index("ix_job_applications_status_queued_at", "job_applications", ["status", "queued_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_applications_status_queued_at", table_name="job_applications")
+    op.drop_column("job_applications", "queued_at")
+    op.drop_column("job_applications", "deadline")
+    op.drop_column("job_applications", "priority")
@@ -0,0 +1,32 @@
+"""cancelled job status
+
+Revision ID: 0006_job_cancelled
+Revises: 0005_job_scheduling
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_job_cancelled"
+down_revision = "0005_job_scheduling"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ADD VALUE cannot be used in the same transaction that adds it
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE job_status ADD VALUE IF NOT EXISTS 'cancelled'")
+
+
+def downgrade() -> None:
+    # Postgres cannot drop enum values: rebuild the type without 'cancelled'
+    op.execute("UPDATE job_applications SET status = 'failed', error = coalesce(error, 'Cancelled') WHERE status = 'cancelled'")
+    op.execute("ALTER TYPE job_status RENAME TO job_status_old")
+    op.execute("CREATE TYPE job_status AS ENUM ('queued', 'running', 'succeeded', 'failed')")
+    op.execute(
+        "ALTER TABLE job_applications ALTER COLUMN status TYPE job_status USING status::text::job_status"
+    )
+    op.execute("DROP TYPE job_status_old")
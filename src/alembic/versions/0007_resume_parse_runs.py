@@ -0,0 +1,40 @@
+"""resume parse runs with token usage
+
+Revision ID: 0007_resume_parse_runs
+Revises: 0006_job_cancelled
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_resume_parse_runs"
+down_revision = "0006_job_cancelled"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resume_parse_runs",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("resume_id", pg.UUID(as_uuid=True), sa.ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("mode", sa.String(length=16), nullable=True),
+        sa.Column("model", sa.Text(), nullable=True),
+        sa.Column("input_tokens", sa.Integer(), nullable=False),
+        sa.Column("llm_calls", sa.Integer(), nullable=False),
+        sa.Column("prompt_tokens", sa.Integer(), nullable=False),
+        sa.Column("completion_tokens", sa.Integer(), nullable=False),
+        sa.Column("duration_ms", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_resume_parse_runs_resume_id_created_at", "resume_parse_runs", ["resume_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resume_parse_runs_resume_id_created_at", table_name="resume_parse_runs")
+    op.drop_table("resume_parse_runs")
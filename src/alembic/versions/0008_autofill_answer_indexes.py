@@ -0,0 +1,33 @@
+"""autofill answer indexes
+
+Revision ID: 0008_autofill_answer_indexes
+Revises: 0007_resume_parse_runs
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_autofill_answer_indexes"
+down_revision = "0007_resume_parse_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "autofill_answer_indexes",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("resume_id", pg.UUID(as_uuid=True), sa.ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("cache_key", sa.Text(), nullable=False),
+        sa.Column("data", pg.JSONB(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.UniqueConstraint("resume_id", "cache_key", name="uq_autofill_answer_indexes_resume_id_cache_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("autofill_answer_indexes")
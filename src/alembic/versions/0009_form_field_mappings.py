@@ -0,0 +1,44 @@
+"""learned form field mappings
+
+Revision ID: 0009_form_field_mappings
+Revises: 0008_autofill_answer_indexes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_form_field_mappings"
+down_revision = "0008_autofill_answer_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "form_field_mappings",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("domain", sa.Text(), nullable=False),
+        sa.Column("strategy", sa.String(length=32), nullable=False),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("fields", pg.JSONB(), nullable=False),
+        sa.Column("hits", sa.Integer(), server_default="1", nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.UniqueConstraint(
+            "domain", "strategy", "fingerprint", name="uq_form_field_mappings_domain_strategy_fingerprint"
+        ),
+    )
+    op.create_index(
+        "ix_form_field_mappings_domain_strategy_updated_at",
+        "form_field_mappings",
+        ["domain", "strategy", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_form_field_mappings_domain_strategy_updated_at", table_name="form_field_mappings")
+    op.drop_table("form_field_mappings")
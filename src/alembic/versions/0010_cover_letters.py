@@ -0,0 +1,41 @@
+"""cached cover letters
+
+Revision ID: 0010_cover_letters
+Revises: 0009_form_field_mappings
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision = "0010_cover_letters"
+down_revision = "0009_form_field_mappings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cover_letters",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("user_id", pg.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("resume_hash", sa.String(length=64), nullable=False),
+        sa.Column("posting_key", sa.Text(), nullable=False),
+        sa.Column("posting_hash", sa.String(length=64), nullable=False),
+        sa.Column("r2_key", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.UniqueConstraint(
+            "user_id",
+            "resume_hash",
+            "posting_key",
+            "posting_hash",
+            name="uq_cover_letters_user_id_resume_hash_posting_key_posting_hash",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cover_letters")
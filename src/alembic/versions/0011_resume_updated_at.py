@@ -0,0 +1,29 @@
+"""resumes.updated_at for conditional GETs
+
+Revision ID: 0011_resume_updated_at
+Revises: 0010_cover_letters
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0011_resume_updated_at"
+down_revision = "0010_cover_letters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "resumes",
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    # Backfill: the value only has to change when the resume does
+    op.execute("UPDATE resumes SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    op.drop_column("resumes", "updated_at")
@@ -0,0 +1,34 @@
+"""kernel completion callbacks
+
+Revision ID: 0012_kernel_callbacks
+Revises: 0011_resume_updated_at
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_kernel_callbacks"
+down_revision = "0011_resume_updated_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "kernel_callbacks",
+        sa.Column("invocation_id", sa.Text(), primary_key=True, nullable=False),
+        sa.Column("callback_key", sa.String(length=64), primary_key=True, nullable=False),
+        sa.Column("output", pg.JSONB(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("received_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+    op.create_index("ix_kernel_callbacks_created_at", "kernel_callbacks", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_kernel_callbacks_created_at", table_name="kernel_callbacks")
+    op.drop_table("kernel_callbacks")
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+# Maintenance commands, run from src/:  python -m app.cli <command> ...
+
+
+async def _partitions_ensure(args: argparse.Namespace) -> int:
+    from .db import dispose_engine, init_engine
+    from .services.partitions import ensure_partitions
+
+    async with init_engine().begin() as conn:
+        created = await ensure_partitions(conn, months_back=args.months_back, months_ahead=args.months_ahead)
+    await dispose_engine()
+    print("\n".join(created) if created else "Partitions up to date")
+    return 0
+
+
+async def _partitions_detach(args: argparse.Namespace) -> int:
+    from .db import dispose_engine, init_engine
+    from .services.partitions import add_months, detach_partitions_before, month_start
+
+    cutoff = add_months(month_start(datetime.now(timezone.utc).date()), -args.older_than_months)
+    async with init_engine().begin() as conn:
+        detached = await detach_partitions_before(conn, cutoff)
+    await dispose_engine()
+    print("\n".join(detached) if detached else f"No partitions ending before {cutoff}")
+    return 0
+
+
+def _age_rule(value: str) -> tuple[str, int]:
+    status, _, days = value.partition("=")
+    if status not in ("succeeded", "failed", "cancelled") or not days.isdigit():
+        raise argparse.ArgumentTypeError(f"expected <succeeded|failed|cancelled>=<days>, got {value!r}")
+    return status, int(days)
+
+
+async def _retention_run(args: argparse.Namespace) -> int:
+    from .db import SessionLocal, dispose_engine
+    from .services.retention import RetentionPolicy, apply_retention, count_expired
+
+    policy = RetentionPolicy.from_settings()
+    if args.max_age:
+        # Rules given on the command line replace the configured ones
+        policy.max_age_days = dict(args.max_age)
+    if args.max_jobs_per_resume is not None:
+        policy.max_jobs_per_resume = args.max_jobs_per_resume
+    if args.batch_size is not None:
+        policy.batch_size = args.batch_size
+    rules: Dict[str, object] = {**policy.max_age_days, "per_resume": policy.max_jobs_per_resume}
+    async with SessionLocal() as db:
+        if args.dry_run:
+            print(f"{await count_expired(db, policy)} jobs would be deleted ({rules})")
+        else:
+            report = await apply_retention(db, policy)
+            print(
+                f"Deleted {report.jobs} jobs, {report.artifacts} artifacts and {report.objects} R2 objects "
+                f"in {report.batches} batches, and {report.callbacks} Kernel callbacks ({rules})"
+            )
+    await dispose_engine()
+    return 0
+
+
+async def _retention_orphans(args: argparse.Namespace) -> int:
+    from .config import get_settings
+    from .db import SessionLocal, dispose_engine
+    from .services.retention import ORPHAN_PREFIXES, find_orphans
+    from .services.storage_r2 import delete_objects
+
+    grace = timedelta(seconds=get_settings().RETENTION_ORPHAN_GRACE_S if args.grace_s is None else args.grace_s)
+    found = 0
+    async with SessionLocal() as db:
+        for prefix, columns in ORPHAN_PREFIXES:
+            report = await find_orphans(db, prefix, columns, grace)
+            found += len(report.orphaned)
+            print(
+                f"{prefix}: {report.listed} objects, {len(report.orphaned)} orphaned, "
+                f"{len(report.missing)} rows without an object"
+            )
+            for key in report.orphaned[: args.show]:
+                print(f"  orphan  {key}")
+            for key in report.missing[: args.show]:
+                print(f"  missing {key}")
+            if args.delete and report.orphaned:
+                deleted = await asyncio.to_thread(delete_objects, report.orphaned)
+                print(f"  deleted {deleted} orphaned objects")
+    await dispose_engine()
+    # Non-zero when orphans were found and left in place, for alerting from cron
+    return 1 if found and not args.delete else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    partitions = sub.add_parser("partitions", help="Manage monthly partitions of job history")
+    psub = partitions.add_subparsers(dest="action", required=True)
+    ensure = psub.add_parser("ensure", help="Create DEFAULT and monthly partitions")
+    ensure.add_argument("--months-back", type=int, default=0)
+    ensure.add_argument("--months-ahead", type=int, default=3)
+    ensure.set_defaults(handler=_partitions_ensure)
+    detach = psub.add_parser("detach", help="Detach monthly partitions older than N months")
+    detach.add_argument("--older-than-months", type=int, required=True)
+    detach.set_defaults(handler=_partitions_detach)
+
+    retention = sub.add_parser("retention", help="Delete old job history and find unreferenced R2 objects")
+    rsub = retention.add_subparsers(dest="action", required=True)
+    run = rsub.add_parser("run", help="Delete terminal jobs matched by the retention policy")
+    run.add_argument(
+        "--max-age",
+        type=_age_rule,
+        action="append",
+        metavar="STATUS=DAYS",
+        help="e.g. failed=30; repeatable, replaces RETENTION_MAX_AGE_DAYS",
+    )
+    run.add_argument("--max-jobs-per-resume", type=int, help="Keep only the newest N terminal jobs of each resume")
+    run.add_argument("--batch-size", type=int, help="Jobs deleted per transaction (default RETENTION_BATCH_SIZE)")
+    run.add_argument("--dry-run", action="store_true", help="Only count the jobs that would be deleted")
+    run.set_defaults(handler=_retention_run)
+    orphans = rsub.add_parser("orphans", help="Compare R2 prefixes with the rows that reference them")
+    orphans.add_argument("--delete", action="store_true", help="Delete orphaned objects")
+    orphans.add_argument("--grace-s", type=int, help="Ignore objects newer than this (default RETENTION_ORPHAN_GRACE_S)")
+    orphans.add_argument("--show", type=int, default=20, help="Keys listed per prefix")
+    orphans.set_defaults(handler=_retention_orphans)
+
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,6 +21,8 @@ class Settings(BaseSettings):
 
     # Database (PostgreSQL + asyncpg)
     DATABASE_URL: str
+    # Neon requires TLS; disable for local Postgres (e.g. the benchmark harness)
+    DATABASE_SSL: bool = True
 
     # Cloudflare R2 (support multiple env naming styles)
     R2_ACCESS_KEY_ID: Optional[str] = Field(
@@ -38,6 +40,12 @@ class Settings(BaseSettings):
     )
     R2_PUBLIC_BASE_URL: Optional[str] = None
     R2_ENDPOINT: Optional[str] = None
+    R2_MAX_POOL_CONNECTIONS: int = 20
+    # Local cache of downloaded objects (resumes), content-addressed under BLOB_CACHE_DIR
+    # (default: <tmp>/kernel-job-agent-blobs); objects above BLOB_MAX_OBJECT_BYTES are refused
+    BLOB_CACHE_DIR: Optional[str] = None
+    BLOB_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    BLOB_MAX_OBJECT_BYTES: int = 20 * 1024 * 1024
 
     # Azure OpenAI
     AZURE_OPENAI_ENDPOINT: Optional[str] = Field(
@@ -54,14 +62,110 @@ class Settings(BaseSettings):
         default=None, validation_alias=AliasChoices("AZURE_OPENAI_API_VERSION", "azure_openai_api_version")
     )
 
+    # Resume parsing: "single" sends the whole text in one completion; "sectioned" parses
+    # contact/experience/education/skills chunks concurrently and merges them; "auto" uses
+    # sectioned parsing for texts of at least RESUME_PARSE_SECTIONED_MIN_TOKENS.
+    # Token counts use tiktoken's o200k_base encoding; bake it into images via TIKTOKEN_CACHE_DIR
+    # on hosts without internet access, which otherwise estimate 4 characters per token.
+    RESUME_PARSE_MODE: Literal["single", "sectioned", "auto"] = "auto"
+    RESUME_PARSE_SECTIONED_MIN_TOKENS: int = 1500
+    RESUME_PARSE_CHUNK_TOKENS: int = 1000
+    RESUME_PARSE_MAX_INPUT_TOKENS: int = 24000
+    RESUME_PARSE_MAX_PARALLEL: int = 4
+    # Fill contact fields and well-formed sections with regexes first; only the rest goes to
+    # the model, and resumes that are fully accounted for skip it
+    RESUME_PARSE_LOCAL_EXTRACT: bool = True
+
+    # Cover letters: generated per (resume content, posting) during bulk job creation when asked
+    # for, and cached; at most COVER_LETTER_MAX_PARALLEL model calls at a time per process, and a
+    # bulk request asking for letters takes at most COVER_LETTER_MAX_URLS postings. The posting
+    # text is read through preflight and cut to COVER_LETTER_POSTING_MAX_TOKENS
+    COVER_LETTER_MAX_PARALLEL: int = 4
+    COVER_LETTER_MAX_URLS: int = 50
+    COVER_LETTER_PROFILE_MAX_TOKENS: int = 4000
+    COVER_LETTER_POSTING_MAX_TOKENS: int = 3000
+
+    # Resume auto-selection (resume_id "auto"): resume matrices of the most recent
+    # RESUME_MATCH_CACHE_USERS users and vectors of RESUME_MATCH_CACHE_POSTINGS fetched postings
+    # stay in memory; postings are read through the preflight checker when PREFLIGHT_ENABLED, at
+    # most RESUME_MATCH_MAX_FETCHES uncached ones per request (the rest are matched on the URL)
+    RESUME_MATCH_CACHE_USERS: int = 256
+    RESUME_MATCH_CACHE_POSTINGS: int = 8192
+    RESUME_MATCH_MAX_FETCHES: int = 20
+
+    # Retention (python -m app.cli retention): terminal jobs older than the per-status age are
+    # deleted with their runs, artifacts and artifact objects; optionally only the newest
+    # RETENTION_MAX_JOBS_PER_RESUME terminal jobs of each resume are kept. Queued and running
+    # jobs are never touched. Kernel callbacks older than RETENTION_KERNEL_CALLBACK_DAYS go too.
+    RETENTION_MAX_AGE_DAYS: Dict[str, int] = {"succeeded": 365, "failed": 90, "cancelled": 30}
+    RETENTION_MAX_JOBS_PER_RESUME: Optional[int] = None
+    RETENTION_BATCH_SIZE: int = 1000
+    RETENTION_KERNEL_CALLBACK_DAYS: int = 7
+    # R2 objects younger than this are never reported as orphans (uploads precede their rows)
+    RETENTION_ORPHAN_GRACE_S: int = 3600
+
+    # Users: requests are scoped by the X-User-Id header. The API does not authenticate it, so it
+    # must be set by a trusted proxy that authenticates the caller and strips any client-supplied
+    # X-User-Id; never expose the API directly to untrusted clients. Requests without the header
+    # fall back to the default user (the single-user setup; a warning is logged at startup); set
+    # REQUIRE_USER_HEADER=true behind the proxy to reject them instead.
+    DEFAULT_USER_EMAIL: str = "owner@localhost"
+    REQUIRE_USER_HEADER: bool = False
+    # Job history is partitioned by month; each API process creates the current and next
+    # PARTITION_MONTHS_AHEAD months at startup and every PARTITION_MAINTENANCE_INTERVAL_S
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_MAINTENANCE_INTERVAL_S: int = 6 * 3600
+
+    # Preferences cache (also invalidated via Postgres NOTIFY when available)
+    PREFERENCES_CACHE_TTL_S: int = 30
+    # Versions of terminal jobs and resumes answering If-None-Match without a query
+    VERSION_CACHE_SIZE: int = 4096
+    VERSION_CACHE_TTL_S: int = 300
+    # Cache-Control max-age of terminal job details; a re-run changes the ETag, so clients
+    # that revalidate (fetch cache "no-cache") still see it immediately
+    JOB_TERMINAL_MAX_AGE_S: int = 86400
+
     # Kernel
     KERNEL_API_KEY: Optional[str] = None
     KERNEL_APP_NAME: Optional[str] = None
     KERNEL_ACTION_NAME: Optional[str] = None
     KERNEL_APP_VERSION: Optional[str] = None
+    # Browser sessions run concurrently per API process; queued jobs wait in the scheduler
+    KERNEL_MAX_CONCURRENCY: int = 4
+    # Per-strategy invocation timeout (seconds); JSON object in env, e.g. {"workday": 420}
+    KERNEL_TIMEOUT_PROFILES: Dict[str, int] = {"greenhouse": 180, "lever": 120, "workday": 420, "generic": 240}
+    KERNEL_DEFAULT_TIMEOUT_S: int = 240
+    # Learned form layouts sent with each invocation (most recently confirmed first)
+    FORM_MAPPINGS_PER_DOMAIN: int = 5
+    # Completion callbacks: with both set, the action POSTs its output to
+    # {KERNEL_CALLBACK_BASE_URL}/kernel/callbacks/{invocation_id} with a token signed by
+    # KERNEL_CALLBACK_SECRET, and the invocation status is only polled every
+    # KERNEL_CALLBACK_POLL_INTERVAL_S in case a callback is lost (else every KERNEL_POLL_INTERVAL_S).
+    # Bodies over KERNEL_CALLBACK_MAX_BYTES are refused
+    KERNEL_CALLBACK_BASE_URL: Optional[str] = None
+    KERNEL_CALLBACK_SECRET: Optional[str] = None
+    KERNEL_CALLBACK_MAX_BYTES: int = 1 << 20
+    KERNEL_POLL_INTERVAL_S: float = 2.0
+    KERNEL_CALLBACK_POLL_INTERVAL_S: float = 30.0
+
+    # Preflight: a plain HTTP fetch of the posting before a browser is launched. Closed or
+    # missing postings fail fast; results are cached per URL for PREFLIGHT_CACHE_TTL_S. Only http(s)
+    # URLs resolving to public addresses are fetched, on every redirect hop.
+    PREFLIGHT_ENABLED: bool = True
+    PREFLIGHT_TIMEOUT_S: float = 5.0
+    PREFLIGHT_CACHE_TTL_S: int = 600
+    PREFLIGHT_MAX_BYTES: int = 262144
+    PREFLIGHT_MAX_CONNECTIONS: int = 20
+
+    # Scheduler: jobs without a deadline get queued_at + SLACK - priority * STEP as a virtual
+    # deadline, so priority buys a head start but old jobs eventually outrank new urgent ones
+    SCHEDULER_SLACK_S: int = 3600
+    SCHEDULER_PRIORITY_STEP_S: int = 300
 
     # Optional tracing
     LANGSMITH_API_KEY: Optional[str] = None
+    # OTLP/HTTP collector base URL (e.g. http://localhost:4318); job spans are always stored in job_runs
+    OTEL_EXPORTER_OTLP_ENDPOINT: Optional[str] = None
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
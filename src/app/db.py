@@ -1,4 +1,4 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
@@ -36,12 +36,35 @@ def get_engine() -> AsyncEngine:
         database_url,
         future=True,
         pool_pre_ping=True,
-        connect_args={"ssl": True},
+        connect_args={"ssl": settings.DATABASE_SSL},
     )
 
 
-engine: AsyncEngine = get_engine()
-SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+# Created by the app lifespan (or on first use by CLI/bench code), not at import: importing
+# the app must not need a reachable database or a valid DATABASE_URL
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def init_engine() -> AsyncEngine:
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = get_engine()
+        _sessionmaker = async_sessionmaker(bind=_engine, expire_on_commit=False, class_=AsyncSession)
+    return _engine
+
+
+async def dispose_engine() -> None:
+    global _engine, _sessionmaker
+    engine, _engine, _sessionmaker = _engine, None, None
+    if engine is not None:
+        await engine.dispose()
+
+
+def SessionLocal() -> AsyncSession:
+    # Same call shape as the former module-level sessionmaker: `async with SessionLocal() as db`
+    init_engine()
+    return _sessionmaker()
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
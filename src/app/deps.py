@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import uuid
+from typing import Optional, Set
+
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import get_settings
+from .db import get_db_session
+from .models import User
+
+# Users are never deleted through the API, so known ids can be cached for the process lifetime
+_known_user_ids: Set[uuid.UUID] = set()
+_default_user_id: Optional[uuid.UUID] = None
+
+
+async def _get_or_create_default_user(db: AsyncSession) -> uuid.UUID:
+    global _default_user_id
+    if _default_user_id is not None:
+        return _default_user_id
+    email = get_settings().DEFAULT_USER_EMAIL
+    res = await db.execute(select(User.id).where(User.email == email))
+    user_id = res.scalar_one_or_none()
+    if user_id is None:
+        user = User(email=email)
+        db.add(user)
+        try:
+            await db.commit()
+            user_id = user.id
+        except IntegrityError:
+            # Created concurrently by another request/worker
+            await db.rollback()
+            res = await db.execute(select(User.id).where(User.email == email))
+            user_id = res.scalar_one()
+    _default_user_id = user_id
+    return user_id
+
+
+async def get_current_user_id(
+    x_user_id: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_db_session),
+) -> uuid.UUID:
+    if not x_user_id:
+        if get_settings().REQUIRE_USER_HEADER:
+            raise HTTPException(status_code=401, detail="X-User-Id header required")
+        return await _get_or_create_default_user(db)
+    try:
+        user_id = uuid.UUID(x_user_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid X-User-Id")
+    if user_id in _known_user_ids:
+        return user_id
+    res = await db.execute(select(User.id).where(User.id == user_id))
+    if res.scalar_one_or_none() is None:
+        raise HTTPException(status_code=401, detail="Unknown user")
+    _known_user_ids.add(user_id)
+    return user_id
@@ -1,15 +1,57 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_allowed_origins, get_settings
 from .routers import jobs as jobs_router
+from .routers import kernel as kernel_router
 from .routers import preferences as preferences_router
 from .routers import resumes as resumes_router
+from .routers import users as users_router
+from .db import SessionLocal, dispose_engine, init_engine
+from .services import kernel_callbacks, preferences_cache, preflight, resume_parser, version_cache
+from .services.partitions import maintainer as partition_maintainer
+from .services.notifications import listener
+from .services.scheduler import CANCEL_CHANNEL, enqueue_pending, scheduler
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not get_settings().REQUIRE_USER_HEADER:
+        logger.warning(
+            "REQUIRE_USER_HEADER is off: requests without X-User-Id act as the default user; "
+            "set it to true when an authenticating proxy sets the header"
+        )
+    # Pools and clients are created here, not at import, so importing the app stays cheap
+    init_engine()
+    await partition_maintainer.start()
+    # Cross-worker cache invalidation via Postgres LISTEN/NOTIFY
+    listener.subscribe(preferences_cache.CHANNEL, preferences_cache.cache.invalidate)
+    listener.subscribe(version_cache.CHANNEL, version_cache.cache.invalidate)
+    listener.subscribe(CANCEL_CHANNEL, scheduler.on_cancel_notification)
+    listener.subscribe(kernel_callbacks.CHANNEL, kernel_callbacks.waiters.wake)
+    await listener.start()
+    async with SessionLocal() as db:
+        await enqueue_pending(db, scheduler)
+    await scheduler.start()
+    try:
+        yield
+    finally:
+        await scheduler.stop()
+        await partition_maintainer.stop()
+        await listener.stop()
+        await resume_parser.close_client()
+        await preflight.checker.close()
+        await dispose_engine()
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
-    app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG)
+    app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG, lifespan=lifespan)
 
     # CORS
     app.add_middleware(
@@ -24,6 +66,8 @@ def create_app() -> FastAPI:
     app.include_router(resumes_router.router)
     app.include_router(preferences_router.router)
     app.include_router(jobs_router.router)
+    app.include_router(users_router.router)
+    app.include_router(kernel_router.router)
 
     return app
 
@@ -1,25 +1,56 @@
 import enum
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, Text, func
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .db import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class JobStatus(str, enum.Enum):
     queued = "queued"
     running = "running"
     succeeded = "succeeded"
     failed = "failed"
+    cancelled = "cancelled"
+
+
+class User(Base):
+    __tablename__ = "users"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    email: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
+    name: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
 
 
 class Resume(Base):
     __tablename__ = "resumes"
+    __table_args__ = (Index("ix_resumes_user_id_created_at", "user_id", "created_at"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
     r2_key: Mapped[str] = mapped_column(Text, nullable=False)
     file_name: Mapped[str] = mapped_column(Text, nullable=False)
     content_type: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -27,37 +58,171 @@ class Resume(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
 
     applications: Mapped[list["JobApplication"]] = relationship(
         back_populates="resume", cascade="all, delete-orphan"
     )
 
 
+class ResumeParseRun(Base):
+    # One row per parse attempt with the model usage it cost
+    __tablename__ = "resume_parse_runs"
+    __table_args__ = (Index("ix_resume_parse_runs_resume_id_created_at", "resume_id", "created_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    resume_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False
+    )
+    mode: Mapped[str | None] = mapped_column(String(16), nullable=True)  # local|single|sectioned
+    model: Mapped[str | None] = mapped_column(Text, nullable=True)
+    input_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    llm_calls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completion_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class AutofillAnswerIndex(Base):
+    # Normalized autofill answers for one parsed profile + preferences snapshot. Immutable:
+    # cache_key embeds the index version, the profile hash and the snapshot id.
+    __tablename__ = "autofill_answer_indexes"
+    __table_args__ = (
+        UniqueConstraint("resume_id", "cache_key", name="uq_autofill_answer_indexes_resume_id_cache_key"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    resume_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False
+    )
+    cache_key: Mapped[str] = mapped_column(Text, nullable=False)
+    data: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class CoverLetter(Base):
+    # Generated cover letter PDF in R2, reused for any job with the same parsed resume content,
+    # normalized posting URL and posting text
+    __tablename__ = "cover_letters"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "resume_hash",
+            "posting_key",
+            "posting_hash",
+            name="uq_cover_letters_user_id_resume_hash_posting_key_posting_hash",
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    resume_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    posting_key: Mapped[str] = mapped_column(Text, nullable=False)
+    # sha256 of the posting text the letter was written from ("" when it couldn't be read)
+    posting_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    r2_key: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class FormFieldMapping(Base):
+    # Field selector -> answer key for one form layout, reported by successful Kernel runs
+    __tablename__ = "form_field_mappings"
+    __table_args__ = (
+        UniqueConstraint(
+            "domain", "strategy", "fingerprint", name="uq_form_field_mappings_domain_strategy_fingerprint"
+        ),
+        Index("ix_form_field_mappings_domain_strategy_updated_at", "domain", "strategy", "updated_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    domain: Mapped[str] = mapped_column(Text, nullable=False)
+    strategy: Mapped[str] = mapped_column(String(32), nullable=False)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    fields: Mapped[list] = mapped_column(JSONB, nullable=False)
+    hits: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class UserPreferences(Base):
     __tablename__ = "user_preferences"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
     data: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
 
+class PreferencesSnapshot(Base):
+    # Immutable copy of each preferences version; jobs reference the version they run with
+    __tablename__ = "preferences_snapshots"
+    __table_args__ = (UniqueConstraint("user_id", "version", name="uq_preferences_snapshots_user_id_version"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class JobApplication(Base):
+    # Range-partitioned by created_at (monthly); the partition key must be part of the primary key
     __tablename__ = "job_applications"
+    __table_args__ = (
+        Index("ix_job_applications_user_id_created_at", "user_id", "created_at"),
+        Index("ix_job_applications_user_id_status_created_at", "user_id", "status", "created_at"),
+        Index("ix_job_applications_status_queued_at", "status", "queued_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
     target_url: Mapped[str] = mapped_column(Text, nullable=False)
     resume_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("resumes.id", ondelete="RESTRICT"), nullable=False)
     cover_letter_r2_key: Mapped[str | None] = mapped_column(Text, nullable=True)
+    preferences_snapshot_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("preferences_snapshots.id", ondelete="SET NULL"), nullable=True
+    )
     status: Mapped[JobStatus] = mapped_column(Enum(JobStatus, name="job_status"), nullable=False, default=JobStatus.queued)
+    # Scheduling: higher priority dispatches earlier; deadline also caps the Kernel timeout
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    deadline: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    queued_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     kernel_session_id: Mapped[str | None] = mapped_column(Text, nullable=True)
     persistence_id: Mapped[str | None] = mapped_column(Text, nullable=True)
     live_view_url: Mapped[str | None] = mapped_column(Text, nullable=True)
     result_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Set client-side so children can reference (id, created_at) before the row is flushed
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), primary_key=True, default=_utcnow, server_default=func.now(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
@@ -67,15 +232,26 @@ class JobApplication(Base):
     artifacts: Mapped[list["ApplicationArtifact"]] = relationship(
         back_populates="job_application", cascade="all, delete-orphan"
     )
+    runs: Mapped[list["JobRun"]] = relationship(back_populates="job_application", cascade="all, delete-orphan")
 
 
 class ApplicationArtifact(Base):
+    # Partitioned on the parent job's created_at so both tables share partition boundaries
     __tablename__ = "application_artifacts"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["job_application_id", "job_created_at"],
+            ["job_applications.id", "job_applications.created_at"],
+            ondelete="CASCADE",
+            name="fk_application_artifacts_job_application",
+        ),
+        Index("ix_application_artifacts_job_application_id", "job_application_id"),
+        {"postgresql_partition_by": "RANGE (job_created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    job_application_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("job_applications.id", ondelete="CASCADE"), nullable=False
-    )
+    job_application_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    job_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, nullable=False)
     type: Mapped[str] = mapped_column(String(32), nullable=False)  # screenshot|html|pdf
     r2_key: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
@@ -85,3 +261,47 @@ class ApplicationArtifact(Base):
     job_application: Mapped[JobApplication] = relationship(back_populates="artifacts")
 
 
+class JobRun(Base):
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["job_application_id", "job_created_at"],
+            ["job_applications.id", "job_applications.created_at"],
+            ondelete="CASCADE",
+            name="fk_job_runs_job_application",
+        ),
+        Index("ix_job_runs_job_application_id", "job_application_id"),
+        Index("ix_job_runs_strategy_started_at", "strategy", "started_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_application_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    job_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    trace_id: Mapped[str] = mapped_column(String(32), nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)  # succeeded|failed|cancelled
+    strategy: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    kernel_invocation_id: Mapped[str | None] = mapped_column(Text, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    notes: Mapped[list | None] = mapped_column(JSONB, nullable=True)  # Kernel action notes
+    spans: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    duration_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    job_application: Mapped[JobApplication] = relationship(back_populates="runs")
+
+
+class KernelCallback(Base):
+    # Registered by the runner when it creates the invocation, with the callback key it issued;
+    # the fill_job_form action's completion post fills in output. Posts for any other
+    # (invocation, key) pair are rejected
+    __tablename__ = "kernel_callbacks"
+    __table_args__ = (Index("ix_kernel_callbacks_created_at", "created_at"),)
+
+    invocation_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    callback_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    output: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    received_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,39 +1,147 @@
-from typing import List
+from datetime import datetime, timezone
+from typing import Dict, List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel, Field
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..config import get_settings
 from ..db import get_db_session
-from ..models import ApplicationArtifact, JobApplication
-from ..schemas import JobApplicationOut
-from ..services.job_runner import run_job
+from ..deps import get_current_user_id
+from ..models import ApplicationArtifact, JobApplication, JobRun, JobStatus, Resume
+from ..schemas import JobApplicationOut, JobRunOut
+from ..services.cover_letters import ensure_cover_letters
+from ..services.notifications import notify
+from ..services.projections import columns, fields_description, parse_fields, rows_response
+from ..services.preferences_cache import cache as preferences_cache
+from ..services.resume_matching import matcher
+from ..services.scheduler import CANCEL_CHANNEL, scheduler
+from ..services.version_cache import cache as versions
+from ..services.version_cache import etag_matches, publish_change, version_of, weak_etag
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
 class JobCreateIn(BaseModel):
     url: str
-    resume_id: UUID
+    # "auto" picks the parsed resume that best matches the posting
+    resume_id: UUID | Literal["auto"]
     cover_letter_r2_key: str | None = None
+    # Higher runs sooner; each step is worth SCHEDULER_PRIORITY_STEP_S of queueing time
+    priority: int = Field(default=0, ge=-10, le=10)
+    deadline: datetime | None = None
+
+
+class JobBulkCreateIn(BaseModel):
+    urls: List[str] = Field(min_length=1, max_length=500)
+    # "auto" picks the best matching parsed resume per posting
+    resume_id: UUID | Literal["auto"]
+    # Opt-in: a model call per uncached posting. Letters are cached per (resume content,
+    # posting), so resubmitting never regenerates them
+    generate_cover_letters: bool = False
+    priority: int = Field(default=0, ge=-10, le=10)
+    deadline: datetime | None = None
+
+
+class JobCancelIn(BaseModel):
+    # Filters are ANDed; only queued/running jobs are ever cancelled
+    job_ids: List[UUID] | None = None
+    statuses: List[Literal["queued", "running"]] = Field(default_factory=lambda: ["queued", "running"])
+    url_contains: str | None = None
+    created_before: datetime | None = None
+
+
+async def _get_user_job(db: AsyncSession, job_id: UUID, user_id: UUID) -> JobApplication:
+    stmt = select(JobApplication).where(JobApplication.id == job_id, JobApplication.user_id == user_id)
+    res = await db.execute(stmt)
+    job = res.scalars().first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+JOB_FIELDS = tuple(JobApplicationOut.model_fields)
+
+# Only a re-run changes these, and it publishes the change
+TERMINAL_STATUSES = (JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled)
+
+
+def _cache_control(terminal: bool) -> str:
+    return f"private, max-age={get_settings().JOB_TERMINAL_MAX_AGE_S}" if terminal else "no-cache"
+
+
+async def _get_job_versioned(
+    db: AsyncSession, request: Request, response: Response, job_id: UUID, user_id: UUID, kind: str
+) -> Optional[JobApplication]:
+    # None when the client's copy is current (the caller answers 304): from the cache for
+    # terminal jobs, else after loading the row
+    version = versions.get("job", job_id, user_id)
+    if version is not None and etag_matches(request, weak_etag(kind, version)):
+        response.headers.update({"ETag": weak_etag(kind, version), "Cache-Control": _cache_control(True)})
+        return None
+    job = await _get_user_job(db, job_id, user_id)
+    version = version_of(job.updated_at)
+    terminal = job.status in TERMINAL_STATUSES
+    if terminal:
+        versions.remember("job", job.id, user_id, version)
+    response.headers.update({"ETag": weak_etag(kind, version), "Cache-Control": _cache_control(terminal)})
+    return None if etag_matches(request, weak_etag(kind, version)) else job
+
+
+def _not_modified(response: Response) -> Response:
+    return Response(status_code=304, headers=dict(response.headers))
+
+
+async def _choose_resumes(db: AsyncSession, user_id: UUID, urls: List[str]) -> Dict[str, UUID]:
+    chosen = await matcher.choose(db, user_id, urls)
+    if not chosen:
+        raise HTTPException(status_code=404, detail="No parsed resume to choose from")
+    return chosen
 
 
 @router.get("", response_model=List[JobApplicationOut])
-async def list_jobs(db: AsyncSession = Depends(get_db_session)):
-    stmt = select(JobApplication).order_by(JobApplication.created_at.desc()).limit(100)
+async def list_jobs(
+    fields: Optional[str] = Query(default=None, description=fields_description(JOB_FIELDS)),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    names = parse_fields(fields, JOB_FIELDS)
+    stmt = (
+        select(*columns(JobApplication, names))
+        .where(JobApplication.user_id == user_id)
+        .order_by(JobApplication.created_at.desc())
+        .limit(limit)
+    )
     result = await db.execute(stmt)
-    jobs = result.scalars().all()
-    return jobs
+    return rows_response(result.all(), names)
 
 
 @router.post("", response_model=JobApplicationOut)
-async def create_job(body: JobCreateIn, db: AsyncSession = Depends(get_db_session)):
+async def create_job(
+    body: JobCreateIn,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    if body.resume_id == "auto":
+        resume_id = (await _choose_resumes(db, user_id, [body.url]))[body.url]
+    else:
+        res = await db.execute(select(Resume.id).where(Resume.id == body.resume_id, Resume.user_id == user_id))
+        resume_id = res.scalar_one_or_none()
+        if resume_id is None:
+            raise HTTPException(status_code=404, detail="Resume not found")
+    # Pin the preferences version at creation so runs never re-read user_preferences
+    prefs = await preferences_cache.current(db, user_id)
     job = JobApplication(
+        user_id=user_id,
         target_url=body.url,
-        resume_id=body.resume_id,
+        resume_id=resume_id,
         cover_letter_r2_key=body.cover_letter_r2_key,
+        preferences_snapshot_id=prefs.id,
+        priority=body.priority,
+        deadline=body.deadline,
     )
     db.add(job)
     await db.commit()
@@ -41,43 +149,168 @@ async def create_job(body: JobCreateIn, db: AsyncSession = Depends(get_db_sessio
     return job
 
 
+@router.post("/bulk", response_model=List[JobApplicationOut])
+async def create_jobs_bulk(
+    body: JobBulkCreateIn,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    max_urls = get_settings().COVER_LETTER_MAX_URLS
+    if body.generate_cover_letters and len(body.urls) > max_urls:
+        raise HTTPException(status_code=422, detail=f"At most {max_urls} URLs per request with cover letters")
+    if body.resume_id == "auto":
+        chosen = await _choose_resumes(db, user_id, body.urls)
+        resume_ids = set(chosen.values())
+    else:
+        resume_ids = {body.resume_id}
+        chosen = {url: body.resume_id for url in body.urls}
+    res = await db.execute(select(Resume).where(Resume.id.in_(resume_ids), Resume.user_id == user_id))
+    resumes = {resume.id: resume for resume in res.scalars()}
+    if len(resumes) != len(resume_ids):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    letters: Dict[str, str] = {}
+    if body.generate_cover_letters:
+        # Nothing is pending yet; don't hold a pooled connection open across the model calls
+        await db.commit()
+        for resume in resumes.values():
+            urls = [url for url in body.urls if chosen[url] == resume.id]
+            letters.update(await ensure_cover_letters(user_id, resume, urls))
+    prefs = await preferences_cache.current(db, user_id)
+    # One multi-row INSERT ... RETURNING instead of a flush and refresh per job
+    stmt = insert(JobApplication).returning(JobApplication)
+    rows = [
+        {
+            "user_id": user_id,
+            "target_url": url,
+            "resume_id": chosen[url],
+            "cover_letter_r2_key": letters.get(url),
+            "preferences_snapshot_id": prefs.id,
+            "priority": body.priority,
+            "deadline": body.deadline,
+        }
+        for url in body.urls
+    ]
+    jobs = list((await db.scalars(stmt, rows)).all())
+    await db.commit()
+    return jobs
+
+
 @router.post("/{job_id}/run", response_model=JobApplicationOut)
-async def run_job_endpoint(job_id: UUID, db: AsyncSession = Depends(get_db_session)):
-    stmt = select(JobApplication).where(JobApplication.id == job_id)
-    res = await db.execute(stmt)
-    job = res.scalars().first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+async def run_job_endpoint(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    job = await _get_user_job(db, job_id, user_id)
+    if job.status == JobStatus.running or (job.status == JobStatus.queued and job.queued_at is not None):
+        raise HTTPException(status_code=409, detail="Job already scheduled")
+    # A cancelled run keeps its task until Kernel is stopped and the result is written; a submit
+    # now would be dropped and leave the job queued with nothing behind it
+    if scheduler.holds(str(job.id)):
+        raise HTTPException(status_code=409, detail="Previous run still stopping; retry shortly")
 
-    # Mark running and dispatch background task
-    from ..models import JobStatus
+    # Persist as queued first so a restart re-enqueues it; the scheduler dispatches by deadline
+    job.status = JobStatus.queued
+    job.queued_at = datetime.now(timezone.utc)
+    job.error = None
+    await publish_change(db, "job", job.id)
+    await db.commit()
+    await db.refresh(job)
+    scheduler.submit_job(job)
+    return job
 
-    job.status = JobStatus.running
+
+async def _cancel_where(db: AsyncSession, user_id: UUID, *conditions) -> List[UUID]:
+    stmt = (
+        update(JobApplication)
+        .where(
+            JobApplication.user_id == user_id,
+            JobApplication.status.in_([JobStatus.queued, JobStatus.running]),
+            *conditions,
+        )
+        .values(status=JobStatus.cancelled)
+        .returning(JobApplication.id)
+        .execution_options(synchronize_session=False)
+    )
+    cancelled = list((await db.execute(stmt)).scalars().all())
+    # Other workers may own the queued entry or the running task
+    for job_id in cancelled:
+        await notify(db, CANCEL_CHANNEL, str(job_id))
     await db.commit()
+    for job_id in cancelled:
+        scheduler.cancel(str(job_id))
+    return cancelled
+
 
-    # fire-and-forget background task; production: use a queue
-    import asyncio
+@router.post("/cancel")
+async def cancel_jobs(
+    body: JobCancelIn,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    conditions = [JobApplication.status.in_([JobStatus(s) for s in body.statuses])]
+    if body.job_ids is not None:
+        conditions.append(JobApplication.id.in_(body.job_ids))
+    if body.url_contains:
+        conditions.append(JobApplication.target_url.contains(body.url_contains, autoescape=True))
+    if body.created_before is not None:
+        conditions.append(JobApplication.created_at < body.created_before)
+    cancelled = await _cancel_where(db, user_id, *conditions)
+    return {"cancelled": [str(job_id) for job_id in cancelled]}
 
-    _task = asyncio.create_task(run_job(str(job_id)))
+
+@router.post("/{job_id}/cancel", response_model=JobApplicationOut)
+async def cancel_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    job = await _get_user_job(db, job_id, user_id)
+    if job.status in (JobStatus.succeeded, JobStatus.failed):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status.value}")
+    if job.status != JobStatus.cancelled:
+        await _cancel_where(db, user_id, JobApplication.id == job_id)
     await db.refresh(job)
     return job
 
 
 @router.get("/{job_id}", response_model=JobApplicationOut)
-async def get_job(job_id: UUID, db: AsyncSession = Depends(get_db_session)):
-    stmt = select(JobApplication).where(JobApplication.id == job_id)
-    res = await db.execute(stmt)
-    job = res.scalars().first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-    return job
+async def get_job(
+    job_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    job = await _get_job_versioned(db, request, response, job_id, user_id, "job")
+    return _not_modified(response) if job is None else job
 
 
 @router.get("/{job_id}/artifacts")
-async def list_artifacts(job_id: UUID, db: AsyncSession = Depends(get_db_session)):
-    stmt = select(ApplicationArtifact).where(ApplicationArtifact.job_application_id == job_id)
+async def list_artifacts(
+    job_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    # The job's version covers its artifacts: the run that adds them also updates the job
+    job = await _get_job_versioned(db, request, response, job_id, user_id, "artifacts")
+    if job is None:
+        return _not_modified(response)
+    # Filtering on the partition key prunes to a single artifacts partition
+    stmt = select(ApplicationArtifact).where(
+        ApplicationArtifact.job_application_id == job.id,
+        ApplicationArtifact.job_created_at == job.created_at,
+    )
     res = await db.execute(stmt)
     arts = res.scalars().all()
     return [{"id": str(a.id), "type": a.type, "r2_key": a.r2_key, "created_at": a.created_at} for a in arts]
 
 
+@router.get("/{job_id}/runs", response_model=List[JobRunOut])
+async def list_runs(job_id: UUID, db: AsyncSession = Depends(get_db_session), user_id: UUID = Depends(get_current_user_id)):
+    job = await _get_user_job(db, job_id, user_id)
+    stmt = select(JobRun).where(JobRun.job_application_id == job.id).order_by(JobRun.started_at.desc())
+    res = await db.execute(stmt)
+    return res.scalars().all()
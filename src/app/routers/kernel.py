@@ -0,0 +1,53 @@
+from typing import Any, Dict
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..db import get_db_session
+from ..services import kernel_callbacks
+
+router = APIRouter(prefix="/kernel", tags=["kernel"])
+
+
+async def _read_output(request: Request) -> Dict[str, Any]:
+    # The action's output as a JSON object, read no further than KERNEL_CALLBACK_MAX_BYTES
+    limit = get_settings().KERNEL_CALLBACK_MAX_BYTES
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail="Callback body too large")
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail="Callback body too large")
+    try:
+        output = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=422, detail="Callback body is not JSON") from None
+    if not isinstance(output, dict):
+        raise HTTPException(status_code=422, detail="Callback body must be a JSON object")
+    return output
+
+
+@router.post("/callbacks/{invocation_id}", status_code=204)
+async def kernel_callback(
+    invocation_id: str,
+    request: Request,
+    authorization: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db_session),
+):
+    # Called by the fill_job_form action with its output; authenticated by the signed token
+    # issued with the invocation, not by user, and accepted only for the invocation it was
+    # registered with
+    key = kernel_callbacks.verify_token(authorization)
+    if key is None:
+        raise HTTPException(status_code=401, detail="Invalid callback token")
+    output = await _read_output(request)
+    if not await kernel_callbacks.record(db, invocation_id, key, output):
+        raise HTTPException(status_code=404, detail="No invocation registered for this token")
+    await db.commit()
+    # The NOTIFY wakes waiters in every worker; wake this one directly in case LISTEN is unavailable
+    kernel_callbacks.waiters.wake(invocation_id)
+    return Response(status_code=204)
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db_session
-from ..models import UserPreferences
+from ..deps import get_current_user_id
+from ..services.preferences_cache import cache, save_preferences
+from ..services.version_cache import etag_matches
 
 router = APIRouter(prefix="/preferences", tags=["preferences"])
 
@@ -14,24 +18,24 @@ class UpdatePreferencesRequest(BaseModel):
 
 
 @router.get("")
-async def get_preferences(db: AsyncSession = Depends(get_db_session)):
-    stmt = select(UserPreferences).limit(1)
-    res = await db.execute(stmt)
-    row = res.scalars().first()
-    return {"data": row.data if row else {}}
+async def get_preferences(
+    request: Request,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    # Served from the in-process cache; the session only connects on a cache miss
+    snap = await cache.current(db, user_id)
+    headers = {"ETag": snap.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, snap.etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse({"data": snap.data, "version": snap.version}, headers=headers)
 
 
 @router.put("")
-async def upsert_preferences(payload: UpdatePreferencesRequest, db: AsyncSession = Depends(get_db_session)):
-    stmt = select(UserPreferences).limit(1)
-    res = await db.execute(stmt)
-    row = res.scalars().first()
-    if row is None:
-        row = UserPreferences(data=payload.data)
-        db.add(row)
-    else:
-        row.data = payload.data
-    await db.commit()
-    return {"ok": True}
-
-
+async def upsert_preferences(
+    payload: UpdatePreferencesRequest,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    snap = await save_preferences(db, user_id, payload.data)
+    return JSONResponse({"ok": True, "version": snap.version}, headers={"ETag": snap.etag})
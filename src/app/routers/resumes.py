@@ -1,41 +1,70 @@
-from typing import List
+import time
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db_session
-from ..models import Resume
-from ..schemas import ResumeOut
+from ..deps import get_current_user_id
+from ..config import get_settings
+from ..models import Resume, ResumeParseRun
+from ..schemas import ResumeOut, ResumeParseRunOut
+from ..services.projections import columns, fields_description, parse_fields, rows_response
 from ..services.storage_r2 import build_resume_key, put_file
+from ..services.blob_cache import cache as blob_cache
 from ..services.resume_parser import parse_resume_from_r2_key
+from ..services.version_cache import cache as versions
+from ..services.version_cache import etag_matches, publish_change, version_of, weak_etag
 
 router = APIRouter(prefix="/resumes", tags=["resumes"])
 
 
+RESUME_FIELDS = tuple(ResumeOut.model_fields)
+
+
 @router.get("", response_model=List[ResumeOut])
-async def list_resumes(db: AsyncSession = Depends(get_db_session)):
-    stmt = select(Resume).order_by(Resume.created_at.desc()).limit(100)
+async def list_resumes(
+    # e.g. fields=file_name,created_at leaves out the parsed_profile JSONB
+    fields: Optional[str] = Query(default=None, description=fields_description(RESUME_FIELDS)),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    names = parse_fields(fields, RESUME_FIELDS)
+    stmt = (
+        select(*columns(Resume, names))
+        .where(Resume.user_id == user_id)
+        .order_by(Resume.created_at.desc())
+        .limit(limit)
+    )
     result = await db.execute(stmt)
-    resumes = result.scalars().all()
-    return resumes
+    return rows_response(result.all(), names)
 
 
 @router.post("", response_model=ResumeOut)
-async def upload_resume(file: UploadFile, db: AsyncSession = Depends(get_db_session)):
+async def upload_resume(
+    file: UploadFile,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
     if not file or not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
 
-    key = build_resume_key(file.filename)
+    key = build_resume_key(file.filename, user_id=user_id)
 
     try:
-        # Stream upload to R2
+        # Keep a local copy for the parse that usually follows, then stream the upload to R2;
+        # the copy is named by the key only once R2 has the object
+        staged = await blob_cache.stage(file.file)
         put_file(file.file, key, content_type=file.content_type)
+        await blob_cache.link(key, staged)
     finally:
         await file.close()
 
     resume = Resume(
+        user_id=user_id,
         r2_key=key,
         file_name=file.filename,
         content_type=file.content_type or "application/octet-stream",
@@ -46,24 +75,83 @@ async def upload_resume(file: UploadFile, db: AsyncSession = Depends(get_db_sess
     return resume
 
 
+@router.get("/{resume_id}", response_model=ResumeOut)
+async def get_resume(
+    resume_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    # Resumes only change by re-parsing, which publishes the change; polls revalidate
+    version = versions.get("resume", resume_id, user_id)
+    if version is not None and etag_matches(request, weak_etag("resume", version)):
+        return Response(status_code=304, headers={"ETag": weak_etag("resume", version), "Cache-Control": "no-cache"})
+    res = await db.execute(select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id))
+    resume = res.scalars().first()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    version = version_of(resume.updated_at)
+    versions.remember("resume", resume.id, user_id, version)
+    headers = {"ETag": weak_etag("resume", version), "Cache-Control": "no-cache"}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return resume
+
+
 @router.post("/{resume_id}/parse", response_model=ResumeOut)
-async def parse_resume(resume_id: UUID, db: AsyncSession = Depends(get_db_session)):
+async def parse_resume(
+    resume_id: UUID,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
     # Load resume
-    stmt = select(Resume).where(Resume.id == resume_id)
+    stmt = select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id)
     res = await db.execute(stmt)
     resume = res.scalars().first()
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    # Parse via Azure OpenAI using content from R2
+    # Parse via Azure OpenAI using content from R2; every attempt records its token usage
+    started = time.perf_counter()
+    run = ResumeParseRun(resume_id=resume.id, model=get_settings().AZURE_OPENAI_DEPLOYMENT)
     try:
         parsed = await parse_resume_from_r2_key(resume.r2_key)
     except Exception as e:
+        run.error = f"{type(e).__name__}: {e}"
+        run.duration_ms = int((time.perf_counter() - started) * 1000)
+        db.add(run)
+        await db.commit()
         raise HTTPException(status_code=500, detail=f"Parsing failed: {e}")
 
-    resume.parsed_profile = parsed
+    run.mode = parsed.mode
+    run.input_tokens = parsed.input_tokens
+    run.llm_calls = parsed.llm_calls
+    run.prompt_tokens = parsed.prompt_tokens
+    run.completion_tokens = parsed.completion_tokens
+    run.duration_ms = int((time.perf_counter() - started) * 1000)
+    db.add(run)
+    resume.parsed_profile = parsed.profile
+    await publish_change(db, "resume", resume.id)
     await db.commit()
     await db.refresh(resume)
     return resume
 
 
+@router.get("/{resume_id}/parse_runs", response_model=List[ResumeParseRunOut])
+async def list_parse_runs(
+    resume_id: UUID,
+    db: AsyncSession = Depends(get_db_session),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    stmt = (
+        select(ResumeParseRun)
+        .join(Resume, Resume.id == ResumeParseRun.resume_id)
+        .where(ResumeParseRun.resume_id == resume_id, Resume.user_id == user_id)
+        .order_by(ResumeParseRun.created_at.desc())
+    )
+    res = await db.execute(stmt)
+    return res.scalars().all()
+
+
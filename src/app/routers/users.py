@@ -0,0 +1,37 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import get_db_session
+from ..deps import get_current_user_id
+from ..models import User
+from ..schemas import UserOut
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+class UserCreateIn(BaseModel):
+    email: str
+    name: str | None = None
+
+
+@router.post("", response_model=UserOut)
+async def create_user(body: UserCreateIn, db: AsyncSession = Depends(get_db_session)):
+    user = User(email=body.email.strip().lower(), name=body.name)
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="User already exists")
+    await db.refresh(user)
+    return user
+
+
+@router.get("/me", response_model=UserOut)
+async def get_me(db: AsyncSession = Depends(get_db_session), user_id: UUID = Depends(get_current_user_id)):
+    res = await db.execute(select(User).where(User.id == user_id))
+    return res.scalars().one()
@@ -5,13 +5,42 @@ from uuid import UUID
 from pydantic import BaseModel, Field
 
 
+class UserOut(BaseModel):
+    id: UUID
+    email: str
+    name: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class ResumeOut(BaseModel):
     id: UUID
+    user_id: UUID
     r2_key: str
     file_name: str
     content_type: str
     parsed_profile: Optional[dict] = None
     created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ResumeParseRunOut(BaseModel):
+    id: UUID
+    resume_id: UUID
+    mode: Optional[str] = None
+    model: Optional[str] = None
+    input_tokens: int
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    duration_ms: int
+    error: Optional[str] = None
+    created_at: datetime
 
     class Config:
         from_attributes = True
@@ -28,10 +57,15 @@ class UserPreferencesOut(BaseModel):
 
 class JobApplicationOut(BaseModel):
     id: UUID
+    user_id: UUID
     target_url: str
     resume_id: UUID
     cover_letter_r2_key: Optional[str] = None
-    status: Literal["queued", "running", "succeeded", "failed"]
+    preferences_snapshot_id: Optional[UUID] = None
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    priority: int = 0
+    deadline: Optional[datetime] = None
+    queued_at: Optional[datetime] = None
     kernel_session_id: Optional[str] = None
     persistence_id: Optional[str] = None
     live_view_url: Optional[str] = None
@@ -55,3 +89,19 @@ class ApplicationArtifactOut(BaseModel):
         from_attributes = True
 
 
+class JobRunOut(BaseModel):
+    id: UUID
+    job_application_id: UUID
+    trace_id: str
+    status: str
+    strategy: Optional[str] = None
+    kernel_invocation_id: Optional[str] = None
+    error: Optional[str] = None
+    notes: Optional[list] = None
+    spans: list
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
+
+    class Config:
+        from_attributes = True
@@ -1,14 +1,46 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import inspect
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, TypedDict
 from urllib.parse import urlparse
 
 from langgraph.graph import StateGraph
 
+from ..config import get_settings
+from .preflight import checker as preflight_checker
+from .tracing import span
 
-class AgentState(dict):
-    # dict-backed state
-    pass
+
+class AgentState(TypedDict, total=False):
+    # Keys must be declared so LangGraph creates channels and passes them between nodes
+    url: str
+    plan: str
+    # Set by preflight: the URL after redirects, and why the posting is considered closed
+    final_url: str
+    closed_reason: Optional[str]
+    domain: str
+    strategy: str
+    kernel_result: Dict[str, Any]
+
+
+def traced_node(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    # Wrap a graph node so each execution is recorded as a `graph.<name>` span
+    if inspect.iscoroutinefunction(fn):
+
+        @wraps(fn)
+        async def async_wrapper(state: AgentState) -> AgentState:
+            with span(f"graph.{name}", **{"graph.node": name}):
+                return await fn(state)
+
+        return async_wrapper
+
+    @wraps(fn)
+    def sync_wrapper(state: AgentState) -> AgentState:
+        with span(f"graph.{name}", **{"graph.node": name}):
+            return fn(state)
+
+    return sync_wrapper
 
 
 def node_plan(state: AgentState) -> AgentState:
@@ -16,8 +48,25 @@ def node_plan(state: AgentState) -> AgentState:
     return state
 
 
-def node_route(state: AgentState) -> AgentState:
+async def node_preflight(state: AgentState) -> AgentState:
+    # Fetch the posting over plain HTTP: redirects resolve the real ATS, dead postings stop here
     url = state.get("url", "")
+    state["final_url"] = url
+    state["closed_reason"] = None
+    if not url or not get_settings().PREFLIGHT_ENABLED:
+        return state
+    result = await preflight_checker.check(url)
+    state["final_url"] = result.final_url
+    state["closed_reason"] = result.reason if result.closed else None
+    return state
+
+
+def after_preflight(state: AgentState) -> str:
+    return "closed" if state.get("closed_reason") else "open"
+
+
+def node_route(state: AgentState) -> AgentState:
+    url = state.get("final_url") or state.get("url", "")
     netloc = urlparse(url).netloc
     state["domain"] = netloc
     if "greenhouse.io" in netloc:
@@ -33,8 +82,9 @@ def node_route(state: AgentState) -> AgentState:
 
 def build_graph() -> StateGraph:
     graph = StateGraph(AgentState)
-    graph.add_node("plan", node_plan)
-    graph.add_node("route", node_route)
+    graph.add_node("plan", traced_node("plan", node_plan))
+    graph.add_node("preflight", traced_node("preflight", node_preflight))
+    graph.add_node("route", traced_node("route", node_route))
     # apply_via_kernel and finalize/handle_error will be plugged by the runner with closures
     return graph
 
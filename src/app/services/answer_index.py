@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import AutofillAnswerIndex
+from .preferences_cache import PreferencesVersion
+
+# Normalized answers for the Kernel action, computed once per (parsed profile, preferences
+# snapshot). The action normalizes each field's name/id/placeholder/aria/label text the same
+# way as `normalize_phrase` and looks the phrase (or its word n-grams) up in `synonyms`.
+# Bump INDEX_VERSION when the structure or derivation changes.
+INDEX_VERSION = 1
+
+SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "first_name": ("first name", "firstname", "given name", "given", "forename", "preferred first name"),
+    "last_name": ("last name", "lastname", "surname", "family name"),
+    "full_name": ("full name", "name", "your name", "legal name"),
+    "email": ("email", "email address", "e mail"),
+    "phone": ("phone", "phone number", "mobile", "mobile phone", "telephone", "cell"),
+    "linkedin": ("linkedin", "linkedin profile", "linkedin url"),
+    "github": ("github", "github url", "github profile"),
+    "website": ("website", "portfolio", "personal website", "portfolio url", "url"),
+    "address": ("address", "street", "street address", "address line 1"),
+    "city": ("city", "town"),
+    "state": ("state", "province", "region"),
+    "postal_code": ("zip", "zip code", "zipcode", "postal", "postal code", "postcode"),
+    "country": ("country",),
+    "location": ("location", "current location"),
+    "school": ("school", "university", "college"),
+    "degree": ("degree", "qualification"),
+    "company": ("company", "employer", "current company", "current employer"),
+    "title": ("title", "job title", "position", "current title"),
+    "start_date": ("start date", "start", "from"),
+    "end_date": ("end date", "end", "until"),
+    "gender": ("gender", "sex"),
+    "race_ethnicity": ("race", "ethnicity", "race ethnicity"),
+    "veteran_status": ("veteran", "veteran status", "protected veteran"),
+    "disability_status": ("disability", "disability status"),
+    "work_authorization": (
+        "work authorization",
+        "work authorisation",
+        "work auth",
+        "authorized to work",
+        "legally authorized",
+    ),
+    "visa_sponsorship_required": ("sponsorship", "require sponsorship", "visa sponsorship", "visa"),
+    "us_citizenship": ("citizenship", "us citizen", "citizen"),
+    "age_18_plus": ("over 18", "at least 18", "18 years"),
+    "has_criminal_history": ("criminal", "criminal history", "convicted", "felony"),
+    "earliest_start_date": ("earliest start date", "available start date", "availability date"),
+    "desired_salary": ("salary", "desired salary", "expected salary", "salary expectations", "compensation"),
+    "willing_to_travel": ("travel", "willing to travel"),
+}
+
+# Answered by picking the option whose label matches, not by typing
+CHOICE_KEYS = (
+    "gender",
+    "race_ethnicity",
+    "veteran_status",
+    "disability_status",
+    "work_authorization",
+    "visa_sponsorship_required",
+    "us_citizenship",
+    "age_18_plus",
+    "has_criminal_history",
+    "willing_to_travel",
+)
+
+# Older preference keys still stored by some clients
+_PREF_ALIASES = {"veteran": "veteran_status", "disability": "disability_status", "work_auth": "work_authorization"}
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_POSTAL_RE = re.compile(r"\b(\d{5}(?:-\d{4})?|[A-Z]\d[A-Z] ?\d[A-Z]\d|\d{4,6})\b")
+_STATE_RE = re.compile(r"^[A-Z]{2}$")
+_MONTHS = {m: i for i, m in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+_DATE_RE = re.compile(r"(?:(?P<mon>[a-z]{3})[a-z]*\.?\s+)?(?P<year>\d{4})(?:-(?P<mm>\d{2}))?", re.IGNORECASE)
+
+
+def normalize_phrase(text: str) -> str:
+    return _NON_ALNUM_RE.sub(" ", text.lower()).strip()
+
+
+def profile_hash(profile: Dict[str, Any]) -> str:
+    canonical = json.dumps(profile, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _first(items: Any) -> Dict[str, Any]:
+    return items[0] if isinstance(items, list) and items and isinstance(items[0], dict) else {}
+
+
+def _format_date(raw: Any) -> Optional[str]:
+    # "Jun 2019" / "2019-06" -> "2019-06"; "2019" stays a year
+    if not raw:
+        return None
+    m = _DATE_RE.search(str(raw))
+    if not m:
+        return str(raw)
+    month = _MONTHS.get((m.group("mon") or "").lower()[:3]) or (int(m.group("mm")) if m.group("mm") else None)
+    return f"{m.group('year')}-{month:02d}" if month else m.group("year")
+
+
+def _address_parts(address: Optional[str]) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    if not address:
+        return out
+    parts = [p.strip() for p in address.split(",") if p.strip()]
+    postal = _POSTAL_RE.search(parts[-1]) if parts else None
+    if postal:
+        out["postal_code"] = postal.group(1)
+        parts[-1] = (parts[-1][: postal.start()] + parts[-1][postal.end() :]).strip()
+        parts = [p for p in parts if p]
+    if parts and _STATE_RE.match(parts[-1]):
+        out["state"] = parts.pop()
+    elif len(parts) >= 3:
+        out["country"] = parts.pop()
+        out["state"] = parts.pop()
+    if parts:
+        out["city"] = parts[-1]
+    return out
+
+
+def _answer_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    text = str(value).strip()
+    return text or None
+
+
+def build_answer_index(profile: Dict[str, Any], prefs: Dict[str, Any]) -> Dict[str, Any]:
+    answers: Dict[str, Optional[str]] = {}
+    name = (profile.get("name") or "").strip()
+    parts = name.split()
+    answers["full_name"] = name or None
+    answers["first_name"] = parts[0] if parts else None
+    answers["last_name"] = " ".join(parts[1:]) if len(parts) > 1 else None
+    answers["email"] = profile.get("email")
+    answers["phone"] = profile.get("phone")
+
+    links: List[str] = [l for l in profile.get("links") or [] if isinstance(l, str)]
+    answers["linkedin"] = next((l for l in links if "linkedin.com" in l.lower()), None)
+    answers["github"] = next((l for l in links if "github.com" in l.lower()), None)
+    answers["website"] = next((l for l in links if not re.search(r"linkedin|github", l, re.IGNORECASE)), None)
+
+    address = profile.get("address")
+    answers["address"] = address
+    address_parts = _address_parts(address)
+    for key in ("city", "state", "postal_code", "country"):
+        answers[key] = address_parts.get(key)
+    answers["location"] = ", ".join(p for p in (address_parts.get("city"), address_parts.get("state")) if p) or None
+
+    edu = _first(profile.get("education"))
+    exp = _first(profile.get("experience"))
+    answers["school"] = edu.get("school")
+    answers["degree"] = edu.get("degree")
+    answers["company"] = exp.get("company")
+    answers["title"] = exp.get("title")
+    # Dates of the latest role (an open-ended role has no end date), else of the latest degree
+    dated = exp or edu
+    answers["start_date"] = _format_date(dated.get("start"))
+    answers["end_date"] = _format_date(dated.get("end"))
+
+    # Preferences: canonical keys first, then any other scalar answers under their own key
+    canonical_prefs = {_PREF_ALIASES.get(k, k): v for k, v in prefs.items()}
+    answers["work_authorization"] = _answer_text(canonical_prefs.get("work_authorization")) or profile.get("work_auth")
+    if canonical_prefs.get("country"):
+        answers["country"] = _answer_text(canonical_prefs["country"])
+    salary = [canonical_prefs.get(k) for k in ("desired_salary_min", "desired_salary_max")]
+    answers["desired_salary"] = _answer_text(salary[0] or salary[1])
+    extra_synonyms: Dict[str, str] = {}
+    for key, value in canonical_prefs.items():
+        if key in answers or key.startswith("desired_salary"):
+            continue
+        answers[key] = _answer_text(value)
+        if key not in SYNONYMS:
+            extra_synonyms[normalize_phrase(key)] = key
+
+    clean = {k: str(v) for k, v in answers.items() if v not in (None, "")}
+    # Only ship synonyms that lead to an answer; the first key listed for a phrase wins
+    synonyms: Dict[str, str] = {}
+    for key, phrases in SYNONYMS.items():
+        if key in clean:
+            for phrase in phrases:
+                synonyms.setdefault(phrase, key)
+    for phrase, key in extra_synonyms.items():
+        if key in clean:
+            synonyms.setdefault(phrase, key)
+    return {
+        "version": INDEX_VERSION,
+        "answers": clean,
+        "synonyms": synonyms,
+        "choices": [k for k in CHOICE_KEYS if k in clean],
+    }
+
+
+class AnswerIndexCache:
+    # In-process LRU in front of the autofill_answer_indexes table. Entries are immutable:
+    # the key covers the profile content and the preferences snapshot.
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self._entries: "OrderedDict[Tuple[uuid.UUID, str], Dict[str, Any]]" = OrderedDict()
+        self._max_entries = max_entries
+
+    def _remember(self, key: Tuple[uuid.UUID, str], index: Dict[str, Any]) -> None:
+        self._entries[key] = index
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(
+        self, db: AsyncSession, resume_id: uuid.UUID, profile: Dict[str, Any], prefs: PreferencesVersion
+    ) -> Dict[str, Any]:
+        cache_key = f"v{INDEX_VERSION}:{profile_hash(profile)}:{prefs.id.hex if prefs.id else 'none'}"
+        key = (resume_id, cache_key)
+        index = self._entries.get(key)
+        if index is not None:
+            self._entries.move_to_end(key)
+            return index
+        res = await db.execute(
+            select(AutofillAnswerIndex.data).where(
+                AutofillAnswerIndex.resume_id == resume_id, AutofillAnswerIndex.cache_key == cache_key
+            )
+        )
+        index = res.scalar_one_or_none()
+        if index is None:
+            index = build_answer_index(profile, prefs.data)
+            # Committed with the caller's transaction; concurrent runs may race to insert
+            await db.execute(
+                insert(AutofillAnswerIndex)
+                .values(id=uuid.uuid4(), resume_id=resume_id, cache_key=cache_key, data=index)
+                .on_conflict_do_nothing(index_elements=["resume_id", "cache_key"])
+            )
+        self._remember(key, index)
+        return index
+
+
+cache = AnswerIndexCache()
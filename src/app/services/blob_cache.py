@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from contextlib import asynccontextmanager
+from io import BytesIO
+from pathlib import Path
+from typing import IO, AsyncIterator, Dict, Iterable, Optional, Tuple
+
+from ..config import get_settings
+from .storage_r2 import get_s3_client
+
+# Local copies of R2 objects for anything that reads resume bytes. Content lives under
+# objects/<sha256 of the bytes> and refs/<sha256 of the key> names the content of a key, so one
+# file uploaded under two keys is stored once. Keys are treated as immutable (resume keys embed
+# a uuid). Files are written under a temporary name and renamed into place, so worker
+# processes can share the directory; an evicted file stays readable while it is mapped.
+
+_CHUNK_BYTES = 256 * 1024
+# Eviction frees down to this fraction of BLOB_CACHE_MAX_BYTES so it doesn't run on every insert
+_EVICT_TO = 0.9
+
+
+def _name(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class BlobCache:
+    def __init__(self) -> None:
+        self._root: Optional[Path] = None
+        # Key -> content digest; touched from worker threads (lookups, downloads, eviction)
+        self._refs: Dict[str, str] = {}
+        self._refs_lock = threading.Lock()
+        # Bytes under objects/, counted on first insert; only this process's view
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+        # Concurrent readers of one key share a single download
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _dir(self, sub: str) -> Path:
+        if self._root is None:
+            configured = get_settings().BLOB_CACHE_DIR
+            root = Path(configured) if configured else Path(tempfile.gettempdir()) / "kernel-job-agent-blobs"
+            for name in ("objects", "refs", "tmp"):
+                (root / name).mkdir(parents=True, exist_ok=True)
+            self._root = root
+        return self._root / sub
+
+    def _forget(self, key: str) -> None:
+        with self._refs_lock:
+            self._refs.pop(key, None)
+
+    def _lookup(self, key: str) -> Optional[Path]:
+        # Blocking file I/O: run in a worker thread
+        with self._refs_lock:
+            digest = self._refs.get(key)
+        if digest is None:
+            try:
+                digest = (self._dir("refs") / _name(key)).read_text().strip()
+            except FileNotFoundError:
+                return None
+        path = self._dir("objects") / digest
+        try:
+            # mtime is the LRU clock
+            os.utime(path)
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+        with self._refs_lock:
+            self._refs[key] = digest
+        return path
+
+    def _write_object(self, label: str, chunks: Iterable[bytes]) -> Tuple[str, Path]:
+        # (digest, path) of the content under objects/; nothing names it until _link
+        cap = get_settings().BLOB_MAX_OBJECT_BYTES
+        fd, tmp = tempfile.mkstemp(dir=self._dir("tmp"))
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > cap:
+                        raise RuntimeError(f"Object {label} exceeds {cap} bytes")
+                    digest.update(chunk)
+                    out.write(chunk)
+            path = self._dir("objects") / digest.hexdigest()
+            existed = path.exists()
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        if not existed:
+            self._added(size)
+        return digest.hexdigest(), path
+
+    def _link(self, key: str, digest: str) -> None:
+        ref_fd, ref_tmp = tempfile.mkstemp(dir=self._dir("tmp"))
+        with os.fdopen(ref_fd, "w") as ref:
+            ref.write(digest)
+        os.replace(ref_tmp, self._dir("refs") / _name(key))
+        with self._refs_lock:
+            self._refs[key] = digest
+
+    def _ingest(self, key: str, chunks: Iterable[bytes]) -> Path:
+        digest, path = self._write_object(key, chunks)
+        self._link(key, digest)
+        return path
+
+    def _download(self, key: str) -> Path:
+        # Runs in a worker thread: boto3 is blocking
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        settings = get_settings()
+        if not settings.R2_BUCKET:
+            raise RuntimeError("R2_BUCKET is not configured")
+        try:
+            resp = get_s3_client().get_object(Bucket=settings.R2_BUCKET, Key=key)
+            body = resp["Body"]
+            try:
+                # Refuse before reading when the size is known up front
+                if resp.get("ContentLength", 0) > settings.BLOB_MAX_OBJECT_BYTES:
+                    raise RuntimeError(
+                        f"Object {key} is {resp['ContentLength']} bytes (limit {settings.BLOB_MAX_OBJECT_BYTES})"
+                    )
+                return self._ingest(key, body.iter_chunks(_CHUNK_BYTES))
+            finally:
+                body.close()
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"Failed to fetch from R2: {e}")
+
+    def _added(self, size: int) -> None:
+        with self._lock:
+            objects = self._dir("objects")
+            if self._size is None:
+                self._size = sum(entry.stat().st_size for entry in os.scandir(objects))
+            else:
+                self._size += size
+            limit = get_settings().BLOB_CACHE_MAX_BYTES
+            if self._size <= limit:
+                return
+            entries = []
+            for entry in os.scandir(objects):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            for _, entry_size, entry_path in sorted(entries):
+                if self._size <= limit * _EVICT_TO:
+                    break
+                Path(entry_path).unlink(missing_ok=True)
+                self._size -= entry_size
+            # Refs to evicted content would only cost a failed lookup, but keep refs/ bounded too
+            live = {entry.name for entry in os.scandir(objects)}
+            for entry in os.scandir(self._dir("refs")):
+                try:
+                    digest = Path(entry.path).read_text().strip()
+                except FileNotFoundError:
+                    continue
+                if digest not in live:
+                    Path(entry.path).unlink(missing_ok=True)
+            with self._refs_lock:
+                self._refs = {key: digest for key, digest in self._refs.items() if digest in live}
+
+    async def path(self, key: str) -> Path:
+        # Local path of the object's bytes, downloading it on a miss
+        path = await asyncio.to_thread(self._lookup, key)
+        if path is not None:
+            return path
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(asyncio.to_thread(self._download, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    @asynccontextmanager
+    async def open(self, key: str) -> AsyncIterator[IO[bytes]]:
+        # Read-only memory map of the object (a file-like object with read/seek)
+        path = await self.path(key)
+        try:
+            f = await asyncio.to_thread(open, path, "rb")
+        except FileNotFoundError:
+            # Evicted by another worker between lookup and open
+            self._forget(key)
+            f = await asyncio.to_thread(open, await self.path(key), "rb")
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield BytesIO(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                yield view
+
+    async def stage(self, fileobj: IO[bytes]) -> Optional[str]:
+        # Local copy of bytes about to be uploaded, so the first read after the upload is already
+        # local; returns its digest for link(), None when it couldn't be kept. Leaves fileobj
+        # rewound for the upload.
+        fileobj.seek(0)
+        try:
+            digest, _ = await asyncio.to_thread(
+                self._write_object, "upload", iter(lambda: fileobj.read(_CHUNK_BYTES), b"")
+            )
+        except (RuntimeError, OSError):
+            # Best effort: too large or no disk space; readers fall back to downloading
+            digest = None
+        fileobj.seek(0)
+        return digest
+
+    async def link(self, key: str, digest: Optional[str]) -> None:
+        # Name staged bytes by key. Only after the upload succeeded: a cached key is served
+        # without asking R2, so a failed upload must leave no entry behind.
+        if digest is None:
+            return
+        try:
+            await asyncio.to_thread(self._link, key, digest)
+        except OSError:
+            pass
+
+    async def read(self, key: str) -> bytes:
+        async with self.open(key) as view:
+            return view.read()
+
+
+cache = BlobCache()
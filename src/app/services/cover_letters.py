@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import textwrap
+import uuid
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from ..config import get_settings
+from ..db import SessionLocal
+from ..models import CoverLetter, Resume
+from .answer_index import profile_hash
+from .preflight import checker
+from .resume_parser import get_azure_client
+from .resume_text import truncate_to_tokens
+from .storage_r2 import put_file
+
+logger = logging.getLogger(__name__)
+
+# Cover letters for bulk job creation. A letter depends only on the parsed resume and the
+# posting, so it is cached per (user, profile hash, normalized posting URL, posting text hash)
+# and a re-submitted or retried job reuses the PDF already in R2 instead of calling the model
+# again. The posting text is read through the preflight checker, whose cache the job's own
+# preflight then hits; postings it finds closed get no letter. Lookups and
+# inserts use their own short sessions, so the caller's transaction is never committed here.
+
+SYSTEM_PROMPT = (
+    "You write cover letters for job applications. Using the candidate profile, write a concise, "
+    "specific letter of three or four short paragraphs addressed to the hiring team at the company. "
+    "Mention concrete experience from the profile; do not invent facts, leave placeholders, or add "
+    "an address block. End with the candidate's name. Return plain text only."
+)
+
+# Query parameters that identify a click, not a posting
+_TRACKING_PARAMS = {"gh_src", "source", "src", "ref", "referrer", "lever-source", "lever-origin", "trk", "fbclid", "gclid"}
+_ATS_PATH_COMPANY = ("greenhouse.io", "lever.co", "ashbyhq.com", "workable.com")
+
+_LINE_CHARS = 92
+_LINES_PER_PAGE = 52
+
+_limiter: Optional[asyncio.Semaphore] = None
+
+
+def posting_key(url: str) -> str:
+    # Same posting however it was linked: no scheme, www, fragment, trailing slash or tracking
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower().removeprefix("www.")
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    key = f"{host}{parsed.path.rstrip('/')}"
+    return f"{key}?{urlencode(query)}" if query else key
+
+
+def company_name(url: str) -> str:
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().removeprefix("www.")
+    segments = [s for s in parsed.path.split("/") if s]
+    if any(host.endswith(ats) for ats in _ATS_PATH_COMPANY) and segments:
+        slug = segments[0]
+    else:
+        # careers.acme.com, acme.wd5.myworkdayjobs.com -> acme
+        labels = host.split(".")
+        slug = labels[-2] if len(labels) >= 2 and labels[0] in ("careers", "jobs", "boards") else labels[0]
+    return slug.replace("-", " ").replace("_", " ").title()
+
+
+def posting_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def letter_r2_key(user_id: uuid.UUID, resume_hash: str, key: str, text_hash: str) -> str:
+    # Deterministic, so concurrent generations of the same letter overwrite one object
+    digest = hashlib.sha256(f"{key}\n{text_hash}".encode()).hexdigest()[:16]
+    return f"cover-letters/{user_id}/{resume_hash[:16]}-{digest}.pdf"
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_letter_pdf(text: str) -> bytes:
+    # Plain Helvetica on US Letter with 1in margins; enough for a letter without a PDF library
+    lines: List[str] = []
+    for paragraph in text.strip().split("\n"):
+        lines.extend(textwrap.wrap(paragraph, _LINE_CHARS) or [""])
+    pages = [lines[i : i + _LINES_PER_PAGE] for i in range(0, len(lines), _LINES_PER_PAGE)] or [[]]
+
+    objects: List[bytes] = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for pid, page in zip(page_ids, pages):
+        objects.append(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>"
+            ).encode()
+        )
+        ops = ["BT", "/F1 11 Tf", "13 TL", "72 720 Td", *(f"({_pdf_escape(line)}) Tj T*" for line in page), "ET"]
+        stream = "\n".join(ops).encode("cp1252", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets: List[int] = []
+    for num, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+async def generate_letter_text(profile: Dict[str, Any], url: str, posting: str = "") -> str:
+    settings = get_settings()
+    deployment = settings.AZURE_OPENAI_DEPLOYMENT
+    if not deployment:
+        raise RuntimeError("AZURE_OPENAI_DEPLOYMENT not configured")
+    profile_json = truncate_to_tokens(
+        json.dumps(profile, ensure_ascii=False, default=str), settings.COVER_LETTER_PROFILE_MAX_TOKENS
+    )
+    # Without the posting text the model would have to guess the role and its requirements
+    posting_text = truncate_to_tokens(posting, settings.COVER_LETTER_POSTING_MAX_TOKENS) or "(not available)"
+    completion = await get_azure_client().chat.completions.create(
+        model=deployment,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": (
+                    f"Company: {company_name(url)}\nPosting: {url}\n\nPosting text:\n{posting_text}\n\n"
+                    f"Candidate profile:\n{profile_json}"
+                ),
+            },
+        ],
+        temperature=0.4,
+    )
+    content = (completion.choices[0].message.content or "").strip()
+    if not content:
+        raise RuntimeError("Empty cover letter from model")
+    return content
+
+
+def _get_limiter() -> asyncio.Semaphore:
+    # Process-wide, so concurrent bulk requests share the model-call budget
+    global _limiter
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(max(1, get_settings().COVER_LETTER_MAX_PARALLEL))
+    return _limiter
+
+
+async def _create_letter(
+    user_id: uuid.UUID, resume_hash: str, profile: Dict[str, Any], key: str, url: str, posting: str
+) -> str:
+    async with _get_limiter():
+        text = await generate_letter_text(profile, url, posting)
+    r2_key = letter_r2_key(user_id, resume_hash, key, posting_hash(posting))
+    # boto3 is blocking; the upload must not stall other requests' generations
+    await asyncio.to_thread(put_file, BytesIO(render_letter_pdf(text)), r2_key, "application/pdf")
+    return r2_key
+
+
+async def _posting_texts(urls_by_key: Dict[str, str]) -> Dict[str, Optional[str]]:
+    # posting key -> visible text ("" when unread), None for postings preflight found closed
+    if not get_settings().PREFLIGHT_ENABLED:
+        return {key: "" for key in urls_by_key}
+    results = await asyncio.gather(*(checker.check(url) for url in urls_by_key.values()))
+    return {key: None if result.closed else result.text for key, result in zip(urls_by_key, results)}
+
+
+async def ensure_cover_letters(user_id: uuid.UUID, resume: Resume, urls: Sequence[str]) -> Dict[str, str]:
+    # url -> R2 key, generating only uncached letters; failed and closed postings are left out
+    # and their jobs run without a cover letter
+    profile = resume.parsed_profile
+    if not profile:
+        return {}
+    resume_hash = profile_hash(profile)
+    urls_by_key: Dict[str, str] = {}
+    for url in urls:
+        urls_by_key.setdefault(posting_key(url), url)
+    postings = {key: text for key, text in (await _posting_texts(urls_by_key)).items() if text is not None}
+    hashes = {key: posting_hash(text) for key, text in postings.items()}
+
+    found: Dict[str, str] = {}
+    async with SessionLocal() as db:
+        res = await db.execute(
+            select(CoverLetter.posting_key, CoverLetter.posting_hash, CoverLetter.r2_key).where(
+                CoverLetter.user_id == user_id,
+                CoverLetter.resume_hash == resume_hash,
+                CoverLetter.posting_key.in_(list(postings)),
+            )
+        )
+        for key, text_hash, r2_key in res.all():
+            if hashes[key] == text_hash:
+                found[key] = r2_key
+    missing = [key for key in postings if key not in found]
+    if missing:
+        # A fixed pool of workers rather than a task per posting; the limiter still bounds
+        # model calls across concurrent requests
+        pending = iter(missing)
+        rows: List[Dict[str, Any]] = []
+
+        async def work() -> None:
+            for key in pending:
+                url = urls_by_key[key]
+                try:
+                    r2_key = await _create_letter(user_id, resume_hash, profile, key, url, postings[key])
+                except Exception as e:
+                    logger.warning("Cover letter for %s failed: %s", url, e)
+                    continue
+                found[key] = r2_key
+                rows.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": user_id,
+                        "resume_hash": resume_hash,
+                        "posting_key": key,
+                        "posting_hash": hashes[key],
+                        "r2_key": r2_key,
+                    }
+                )
+
+        workers = min(len(missing), max(1, get_settings().COVER_LETTER_MAX_PARALLEL))
+        await asyncio.gather(*(work() for _ in range(workers)))
+        if rows:
+            async with SessionLocal() as db:
+                await db.execute(
+                    insert(CoverLetter)
+                    .values(rows)
+                    .on_conflict_do_nothing(
+                        index_elements=["user_id", "resume_hash", "posting_key", "posting_hash"]
+                    )
+                )
+                await db.commit()
+    return {url: found[posting_key(url)] for url in urls if posting_key(url) in found}
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import re
+import uuid
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..models import FormFieldMapping
+
+# Per-domain form layouts learned by fill_job_form. A run reports the selectors it resolved to
+# answer keys under a fingerprint of the form's fields; later runs on the same domain/strategy
+# get them back as `knownMappings` and fill a matching form by direct selectors.
+
+MAX_FIELDS = 200
+MAX_SELECTOR_LEN = 300
+_FINGERPRINT_RE = re.compile(r"^[0-9a-f]{16,64}$")
+_KEY_RE = re.compile(r"^[a-z0-9_]{1,64}$")
+
+
+def clean_mapping(reported: Any) -> Optional[Dict[str, Any]]:
+    # Action output is untrusted: keep well-formed fields only
+    if not isinstance(reported, dict):
+        return None
+    fingerprint = reported.get("fingerprint")
+    fields = reported.get("fields")
+    if not isinstance(fingerprint, str) or not _FINGERPRINT_RE.match(fingerprint) or not isinstance(fields, list):
+        return None
+    cleaned: List[Dict[str, str]] = []
+    for item in fields[:MAX_FIELDS]:
+        if not isinstance(item, dict):
+            continue
+        selector, key = item.get("selector"), item.get("key")
+        if isinstance(selector, str) and 0 < len(selector) <= MAX_SELECTOR_LEN and isinstance(key, str) and _KEY_RE.match(key):
+            cleaned.append({"selector": selector, "key": key})
+    if not cleaned:
+        return None
+    return {"fingerprint": fingerprint, "fields": cleaned}
+
+
+async def known_mappings(db: AsyncSession, domain: str, strategy: str) -> List[Dict[str, Any]]:
+    res = await db.execute(
+        select(FormFieldMapping.fingerprint, FormFieldMapping.fields)
+        .where(FormFieldMapping.domain == domain, FormFieldMapping.strategy == strategy)
+        .order_by(FormFieldMapping.updated_at.desc())
+        .limit(get_settings().FORM_MAPPINGS_PER_DOMAIN)
+    )
+    return [{"fingerprint": fingerprint, "fields": fields} for fingerprint, fields in res.all()]
+
+
+async def record_mapping(db: AsyncSession, domain: str, strategy: str, reported: Any) -> bool:
+    # Upsert within the caller's transaction; the latest report for a layout wins
+    mapping = clean_mapping(reported)
+    if mapping is None:
+        return False
+    stmt = insert(FormFieldMapping).values(
+        id=uuid.uuid4(), domain=domain, strategy=strategy, fingerprint=mapping["fingerprint"], fields=mapping["fields"]
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["domain", "strategy", "fingerprint"],
+            set_={"fields": stmt.excluded.fields, "hits": FormFieldMapping.hits + 1, "updated_at": func.now()},
+        )
+    )
+    return True
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
 import asyncio
+from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 from urllib.parse import urlparse
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..config import get_settings
 from ..db import SessionLocal
-from ..models import JobApplication, Resume, JobStatus, UserPreferences
-from ..services.agent_graph import build_graph, AgentState
+from ..models import JobApplication, JobRun, Resume, JobStatus
+from ..services import field_mappings, tracing
+from ..services.preferences_cache import cache as preferences_cache
+from ..services.answer_index import cache as answer_index_cache
+from ..services.agent_graph import after_preflight, build_graph, traced_node, AgentState
 from ..services.kernel_client import KernelClient
 from ..services.storage_r2 import get_presigned_get_url
+from ..services.version_cache import publish_change
 
 
 async def run_job(job_id: str) -> None:
@@ -21,25 +27,123 @@ async def run_job(job_id: str) -> None:
         await _run_job_with_session(db, job_id)
 
 
+def _kernel_output_value(result: Any, key: str, kind: type) -> Any:
+    # Kernel action output fields may be nested like the summary fields
+    nested = result.get("result") if isinstance(result, dict) else None
+    output = nested.get("output") if isinstance(nested, dict) else None
+    for candidate in (output, nested, result):
+        if isinstance(candidate, dict) and isinstance(candidate.get(key), kind):
+            return candidate[key]
+    return None
+
+
+def _kernel_notes(result: Any) -> list | None:
+    return _kernel_output_value(result, "notes", list)
+
+
+def kernel_timeout_s(strategy: Optional[str], deadline: Optional[datetime]) -> int:
+    # Per-ATS timeout profile, cut short so the invocation never outlives the job's deadline
+    settings = get_settings()
+    timeout_s = settings.KERNEL_TIMEOUT_PROFILES.get(strategy or "generic", settings.KERNEL_DEFAULT_TIMEOUT_S)
+    if deadline is not None:
+        remaining = int((deadline - datetime.now(timezone.utc)).total_seconds())
+        if remaining <= 0:
+            raise RuntimeError("Deadline passed before the application started")
+        timeout_s = min(timeout_s, remaining)
+    return timeout_s
+
+
 async def _run_job_with_session(db: AsyncSession, job_id: str) -> None:
-    # Load job + resume
+    # Claim the job atomically: it may have been enqueued by more than one worker
     job_uuid = uuid.UUID(job_id)
+    claim = (
+        update(JobApplication)
+        .where(JobApplication.id == job_uuid, JobApplication.status == JobStatus.queued)
+        .values(status=JobStatus.running)
+        .returning(JobApplication.id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = (await db.execute(claim)).scalar_one_or_none()
+    await db.commit()
+    if claimed is None:
+        return
+
+    # Load job + resume
     stmt = select(JobApplication).where(JobApplication.id == job_uuid)
     res = await db.execute(stmt)
     job = res.scalars().first()
     if not job:
         return
 
-    job.status = JobStatus.running
+    run_info: Dict[str, Any] = {}
+    started_at = datetime.now(timezone.utc)
+    cancelled = False
+    with tracing.start_trace() as trace:
+        with tracing.span("job.run", **{"job.id": job_id, "job.url": job.target_url}) as root:
+            try:
+                await _execute_graph(db, job, run_info)
+            except asyncio.CancelledError:
+                # Cancelled via the API (any worker) or by shutdown; Kernel was already told to stop
+                cancelled = True
+                await db.rollback()
+                await db.refresh(job)
+                if job.status != JobStatus.cancelled:
+                    job.status = JobStatus.failed
+                    job.error = "Run interrupted"
+                run_info["error"] = "CancelledError"
+                await publish_change(db, "job", job.id)
+                await db.commit()
+            finally:
+                root.set_attribute("job.status", job.status.value)
+                if job.error or cancelled:
+                    root.status = "error"
+
+    finished_at = datetime.now(timezone.utc)
+    db.add(
+        JobRun(
+            job_application_id=job.id,
+            job_created_at=job.created_at,
+            trace_id=trace.trace_id,
+            status=job.status.value,
+            strategy=run_info.get("strategy"),
+            kernel_invocation_id=run_info.get("invocation_id"),
+            error=run_info.get("error") or job.error,
+            notes=_kernel_notes(run_info.get("kernel_result")),
+            spans=trace.to_list(),
+            started_at=started_at,
+            finished_at=finished_at,
+            duration_ms=int((finished_at - started_at).total_seconds() * 1000),
+        )
+    )
     await db.commit()
+    await tracing.export_trace(trace)
+    if cancelled:
+        raise asyncio.CancelledError()
 
+
+async def _commit_final(db: AsyncSession, job: JobApplication) -> None:
+    # Lock the row so a concurrent cancel either lands first (and is kept) or waits for this commit
+    with db.no_autoflush:
+        res = await db.execute(
+            select(JobApplication.status)
+            .where(JobApplication.id == job.id, JobApplication.created_at == job.created_at)
+            .with_for_update()
+        )
+    if res.scalar_one_or_none() == JobStatus.cancelled:
+        job.status = JobStatus.cancelled
+    # A job cancelled mid-run is already terminal and may be cached by its old version
+    await publish_change(db, "job", job.id)
+    await db.commit()
+
+
+async def _execute_graph(db: AsyncSession, job: JobApplication, run_info: Dict[str, Any]) -> None:
     stmt_r = select(Resume).where(Resume.id == job.resume_id)
     res_r = await db.execute(stmt_r)
     resume = res_r.scalars().first()
     if not resume:
         job.status = JobStatus.failed
         job.error = "Resume not found"
-        await db.commit()
+        await _commit_final(db, job)
         return
 
     # Build graph
@@ -47,22 +151,44 @@ async def _run_job_with_session(db: AsyncSession, job_id: str) -> None:
 
     async def apply_via_kernel(state: AgentState) -> AgentState:
         kernel = KernelClient()
-        resume_url = get_presigned_get_url(resume.r2_key)
-        # Load preferences (single row MVP)
-        prefs_stmt = select(UserPreferences).limit(1)
-        prefs_res = await db.execute(prefs_stmt)
-        prefs_row = prefs_res.scalars().first()
-        prefs_data: Dict[str, Any] = (prefs_row.data if prefs_row else {})
-        domain = urlparse(job.target_url).netloc
+        r2_assets = {"resumeUrl": get_presigned_get_url(resume.r2_key)}
+        if job.cover_letter_r2_key:
+            r2_assets["coverLetterUrl"] = get_presigned_get_url(job.cover_letter_r2_key)
+        # Preferences pinned at job creation; served from the in-process snapshot cache
+        if job.preferences_snapshot_id:
+            prefs = await preferences_cache.by_id(db, job.preferences_snapshot_id, job.user_id)
+        else:
+            prefs = await preferences_cache.current(db, job.user_id)
+        # Normalized answers precomputed per (profile, snapshot) instead of raw profile/prefs
+        answers = await answer_index_cache.get(db, resume.id, resume.parsed_profile or {}, prefs)
+        # Preflight already followed redirects; start the browser on the final URL
+        url = state.get("final_url") or job.target_url
+        domain = state.get("domain") or urlparse(url).netloc
+        strategy = state.get("strategy") or "generic"
+        job.persistence_id = f"{domain}:{job.user_id}"
+        run_info["strategy"] = state.get("strategy")
+        timeout_s = kernel_timeout_s(state.get("strategy"), job.deadline)
+        # Layouts learned on this domain let the action skip the heuristic DOM scan
+        known = await field_mappings.known_mappings(db, domain, strategy)
         payload: Dict[str, Any] = {
-            "url": job.target_url,
-            "profile": resume.parsed_profile or {},
-            "prefs": prefs_data,
-            "r2Assets": {"resumeUrl": resume_url},
-            "persistenceId": f"{domain}:single-user",
+            "url": url,
+            "answers": answers,
+            "knownMappings": known,
+            "r2Assets": r2_assets,
+            "persistenceId": job.persistence_id,
             "takeProofScreenshots": True,
         }
-        result = await kernel.invoke_fill_job_form(payload)
+        # Don't hold a pooled connection across the browser session: with many jobs running, the
+        # callback endpoint and callback lookups would be starved of connections
+        await publish_change(db, "job", job.id)
+        await db.commit()
+        result = await kernel.invoke_fill_job_form(payload, timeout_s=timeout_s)
+        run_info["kernel_result"] = result
+        run_info["invocation_id"] = result.get("invocation_id") if isinstance(result, dict) else None
+        if run_info["invocation_id"]:
+            job.kernel_session_id = run_info["invocation_id"]
+        if _kernel_output_value(result, "status", str) == "succeeded":
+            await field_mappings.record_mapping(db, domain, strategy, _kernel_output_value(result, "mapping", dict))
         state["kernel_result"] = result
         return state
 
@@ -70,7 +196,9 @@ async def _run_job_with_session(db: AsyncSession, job_id: str) -> None:
         result = state.get("kernel_result", {}) or {}
         # Update DB with results
         try:
-            job.status = JobStatus.succeeded
+            # Failed and cancelled invocations come back as results too, polled or called back
+            kernel_status = result.get("status") if isinstance(result, dict) else None
+            job.status = JobStatus.failed if kernel_status in ("failed", "cancelled") else JobStatus.succeeded
 
             def safe_get(d: dict | None, key: str) -> str | None:
                 if isinstance(d, dict):
@@ -102,22 +230,33 @@ async def _run_job_with_session(db: AsyncSession, job_id: str) -> None:
                 or safe_get(output if isinstance(output, dict) else None, "live_view_url")
             )
             job.error = None
+            if job.status == JobStatus.failed:
+                job.error = job.result_summary or f"Kernel invocation {kernel_status}"
         except Exception as e:  # noqa: BLE001
             job.status = JobStatus.failed
             job.error = str(e)
         return state
 
+    def posting_closed(state: AgentState) -> AgentState:
+        # Nothing to apply to: fail without spending a Kernel browser
+        job.status = JobStatus.failed
+        job.error = f"Posting closed: {state.get('closed_reason')}"
+        run_info["error"] = "PostingClosed"
+        return state
+
     def handle_error(state: AgentState) -> AgentState:
         job.status = JobStatus.failed
         job.error = "Graph execution failed"
         return state
 
-    graph.add_node("apply_via_kernel", apply_via_kernel)
-    graph.add_node("finalize", finalize)
-    graph.add_node("handle_error", handle_error)
+    graph.add_node("apply_via_kernel", traced_node("apply_via_kernel", apply_via_kernel))
+    graph.add_node("finalize", traced_node("finalize", finalize))
+    graph.add_node("posting_closed", traced_node("posting_closed", posting_closed))
+    graph.add_node("handle_error", traced_node("handle_error", handle_error))
 
     graph.set_entry_point("plan")
-    graph.add_edge("plan", "route")
+    graph.add_edge("plan", "preflight")
+    graph.add_conditional_edges("preflight", after_preflight, {"open": "route", "closed": "posting_closed"})
     graph.add_edge("route", "apply_via_kernel")
     graph.add_edge("apply_via_kernel", "finalize")
     # Compile graph to executable app that supports async invocation
@@ -125,10 +264,11 @@ async def _run_job_with_session(db: AsyncSession, job_id: str) -> None:
 
     try:
         await app.ainvoke(AgentState({"url": job.target_url}))
-        await db.commit()
+        await _commit_final(db, job)
     except Exception as e:  # noqa: BLE001
         job.status = JobStatus.failed
         job.error = str(e)
-        await db.commit()
+        run_info["error"] = f"{type(e).__name__}: {e}"
+        await _commit_final(db, job)
 
 
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import secrets
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import cast, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..db import SessionLocal
+from ..models import KernelCallback
+from .notifications import notify
+
+# Push completion of Kernel invocations. Each invocation gets a random callback key and a token
+# "<key>.<expiry>.<hmac of both>"; Kernel assigns the invocation id only after the payload with
+# the token is sent, so the token can't carry it. Instead the runner registers the
+# (invocation id, key) pair as soon as the invocation exists, and a callback is accepted only for
+# a registered pair with an unexpired token: a leaked token can't complete another invocation,
+# nor its own after it expires. The posted output is stored on the row and CHANNEL is notified;
+# the worker waiting on the invocation wakes and reads it. Delivery is never relied on: the
+# waiting runner keeps polling Kernel, just rarely, and a callback that beats its registration
+# is refused and left to that poll.
+
+CHANNEL = "kernel_callback"
+# Tokens outlive the invocation's own timeout by this much (slow delivery, retries)
+TOKEN_GRACE_S = 600
+
+
+def enabled() -> bool:
+    settings = get_settings()
+    return bool(settings.KERNEL_CALLBACK_BASE_URL and settings.KERNEL_CALLBACK_SECRET)
+
+
+def _sign(key: str, expires_at: int) -> str:
+    secret = get_settings().KERNEL_CALLBACK_SECRET or ""
+    return hmac.new(secret.encode(), f"{key}.{expires_at}".encode(), hashlib.sha256).hexdigest()
+
+
+def new_callback(ttl_s: float) -> Tuple[str, Dict[str, str]]:
+    # (key, "callback" field of the action payload); the action appends its invocation id
+    key = secrets.token_hex(16)
+    expires_at = int(time.time() + ttl_s + TOKEN_GRACE_S)
+    url = f"{(get_settings().KERNEL_CALLBACK_BASE_URL or '').rstrip('/')}/kernel/callbacks"
+    return key, {"url": url, "token": f"{key}.{expires_at}.{_sign(key, expires_at)}"}
+
+
+def verify_token(authorization: Optional[str]) -> Optional[str]:
+    # Callback key of a valid, unexpired "Bearer <token>", else None (also when callbacks are disabled)
+    if not authorization or not get_settings().KERNEL_CALLBACK_SECRET:
+        return None
+    key, _, rest = authorization.removeprefix("Bearer ").strip().partition(".")
+    expires, _, signature = rest.partition(".")
+    if not key or not expires.isdigit() or int(expires) < time.time():
+        return None
+    return key if hmac.compare_digest(signature, _sign(key, int(expires))) else None
+
+
+async def register(invocation_id: str, key: str) -> None:
+    # The runner's claim on callbacks for its invocation, committed before it starts waiting
+    async with SessionLocal() as db:
+        await db.execute(
+            insert(KernelCallback)
+            .values(invocation_id=invocation_id, callback_key=key)
+            .on_conflict_do_nothing(index_elements=["invocation_id", "callback_key"])
+        )
+        await db.commit()
+
+
+async def record(db: AsyncSession, invocation_id: str, key: str, output: Dict[str, Any]) -> bool:
+    # False when the pair was never registered; the first delivery wins and retries are no-ops
+    res = await db.execute(
+        update(KernelCallback)
+        .where(KernelCallback.invocation_id == invocation_id, KernelCallback.callback_key == key)
+        .values(
+            output=func.coalesce(KernelCallback.output, cast(output, JSONB)),
+            received_at=func.coalesce(KernelCallback.received_at, func.now()),
+        )
+        .returning(KernelCallback.invocation_id)
+        .execution_options(synchronize_session=False)
+    )
+    if res.scalar_one_or_none() is None:
+        return False
+    await notify(db, CHANNEL, invocation_id)
+    return True
+
+
+async def fetch(invocation_id: str, key: str) -> Optional[Dict[str, Any]]:
+    # Posted output of the invocation, None until a callback under this key has arrived
+    async with SessionLocal() as db:
+        res = await db.execute(
+            select(KernelCallback.output).where(
+                KernelCallback.invocation_id == invocation_id, KernelCallback.callback_key == key
+            )
+        )
+        return res.scalar_one_or_none()
+
+
+class CallbackWaiters:
+    # Invocations this process is waiting on; woken by NOTIFY from whichever worker got the callback
+
+    def __init__(self) -> None:
+        self._events: Dict[str, asyncio.Event] = {}
+
+    def register(self, invocation_id: str) -> asyncio.Event:
+        return self._events.setdefault(invocation_id, asyncio.Event())
+
+    def discard(self, invocation_id: str) -> None:
+        self._events.pop(invocation_id, None)
+
+    def wake(self, payload: Optional[str] = None) -> None:
+        # None after a listener reconnect: callbacks may have been missed, so everyone re-checks
+        events = list(self._events.values()) if payload is None else [self._events.get(payload)]
+        for event in events:
+            if event is not None:
+                event.set()
+
+
+waiters = CallbackWaiters()
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import asyncio
 import json
+import time
 from typing import Any, Dict, Optional
 
 from ..config import get_settings
+from . import kernel_callbacks
+from .tracing import Span, span
 
 
 class KernelClient:
@@ -21,48 +24,135 @@ class KernelClient:
         self._app_version = settings.KERNEL_APP_VERSION or "latest"
 
     async def invoke_fill_job_form(self, payload: Dict[str, Any], *, timeout_s: int = 120) -> Dict[str, Any]:
-        # Create async invocation and poll until completion or timeout
-        inv = self._kernel.invocations.create(
-            action_name=self._action_name,
-            app_name=self._app_name,
-            version=self._app_version,
-            async_=True,
-            payload=json.dumps(payload),
-        )
+        with span(
+            "kernel.invoke",
+            **{"kernel.app": self._app_name, "kernel.action": self._action_name, "kernel.timeout_s": timeout_s},
+        ) as sp:
+            result = await self._invoke_and_wait(payload, timeout_s=timeout_s, sp=sp)
+            sp.set_attribute("kernel.status", result.get("status"))
+            return result
+
+    async def _invoke_and_wait(self, payload: Dict[str, Any], *, timeout_s: int, sp: Span) -> Dict[str, Any]:
+        # Create async invocation and wait for its callback, polling until completion or timeout
+        settings = get_settings()
+        callback_key: Optional[str] = None
+        if kernel_callbacks.enabled():
+            callback_key, callback = kernel_callbacks.new_callback(timeout_s)
+            payload = {**payload, "callback": callback}
+        with span("kernel.create_invocation"):
+            inv = self._kernel.invocations.create(
+                action_name=self._action_name,
+                app_name=self._app_name,
+                version=self._app_version,
+                async_=True,
+                payload=json.dumps(payload),
+            )
         inv_id = inv.id
+        sp.set_attribute("kernel.invocation_id", inv_id)
+        if callback_key is not None:
+            try:
+                await kernel_callbacks.register(inv_id, callback_key)
+            except Exception as e:  # noqa: BLE001
+                # Its callback will be refused; poll at the normal rate instead
+                sp.add_event("kernel.callback_register_error", error=str(e))
+                callback_key = None
+        sp.set_attribute("kernel.callback", callback_key is not None)
+        # Registered before the first check: a fast action may already have called back
+        waiter = kernel_callbacks.waiters.register(inv_id) if callback_key else None
 
-        deadline = asyncio.get_event_loop().time() + timeout_s
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout_s
+        # With callbacks, polling only catches lost ones
+        poll_interval_s = settings.KERNEL_CALLBACK_POLL_INTERVAL_S if waiter else settings.KERNEL_POLL_INTERVAL_S
+        next_poll = loop.time() + poll_interval_s if waiter else loop.time()
         status: Optional[str] = None
+        attempts = 0
         # Determine available SDK methods for status/result
         get_status_fn = getattr(self._kernel.invocations, "get_status", None)
         get_fn = getattr(self._kernel.invocations, "get", None)
         get_result_fn = getattr(self._kernel.invocations, "get_result", None)
+        retrieve_fn = getattr(self._kernel.invocations, "retrieve", None)
+        info: Any = None
 
-        while asyncio.get_event_loop().time() < deadline:
-            try:
-                if callable(get_status_fn):
-                    stat = get_status_fn(invocation_id=inv_id)
-                    status = getattr(stat, "status", None) or (stat.get("status") if isinstance(stat, dict) else None)
-                elif callable(get_fn):
-                    info = get_fn(invocation_id=inv_id)
-                    status = getattr(info, "status", None) or (info.get("status") if isinstance(info, dict) else None)
+        try:
+            while loop.time() < deadline:
+                if waiter is not None:
+                    # Cleared before reading, so a callback landing in between still wakes the wait
+                    waiter.clear()
+                    output = await kernel_callbacks.fetch(inv_id, callback_key)
+                    if output is not None:
+                        sp.add_event("kernel.callback", attempt=attempts)
+                        return _from_callback(output, inv_id)
+                if loop.time() >= next_poll:
+                    attempts += 1
+                    poll_started = time.perf_counter()
+                    try:
+                        if callable(get_status_fn):
+                            stat = get_status_fn(invocation_id=inv_id)
+                            status = getattr(stat, "status", None) or (
+                                stat.get("status") if isinstance(stat, dict) else None
+                            )
+                        elif callable(get_fn):
+                            info = get_fn(invocation_id=inv_id)
+                            status = getattr(info, "status", None) or (
+                                info.get("status") if isinstance(info, dict) else None
+                            )
+                        elif callable(retrieve_fn):
+                            # Current SDK: invocations.retrieve(id) -> { status, output (JSON string), ... }
+                            info = retrieve_fn(inv_id)
+                            status = getattr(info, "status", None)
+                        else:
+                            # Fallback: attempt result directly; if not ready, SDK should raise
+                            if callable(get_result_fn):
+                                res_try = get_result_fn(invocation_id=inv_id)
+                                return res_try
+
+                        sp.add_event(
+                            "kernel.poll",
+                            attempt=attempts,
+                            status=status,
+                            duration_ms=round((time.perf_counter() - poll_started) * 1000, 3),
+                        )
+                        if status in ("succeeded", "failed", "cancelled"):
+                            break
+                    except Exception as e:
+                        # Ignore transient errors while polling
+                        sp.add_event(
+                            "kernel.poll_error",
+                            attempt=attempts,
+                            error=str(e),
+                            duration_ms=round((time.perf_counter() - poll_started) * 1000, 3),
+                        )
+                    next_poll = loop.time() + poll_interval_s
+                wait_s = max(0.0, min(next_poll, deadline) - loop.time())
+                if waiter is None:
+                    await asyncio.sleep(wait_s)
                 else:
-                    # Fallback: attempt result directly; if not ready, SDK should raise
-                    if callable(get_result_fn):
-                        res_try = get_result_fn(invocation_id=inv_id)
-                        return res_try
-
-                if status in ("succeeded", "failed", "cancelled"):
-                    break
-            except Exception:
-                # Ignore transient errors while polling
-                pass
-            await asyncio.sleep(2)
+                    try:
+                        await asyncio.wait_for(waiter.wait(), timeout=wait_s)
+                    except asyncio.TimeoutError:
+                        pass
+        except asyncio.CancelledError:
+            # Job cancelled (or worker shutting down): release the browser instead of
+            # leaving the invocation running until its own timeout
+            sp.add_event("kernel.cancelled", attempt=attempts)
+            self.terminate_invocation(inv_id)
+            raise
+        finally:
+            kernel_callbacks.waiters.discard(inv_id)
+            sp.set_attribute("kernel.poll_attempts", attempts)
+
+        if status not in ("succeeded", "failed", "cancelled") and loop.time() >= deadline:
+            # Out of budget: the job fails, so don't let the browser session run (and bill) on
+            sp.add_event("kernel.timeout", attempt=attempts, status=status)
+            self.terminate_invocation(inv_id, reason=f"Timed out after {timeout_s}s")
+            raise RuntimeError(f"Kernel invocation timed out after {timeout_s}s: status={status}, id={inv_id}")
 
         # Retrieve final result or error
         if callable(get_result_fn):
             try:
-                raw = get_result_fn(invocation_id=inv_id)
+                with span("kernel.get_result", **{"kernel.invocation_id": inv_id}):
+                    raw = get_result_fn(invocation_id=inv_id)
                 # Normalize SDK variants into { status, result }
                 normalized: Dict[str, Any] = {"status": status or "succeeded", "result": None}
                 if isinstance(raw, dict):
@@ -77,11 +167,48 @@ class KernelClient:
                 else:
                     # Non-dict outputs (unlikely) are wrapped directly
                     normalized["result"] = raw
+                normalized["invocation_id"] = inv_id
                 return normalized
             except Exception as e:  # noqa: BLE001
                 raise RuntimeError(f"Kernel invocation failed: status={status}, id={inv_id}") from e
 
+        if info is not None and status in ("succeeded", "failed"):
+            return {"status": status, "result": _decode_output(getattr(info, "output", None)), "invocation_id": inv_id}
+
         # Last resort: return known status
-        return {"status": status or "unknown", "result": None}
+        return {"status": status or "unknown", "result": None, "invocation_id": inv_id}
+
+    def terminate_invocation(self, inv_id: str, reason: str = "Cancelled") -> None:
+        # Best effort: mark the invocation finished, then tear down its browsers
+        with span("kernel.terminate", **{"kernel.invocation_id": inv_id}) as sp:
+            update_fn = getattr(self._kernel.invocations, "update", None)
+            delete_browsers_fn = getattr(self._kernel.invocations, "delete_browsers", None)
+            try:
+                if callable(update_fn):
+                    update_fn(inv_id, status="failed", output=json.dumps({"status": "cancelled", "summary": reason}))
+            except Exception as e:  # noqa: BLE001
+                sp.add_event("kernel.update_error", error=str(e))
+            try:
+                if callable(delete_browsers_fn):
+                    delete_browsers_fn(inv_id)
+            except Exception as e:  # noqa: BLE001
+                sp.add_event("kernel.delete_browsers_error", error=str(e))
+
+
+def _from_callback(output: Any, inv_id: str) -> Dict[str, Any]:
+    # Same shape as a polled result: the status the action (or a termination) reported, and
+    # succeeded only when it reported none, as with a status-less result envelope
+    status = output.get("status") if isinstance(output, dict) else None
+    if not isinstance(status, str) or not status:
+        status = "succeeded"
+    return {"status": status, "result": output, "invocation_id": inv_id}
 
 
+def _decode_output(raw: Any) -> Any:
+    # The SDK returns the action's output as a JSON-encoded string
+    if isinstance(raw, str):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return raw
+    return raw
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..db import _normalize_asyncpg_url, _strip_libpq_params
+
+logger = logging.getLogger(__name__)
+
+# Callbacks receive the NOTIFY payload, or None after a reconnect (notifications may have been missed)
+Callback = Callable[[Optional[str]], None]
+
+
+async def notify(db: AsyncSession, channel: str, payload: str = "") -> None:
+    # Delivered to listeners in every worker when the surrounding transaction commits
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+class NotificationListener:
+    # Single dedicated asyncpg connection per process for Postgres LISTEN/NOTIFY.
+    # Poolers in transaction mode (pgbouncer) do not support LISTEN; callers must not rely on
+    # notifications for correctness, only for faster cache invalidation.
+
+    def __init__(self, reconnect_delay_s: float = 5.0) -> None:
+        self._callbacks: Dict[str, List[Callback]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._reconnect_delay_s = reconnect_delay_s
+
+    def subscribe(self, channel: str, callback: Callback) -> None:
+        self._callbacks.setdefault(channel, []).append(callback)
+
+    async def start(self) -> None:
+        if self._task is None and self._callbacks:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _dispatch(self, channel: str, payload: Optional[str]) -> None:
+        for cb in self._callbacks.get(channel, []):
+            try:
+                cb(payload)
+            except Exception:
+                logger.exception("Notification callback failed for channel %s", channel)
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        settings = get_settings()
+        dsn = _strip_libpq_params(_normalize_asyncpg_url(settings.DATABASE_URL)).replace(
+            "postgresql+asyncpg://", "postgresql://", 1
+        )
+        attempt = 0
+        while True:
+            attempt += 1
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn, ssl=settings.DATABASE_SSL)
+                for channel in self._callbacks:
+                    await conn.add_listener(channel, lambda _c, _pid, ch, payload: self._dispatch(ch, payload))
+                if attempt > 1:
+                    for channel in self._callbacks:
+                        self._dispatch(channel, None)
+                while not conn.is_closed():
+                    await asyncio.sleep(self._reconnect_delay_s)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("LISTEN connection failed: %s", e)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self._reconnect_delay_s)
+
+
+listener = NotificationListener()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# (table, partition key). Artifacts are partitioned on their job's created_at so a month of
+# history lives in matching partitions of both tables and can be detached together.
+PARTITIONED_TABLES: Tuple[Tuple[str, str], ...] = (
+    ("job_applications", "created_at"),
+    ("application_artifacts", "job_created_at"),
+)
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+# pg_advisory_xact_lock key serializing ensure_partitions across workers
+_LOCK_KEY = 0x6A6F6270
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+async def ensure_partitions(conn: AsyncConnection, *, months_back: int = 0, months_ahead: int = 3) -> List[str]:
+    # Idempotent: DEFAULT partition plus one partition per month in the window. Workers running
+    # it at the same time take turns on an advisory lock instead of racing on CREATE TABLE.
+    # Postgres refuses to create a month while the DEFAULT partition holds rows for it (they got
+    # there because maintenance didn't run in time). Such months are skipped with an error in the
+    # log rather than failing the rest: deleting the rows to move them would cascade to their
+    # artifacts and runs, so they stay (readable) in DEFAULT until moved by hand.
+    created: List[str] = []
+    current = month_start(datetime.now(timezone.utc).date())
+    months = [add_months(current, i) for i in range(-months_back, months_ahead + 1)]
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+    for table, key in PARTITIONED_TABLES:
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+        existing = {name for name, _ in await list_month_partitions(conn, table)}
+        for month in months:
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            stray = await conn.execute(
+                text(f"SELECT count(*) FROM {table}_default WHERE {key} >= :lower AND {key} < :upper"),
+                {"lower": _month_ts(month), "upper": _month_ts(add_months(month, 1))},
+            )
+            count = stray.scalar_one()
+            if count:
+                logger.error(
+                    "Cannot create partition %s: %s_default already holds %d rows for %s; they stay in "
+                    "the DEFAULT partition until moved out by hand",
+                    name, table, count, f"{month:%Y-%m}",
+                )
+                continue
+            await conn.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+                )
+            )
+            created.append(name)
+    return created
+
+
+def _month_ts(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+async def list_month_partitions(conn: AsyncConnection, table: str) -> List[Tuple[str, date]]:
+    res = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table},
+    )
+    out: List[Tuple[str, date]] = []
+    for (name,) in res.all():
+        m = _MONTH_SUFFIX.search(name)
+        if m:
+            out.append((name, date(int(m.group(1)), int(m.group(2)), 1)))
+    return sorted(out, key=lambda item: item[1])
+
+
+async def detach_partitions_before(conn: AsyncConnection, cutoff: date) -> List[str]:
+    # Detach every monthly partition that ends on or before `cutoff`. Detached tables keep their
+    # data (archive/dump them, then DROP TABLE); job_runs for those months are deleted since they
+    # reference the partitioned parent.
+    detached: List[str] = []
+    for job_part, month in await list_month_partitions(conn, "job_applications"):
+        upper = add_months(month, 1)
+        if upper > cutoff:
+            continue
+        lower_ts, upper_ts = f"{month.isoformat()} 00:00:00+00", f"{upper.isoformat()} 00:00:00+00"
+        await conn.execute(
+            text("DELETE FROM job_runs WHERE job_created_at >= :lower AND job_created_at < :upper"),
+            {"lower": datetime.fromisoformat(lower_ts), "upper": datetime.fromisoformat(upper_ts)},
+        )
+        art_part = partition_name("application_artifacts", month)
+        if art_part in {name for name, _ in await list_month_partitions(conn, "application_artifacts")}:
+            await conn.execute(text(f"ALTER TABLE application_artifacts DETACH PARTITION {art_part}"))
+            # The cloned FK would still pin rows in the job partition we are about to detach
+            fks = await conn.execute(
+                text("SELECT conname FROM pg_constraint WHERE conrelid = CAST(:rel AS regclass) AND contype = 'f'"),
+                {"rel": art_part},
+            )
+            for (conname,) in fks.all():
+                await conn.execute(text(f'ALTER TABLE {art_part} DROP CONSTRAINT "{conname}"'))
+            detached.append(art_part)
+        await conn.execute(text(f"ALTER TABLE job_applications DETACH PARTITION {job_part}"))
+        detached.append(job_part)
+    return detached
+
+
+class PartitionMaintainer:
+    # Creates upcoming monthly partitions at startup and every PARTITION_MAINTENANCE_INTERVAL_S,
+    # so new rows never land in the DEFAULT partition
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> List[str]:
+        from ..db import init_engine
+
+        try:
+            async with init_engine().begin() as conn:
+                created = await ensure_partitions(conn, months_ahead=get_settings().PARTITION_MONTHS_AHEAD)
+        except Exception:
+            # Never fatal: the DEFAULT partition still accepts rows, and the next pass retries
+            logger.exception("Partition maintenance failed")
+            return []
+        if created:
+            logger.info("Created partitions: %s", ", ".join(created))
+        return created
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.run_once()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(get_settings().PARTITION_MAINTENANCE_INTERVAL_S)
+            await self.run_once()
+
+
+maintainer = PartitionMaintainer()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..db import SessionLocal
+from ..models import PreferencesSnapshot, UserPreferences
+from .notifications import notify
+
+CHANNEL = "preferences_changed"
+
+
+@dataclass(frozen=True)
+class PreferencesVersion:
+    # Immutable view of one preferences version; `id` is the snapshot row id (None when unset)
+    id: Optional[uuid.UUID]
+    version: int
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> str:
+        # Snapshot ids are per user, so a client switching users never gets a false 304
+        tag = self.id.hex if self.id else "empty"
+        return f'W/"prefs-{self.version}-{tag}"'
+
+
+EMPTY = PreferencesVersion(id=None, version=0, data={})
+
+
+class PreferencesCache:
+    # In-process cache of each user's current preferences plus an LRU of immutable snapshots.
+    # Invalidated locally on PUT, across workers via NOTIFY, and by TTL as a fallback.
+
+    def __init__(self, max_snapshots: int = 256) -> None:
+        self._current: Dict[uuid.UUID, Tuple[PreferencesVersion, float]] = {}
+        self._snapshots: "OrderedDict[uuid.UUID, PreferencesVersion]" = OrderedDict()
+        self._max_snapshots = max_snapshots
+        # One load per user at a time; lookups for other users never wait on it
+        self._locks: Dict[uuid.UUID, asyncio.Lock] = {}
+        self._waiting: Dict[uuid.UUID, int] = {}
+
+    def invalidate(self, payload: Optional[str] = None) -> None:
+        # payload is "<user_id>:<version>"; None (reconnect) or garbage clears everything
+        user_id = _parse_user_id(payload)
+        if user_id is None:
+            self._current.clear()
+        else:
+            self._current.pop(user_id, None)
+
+    def remember(self, user_id: uuid.UUID, snap: PreferencesVersion) -> None:
+        self._current[user_id] = (snap, time.monotonic())
+        self._remember_snapshot(snap)
+
+    def _remember_snapshot(self, snap: PreferencesVersion) -> None:
+        if snap.id is None:
+            return
+        self._snapshots[snap.id] = snap
+        self._snapshots.move_to_end(snap.id)
+        while len(self._snapshots) > self._max_snapshots:
+            self._snapshots.popitem(last=False)
+
+    def _fresh(self, user_id: uuid.UUID) -> Optional[PreferencesVersion]:
+        entry = self._current.get(user_id)
+        if entry is not None and time.monotonic() - entry[1] < get_settings().PREFERENCES_CACHE_TTL_S:
+            return entry[0]
+        return None
+
+    async def current(self, db: AsyncSession, user_id: uuid.UUID) -> PreferencesVersion:
+        cached = self._fresh(user_id)
+        if cached is not None:
+            return cached
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        self._waiting[user_id] = self._waiting.get(user_id, 0) + 1
+        try:
+            async with lock:
+                cached = self._fresh(user_id)
+                if cached is not None:
+                    return cached
+                snap = await _load_current(db, user_id)
+                self.remember(user_id, snap)
+                return snap
+        finally:
+            self._waiting[user_id] -= 1
+            if not self._waiting[user_id]:
+                del self._waiting[user_id]
+                del self._locks[user_id]
+
+    async def by_id(self, db: AsyncSession, snapshot_id: uuid.UUID, user_id: uuid.UUID) -> PreferencesVersion:
+        snap = self._snapshots.get(snapshot_id)
+        if snap is not None:
+            self._snapshots.move_to_end(snapshot_id)
+            return snap
+        res = await db.execute(select(PreferencesSnapshot).where(PreferencesSnapshot.id == snapshot_id))
+        row = res.scalars().first()
+        if row is None:
+            return await self.current(db, user_id)
+        snap = PreferencesVersion(id=row.id, version=row.version, data=row.data or {})
+        self._remember_snapshot(snap)
+        return snap
+
+
+def _parse_user_id(payload: Optional[str]) -> Optional[uuid.UUID]:
+    if not payload:
+        return None
+    try:
+        return uuid.UUID(payload.split(":", 1)[0])
+    except ValueError:
+        return None
+
+
+async def _find_snapshot(db: AsyncSession, user_id: uuid.UUID, version: int) -> Optional[PreferencesSnapshot]:
+    res = await db.execute(
+        select(PreferencesSnapshot).where(PreferencesSnapshot.user_id == user_id, PreferencesSnapshot.version == version)
+    )
+    return res.scalars().first()
+
+
+async def _materialize_snapshot(user_id: uuid.UUID, version: int, data: Dict[str, Any]) -> uuid.UUID:
+    # Rows written before snapshots existed get one for their current version. Committed in its
+    # own transaction before the id is handed out: the caller's session may never commit (GET
+    # doesn't), and a rolled-back snapshot would mean a new id and ETag on every request.
+    async with SessionLocal() as own:
+        snap_row = PreferencesSnapshot(user_id=user_id, version=version, data=data)
+        own.add(snap_row)
+        try:
+            await own.commit()
+            return snap_row.id
+        except IntegrityError:
+            # Materialized concurrently by another request/worker
+            await own.rollback()
+            existing = await _find_snapshot(own, user_id, version)
+            if existing is None:
+                raise
+            return existing.id
+
+
+async def _load_current(db: AsyncSession, user_id: uuid.UUID) -> PreferencesVersion:
+    res = await db.execute(select(UserPreferences).where(UserPreferences.user_id == user_id))
+    row = res.scalars().first()
+    if row is None:
+        return EMPTY
+    version, data = row.version, row.data or {}
+    snap_row = await _find_snapshot(db, user_id, version)
+    snapshot_id = snap_row.id if snap_row is not None else await _materialize_snapshot(user_id, version, data)
+    return PreferencesVersion(id=snapshot_id, version=version, data=data)
+
+
+async def save_preferences(db: AsyncSession, user_id: uuid.UUID, data: Dict[str, Any]) -> PreferencesVersion:
+    # Serialize writers on the row so versions stay gap-free and unique per user. There is no row
+    # to lock before a user's first save, so two concurrent first saves can both insert: the loser
+    # hits the unique user_id, rolls back and retries against the winner's row.
+    for attempt in range(2):
+        res = await db.execute(
+            select(UserPreferences).where(UserPreferences.user_id == user_id).with_for_update()
+        )
+        row = res.scalars().first()
+        if row is None:
+            row = UserPreferences(user_id=user_id, data=data, version=1)
+            db.add(row)
+        else:
+            row.data = data
+            row.version = row.version + 1
+        snap_row = PreferencesSnapshot(user_id=user_id, version=row.version, data=data)
+        db.add(snap_row)
+        try:
+            await db.flush()
+            break
+        except IntegrityError:
+            await db.rollback()
+            if attempt:
+                raise
+    await notify(db, CHANNEL, f"{user_id}:{row.version}")
+    await db.commit()
+    snap = PreferencesVersion(id=snap_row.id, version=row.version, data=data)
+    cache.remember(user_id, snap)
+    return snap
+
+
+cache = PreferencesCache()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import asyncio
+import html
+import ipaddress
+import re
+import socket
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from ..config import get_settings
+from .tracing import span
+
+if TYPE_CHECKING:
+    import httpx
+
+# HTTP check of a posting before a Kernel browser is spent on it: follows redirects to the
+# final ATS URL and recognizes postings that are gone. Anything inconclusive (timeouts, bot
+# walls, 5xx) lets the job through; only clear signals close it. The visible text of open
+# postings is kept for resume matching, which checks postings at job creation.
+# The URLs come from users, so redirects are followed by hand and every hop must be http(s) to
+# a host that resolves only to public addresses; anything else is refused as inconclusive. The
+# addresses are checked, not pinned: a host re-resolving between check and connect isn't caught.
+
+_CLOSED_TEXT_RE = re.compile(
+    r"no longer accepting applications|(?:position|role|job) (?:has been |is )?filled|"
+    r"(?:job|posting|position|page) (?:you are looking for )?(?:is )?no longer (?:available|open|active)|"
+    r"(?:job|posting) (?:has )?(?:been )?(?:closed|expired|removed)|this job is closed",
+    re.IGNORECASE,
+)
+_CLOSED_STATUS = {404, 410}
+_MAX_CACHE_ENTRIES = 2048
+_MAX_REDIRECTS = 5
+_HIDDEN_RE = re.compile(
+    r"<!--.*?-->|<(script|style|noscript|svg|template)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"\s+")
+# Bounds the cache: 2048 entries stay under ~40 MB even when every posting is long
+_MAX_TEXT_CHARS = 20000
+
+
+@dataclass(frozen=True)
+class PreflightResult:
+    url: str
+    final_url: str
+    status_code: Optional[int] = None
+    closed: bool = False
+    reason: Optional[str] = None
+    # Visible text of an open posting, "" when none was read
+    text: str = ""
+
+    @property
+    def final_domain(self) -> str:
+        return urlparse(self.final_url).netloc
+
+
+def closed_reason(status_code: int, final_url: str, text: str) -> Optional[str]:
+    # text is the page's visible text: embedded JSON, scripts and templates of open postings
+    # often carry "filled"/"closed" wording for other states
+    if status_code in _CLOSED_STATUS:
+        return f"HTTP {status_code}"
+    # Greenhouse redirects closed postings to the board index with ?error=true
+    if parse_qs(urlparse(final_url).query).get("error") == ["true"]:
+        return "Redirected to job board error page"
+    if 200 <= status_code < 300:
+        m = _CLOSED_TEXT_RE.search(text)
+        if m:
+            return f'Posting says "{m.group(0)}"'
+    return None
+
+
+def _strip_markup(body: str) -> str:
+    text = _TAG_RE.sub(" ", _HIDDEN_RE.sub(" ", body))
+    return _SPACE_RE.sub(" ", html.unescape(text)).strip()
+
+
+def visible_text(body: str) -> str:
+    return _strip_markup(body)[:_MAX_TEXT_CHARS]
+
+
+def public_address(address: str) -> bool:
+    # False for loopback, link-local (cloud metadata), private, shared and reserved ranges
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+class PreflightChecker:
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: "OrderedDict[str, Tuple[float, PreflightResult]]" = OrderedDict()
+        # Concurrent checks of one URL (bulk submissions) share a single fetch
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            import httpx
+
+            settings = get_settings()
+            # Redirects are followed in _fetch, which checks each hop's address
+            self._client = httpx.AsyncClient(
+                follow_redirects=False,
+                timeout=httpx.Timeout(settings.PREFLIGHT_TIMEOUT_S, connect=min(3.0, settings.PREFLIGHT_TIMEOUT_S)),
+                limits=httpx.Limits(
+                    max_connections=settings.PREFLIGHT_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.PREFLIGHT_MAX_CONNECTIONS,
+                ),
+                headers={"User-Agent": "Mozilla/5.0 (compatible; KernelJobAgent/1.0)", "Accept": "text/html,*/*"},
+            )
+        return self._client
+
+    async def close(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def _resolve(self, host: str) -> List[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        return [info[4][0] for info in infos]
+
+    async def _refusal(self, url: httpx.URL) -> Optional[str]:
+        # Why the URL must not be fetched, None when it may
+        if url.scheme not in ("http", "https"):
+            return f"Scheme {url.scheme!r} not allowed"
+        if not url.host:
+            return "No host"
+        try:
+            addresses = [str(ipaddress.ip_address(url.host))]
+        except ValueError:
+            try:
+                addresses = await self._resolve(url.host)
+            except OSError as e:
+                return f"Cannot resolve {url.host}: {e}"
+        if not addresses:
+            return f"Cannot resolve {url.host}"
+        blocked = [address for address in addresses if not public_address(address)]
+        if blocked:
+            return f"{url.host} resolves to non-public {', '.join(blocked)}"
+        return None
+
+    def _cached(self, url: str) -> Optional[PreflightResult]:
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._cache[url]
+            return None
+        self._cache.move_to_end(url)
+        return result
+
+    def _remember(self, url: str, result: PreflightResult) -> None:
+        self._cache[url] = (time.monotonic() + get_settings().PREFLIGHT_CACHE_TTL_S, result)
+        self._cache.move_to_end(url)
+        while len(self._cache) > _MAX_CACHE_ENTRIES:
+            self._cache.popitem(last=False)
+
+    async def check(self, url: str) -> PreflightResult:
+        cached = self._cached(url)
+        if cached is not None:
+            return cached
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._fetch(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda t: self._fetched(url, t))
+        # A cancelled caller (job cancel) must not cancel the fetch other jobs are waiting on
+        return await asyncio.shield(task)
+
+    def _fetched(self, url: str, task: asyncio.Task) -> None:
+        self._inflight.pop(url, None)
+        # Inconclusive results (network errors) are not cached; the next job retries the fetch
+        if not task.cancelled() and task.exception() is None and task.result().status_code is not None:
+            self._remember(url, task.result())
+
+    async def _fetch(self, url: str) -> PreflightResult:
+        import httpx
+
+        max_bytes = get_settings().PREFLIGHT_MAX_BYTES
+        with span("preflight.fetch", **{"http.url": url}) as sp:
+            try:
+                target = httpx.URL(url)
+                for _ in range(_MAX_REDIRECTS + 1):
+                    refusal = await self._refusal(target)
+                    if refusal is not None:
+                        sp.add_event("preflight.refused", url=str(target), reason=refusal)
+                        return PreflightResult(url=url, final_url=url)
+                    async with self._get_client().stream("GET", target) as resp:
+                        if resp.next_request is not None:
+                            target = resp.next_request.url
+                            continue
+                        body = bytearray()
+                        if resp.status_code < 300 and "html" in resp.headers.get("content-type", "html"):
+                            async for chunk in resp.aiter_bytes():
+                                body.extend(chunk)
+                                if len(body) >= max_bytes:
+                                    break
+                        final_url = str(resp.url)
+                        status_code = resp.status_code
+                        encoding = resp.encoding or "utf-8"
+                        break
+                else:
+                    raise httpx.TooManyRedirects(f"Exceeded {_MAX_REDIRECTS} redirects")
+            except (httpx.HTTPError, httpx.InvalidURL) as e:
+                # Inconclusive: the browser may still get through (bot walls, slow boards)
+                sp.add_event("preflight.error", error=f"{type(e).__name__}: {e}")
+                return PreflightResult(url=url, final_url=url)
+            try:
+                page = body[:max_bytes].decode(encoding, errors="replace")
+            except LookupError:
+                # Unknown charset label; the wording checked is ASCII either way
+                page = body[:max_bytes].decode("utf-8", errors="replace")
+            text = _strip_markup(page)
+            reason = closed_reason(status_code, final_url, text)
+            sp.set_attribute("http.status_code", status_code)
+            sp.set_attribute("preflight.final_url", final_url)
+            sp.set_attribute("preflight.closed", reason is not None)
+            return PreflightResult(
+                url=url,
+                final_url=final_url,
+                status_code=status_code,
+                closed=reason is not None,
+                reason=reason,
+                text=text[:_MAX_TEXT_CHARS] if reason is None and 200 <= status_code < 300 else "",
+            )
+
+
+checker = PreflightChecker()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Optional, Sequence
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+# Column projections for list endpoints: select only the requested columns and encode the rows
+# with orjson, skipping ORM object loading and per-row Pydantic validation.
+
+
+class OrjsonResponse(JSONResponse):
+    # Datetimes and enums are encoded natively; "Z" matches Pydantic's UTC output. asyncpg
+    # returns its own UUID subclass, which orjson hands to `default`.
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def fields_description(allowed: Sequence[str]) -> str:
+    # The response schema documents full rows (the default); sparse rows are described here
+    return (
+        f"Comma-separated subset of: {', '.join(allowed)}. Default: all fields. "
+        "When given, each row has only id and the listed fields."
+    )
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    # `fields=id,status,created_at`; `id` is always included so sparse rows stay addressable
+    if not fields:
+        return list(allowed)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(allowed)})"
+        )
+    return list(dict.fromkeys(["id", *requested]))
+
+
+def columns(model: Any, names: Sequence[str]) -> List[Any]:
+    return [getattr(model, name) for name in names]
+
+
+def rows_response(rows: Iterable[Sequence[Any]], names: Sequence[str]) -> OrjsonResponse:
+    return OrjsonResponse([dict(zip(names, row)) for row in rows])
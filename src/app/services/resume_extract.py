@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Deterministic first pass over pypdf text: finds section boundaries and the fields that
+# regexes get right (contact details, well-formed entries, skill lists). Sections it cannot
+# fully account for are left for the model.
+
+_HEADINGS: Dict[str, str] = {
+    **{h: "contact" for h in ("contact", "contact information", "contact details")},
+    # Free text with no place in the profile schema; never sent to the model
+    **{h: "summary" for h in ("summary", "profile", "professional summary", "objective", "about me")},
+    **{
+        h: "experience"
+        for h in (
+            "experience",
+            "work experience",
+            "professional experience",
+            "relevant experience",
+            "employment",
+            "employment history",
+            "work history",
+            "career history",
+            "projects",
+        )
+    },
+    **{h: "education" for h in ("education", "academic background", "education and training")},
+    **{
+        h: "skills"
+        for h in ("skills", "technical skills", "core competencies", "certifications", "languages", "tools")
+    },
+}
+_HEADING_NOISE_RE = re.compile(r"\(cont(?:inued|'d)?\.?\)|[:|•\-–—]+$", re.IGNORECASE)
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+LINK_RE = re.compile(
+    r"(?:https?://\S+|(?:www\.)?(?:linkedin\.com|github\.com|gitlab\.com|bitbucket\.org|behance\.net|"
+    r"dribbble\.com|medium\.com|stackoverflow\.com|x\.com|twitter\.com)/[^\s|,;]+)",
+    re.IGNORECASE,
+)
+PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{5,18}\d(?![\w/])")
+NAME_RE = re.compile(r"^[A-Z][A-Za-z'’.-]+(?: [A-Z][A-Za-z'’.-]+){1,3}$")
+_SEPARATORS_RE = re.compile(r"[\s|•·,;/]+")
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}}(?:-\d{{2}})?)"
+DATE_RANGE_RE = re.compile(
+    rf"\s*(?P<start>{_DATE})\s*(?:-|–|—|to)\s*(?P<end>{_DATE}|present|current|now)\s*$", re.IGNORECASE
+)
+_PAIR_SPLIT_RE = re.compile(r"\s*(?:,|\s@\s|\sat\s|\s\|\s|\s-\s|\s–\s|\s—\s)\s*")
+_BULLET_RE = re.compile(r"^\s*[-•*▪‣◦●]\s+(?P<text>.+)$")
+_TITLE_WORDS_RE = re.compile(
+    r"\b(?:engineer|developer|manager|analyst|intern|designer|scientist|lead|director|consultant|architect|"
+    r"specialist|associate|officer|administrator|coordinator|researcher|programmer|head|vp|president|"
+    r"assistant|technician|founder|owner)\b",
+    re.IGNORECASE,
+)
+_SCHOOL_WORDS_RE = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic)\b", re.IGNORECASE)
+_SKILL_LABEL_RE = re.compile(r"^[A-Za-z /&]{2,30}:\s*")
+_SKILL_SPLIT_RE = re.compile(r"\s*[,|•;·]\s*")
+
+
+@dataclass
+class LocalExtraction:
+    # Fields filled locally, plus the (kind, text) sections that still need the model
+    profile: Dict[str, Any] = field(default_factory=dict)
+    remaining: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.remaining
+
+
+def section_kind(line: str) -> Optional[str]:
+    candidate = line.strip()
+    if not candidate or len(candidate) > 40:
+        return None
+    candidate = _HEADING_NOISE_RE.sub("", candidate).strip().lower()
+    return _HEADINGS.get(candidate)
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    # Ordered (kind, text) runs; lines before the first heading are the contact header
+    sections: List[Tuple[str, List[str]]] = [("contact", [])]
+    for line in text.splitlines():
+        kind = section_kind(line)
+        if kind is not None:
+            sections.append((kind, []))
+        else:
+            sections[-1][1].append(line)
+    return [(kind, "\n".join(lines).strip()) for kind, lines in sections if any(l.strip() for l in lines)]
+
+
+def _normalize_link(link: str) -> str:
+    link = link.rstrip(".,)")
+    return link if link.lower().startswith(("http://", "https://")) else f"https://{link}"
+
+
+def _extract_contact(body: str, profile: Dict[str, Any]) -> bool:
+    # Returns True when every line is explained by a name or contact tokens
+    explained = True
+    for line in (l.strip() for l in body.splitlines()):
+        if not line:
+            continue
+        rest = line
+        for email in EMAIL_RE.findall(rest):
+            profile.setdefault("email", email)
+        rest = EMAIL_RE.sub(" ", rest)
+        for link in LINK_RE.findall(rest):
+            links = profile.setdefault("links", [])
+            normalized = _normalize_link(link)
+            if normalized not in links:
+                links.append(normalized)
+        rest = LINK_RE.sub(" ", rest)
+        for phone in PHONE_RE.findall(rest):
+            digits = sum(c.isdigit() for c in phone)
+            if 7 <= digits <= 15:
+                profile.setdefault("phone", phone.strip())
+                rest = rest.replace(phone, " ")
+        rest = _SEPARATORS_RE.sub(" ", rest).strip()
+        if not rest:
+            continue
+        if "name" not in profile and rest == line and NAME_RE.match(line):
+            profile["name"] = line
+            continue
+        explained = False
+    return explained and "name" in profile and "email" in profile
+
+
+def _split_pair(text: str) -> Optional[Tuple[str, str]]:
+    parts = [p for p in _PAIR_SPLIT_RE.split(text.strip(), maxsplit=1) if p]
+    return (parts[0], parts[1]) if len(parts) == 2 else None
+
+
+def _range(line: str) -> Optional[Tuple[str, str, Optional[str]]]:
+    # (prefix, start, end) with end None for ongoing roles
+    m = DATE_RANGE_RE.search(line)
+    if not m or m.start() == 0:
+        return None
+    end = m.group("end")
+    return line[: m.start()].strip(" ,|-–—"), m.group("start"), None if end.lower() in ("present", "current", "now") else end
+
+
+def _parse_experience(body: str) -> Optional[List[Dict[str, Any]]]:
+    entries: List[Dict[str, Any]] = []
+    for line in (l.rstrip() for l in body.splitlines()):
+        if not line.strip():
+            continue
+        bullet = _BULLET_RE.match(line)
+        if bullet:
+            if not entries:
+                return None
+            entries[-1]["bullets"].append(bullet.group("text").strip())
+            continue
+        header = _range(line)
+        if header is not None:
+            pair = _split_pair(header[0])
+            if pair is None:
+                return None
+            first_is_title = bool(_TITLE_WORDS_RE.search(pair[0]))
+            if first_is_title == bool(_TITLE_WORDS_RE.search(pair[1])):
+                # Cannot tell title from company
+                return None
+            title, company = pair if first_is_title else (pair[1], pair[0])
+            entries.append({"company": company, "title": title, "start": header[1], "end": header[2], "bullets": []})
+            continue
+        # Wrapped bullet text continues in lower case; anything else is unrecognized layout
+        if entries and entries[-1]["bullets"] and line.strip()[:1].islower():
+            entries[-1]["bullets"][-1] += " " + line.strip()
+            continue
+        return None
+    return entries or None
+
+
+def _parse_education(body: str) -> Optional[List[Dict[str, Any]]]:
+    entries: List[Dict[str, Any]] = []
+    for line in (l.strip() for l in body.splitlines()):
+        if not line:
+            continue
+        header = _range(line)
+        pair = _split_pair(header[0]) if header else None
+        if header is None or pair is None:
+            return None
+        first_is_school = bool(_SCHOOL_WORDS_RE.search(pair[0]))
+        if first_is_school == bool(_SCHOOL_WORDS_RE.search(pair[1])):
+            return None
+        school, degree = pair if first_is_school else (pair[1], pair[0])
+        entries.append({"school": school, "degree": degree, "start": header[1], "end": header[2]})
+    return entries or None
+
+
+def _parse_skills(body: str) -> Optional[List[str]]:
+    skills: List[str] = []
+    for line in (l.strip() for l in body.splitlines()):
+        if not line:
+            continue
+        for item in _SKILL_SPLIT_RE.split(_SKILL_LABEL_RE.sub("", line)):
+            item = item.strip(" -*.")
+            if not item:
+                continue
+            # Sentences are not a skill list
+            if len(item) > 40 or len(item.split()) > 4:
+                return None
+            if item.casefold() not in (s.casefold() for s in skills):
+                skills.append(item)
+    return skills or None
+
+
+_SECTION_PARSERS: Dict[str, Tuple[str, Callable[[str], Optional[list]]]] = {
+    "experience": ("experience", _parse_experience),
+    "education": ("education", _parse_education),
+    "skills": ("skills", _parse_skills),
+}
+
+
+def extract_local(text: str) -> LocalExtraction:
+    result = LocalExtraction()
+    for kind, body in split_sections(text):
+        if kind == "summary":
+            continue
+        if kind == "contact":
+            if not _extract_contact(body, result.profile):
+                result.remaining.append((kind, body))
+            continue
+        key, parser = _SECTION_PARSERS[kind]
+        parsed = parser(body)
+        if parsed is None:
+            result.remaining.append((kind, body))
+        else:
+            result.profile.setdefault(key, []).extend(parsed)
+    return result
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import uuid
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlparse
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..models import Resume
+from .cover_letters import posting_key
+from .preflight import checker
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Picks the best parsed resume for each posting (resume_id "auto" on job creation). Resumes and
+# postings become hashed, L2-normalized term vectors (skills weigh most, then titles, then
+# bullets); a user's resumes are kept as one matrix over only the terms they contain, so scoring
+# a batch is a gather and a segmented sum instead of a Python loop per (posting, resume) pair.
+# Ties, including postings sharing no terms with any resume, go to the most recent resume.
+
+DIM = 1 << 18
+SKILL_WEIGHT = 3.0
+TITLE_WEIGHT = 2.0
+URL_WEIGHT = 2.0
+# Postings scored per matrix product; bounds the temporary (postings x resume terms) array
+_CHUNK_POSTINGS = 256
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a about all also an and any are as at be been but by can do for from has have in into is it its "
+    "more most not of on or our out over so such that the their them then there these they this to "
+    "up us was we were what when where which who will with within you your "
+    # Boilerplate every posting and resume shares
+    "ability apply benefits candidate candidates company experience including job jobs join opportunity "
+    "position preferred required requirements responsibilities role skills strong team work working "
+    "years www com https http html careers".split()
+)
+
+
+def _terms(text: str) -> List[str]:
+    words = [w for w in _TOKEN_RE.findall(text.lower()) if w not in _STOPWORDS and not w.isdigit()]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _vector(weighted: Iterable[Tuple[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    # Sparse (sorted term ids, weights) with sublinear term frequency, unit length
+    import numpy as np
+
+    counts: Counter = Counter()
+    for text, weight in weighted:
+        for term, n in Counter(_terms(text)).items():
+            counts[zlib.crc32(term.encode()) & (DIM - 1)] += n * weight
+    if not counts:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    ids = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+    weights = 1.0 + np.log(np.array([counts[i] for i in ids.tolist()], dtype=np.float32))
+    return ids, weights / np.linalg.norm(weights)
+
+
+def resume_vector(profile: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    weighted: List[Tuple[str, float]] = [(str(s), SKILL_WEIGHT) for s in profile.get("skills") or [] if s]
+    for entry in profile.get("experience") or []:
+        if not isinstance(entry, dict):
+            continue
+        weighted.append((str(entry.get("title") or ""), TITLE_WEIGHT))
+        weighted.extend((str(b), 1.0) for b in entry.get("bullets") or [] if b)
+    for entry in profile.get("education") or []:
+        if isinstance(entry, dict):
+            weighted.append((str(entry.get("degree") or ""), 1.0))
+    return _vector(weighted)
+
+
+def posting_vector(url: str, text: str = "") -> Tuple[np.ndarray, np.ndarray]:
+    # The path usually carries the title slug (/jobs/senior-backend-engineer-4012)
+    path = unquote(urlparse(url).path).replace("-", " ").replace("_", " ").replace("/", " ")
+    return _vector([(path, URL_WEIGHT), (text, 1.0)])
+
+
+@dataclass(frozen=True)
+class ResumeMatrix:
+    # Most recent resume first, so argmax breaks ties toward it
+    resume_ids: Tuple[uuid.UUID, ...]
+    signature: Tuple[Tuple[uuid.UUID, datetime], ...]
+    # Sorted term ids present in any resume, and their (terms + 1, resumes) weights; the last
+    # row is all zeros and stands in for terms no resume has
+    terms: np.ndarray
+    weights: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        resume_ids: Sequence[uuid.UUID],
+        vectors: Sequence[Tuple[np.ndarray, np.ndarray]],
+        signature: Tuple[Tuple[uuid.UUID, datetime], ...] = (),
+    ) -> ResumeMatrix:
+        import numpy as np
+
+        terms = np.unique(np.concatenate([ids for ids, _ in vectors] or [np.empty(0, dtype=np.int32)]))
+        weights = np.zeros((len(terms) + 1, len(vectors)), dtype=np.float32)
+        for col, (ids, values) in enumerate(vectors):
+            weights[np.searchsorted(terms, ids), col] = values
+        return cls(tuple(resume_ids), signature, terms.astype(np.int32), weights)
+
+    def _rows(self) -> np.ndarray:
+        # Term id -> row in weights, the zero row for terms no resume has; a direct table is an
+        # order of magnitude faster than searchsorted over every posting term
+        import numpy as np
+
+        rows = np.full(DIM, len(self.terms), dtype=np.int32)
+        rows[self.terms] = np.arange(len(self.terms), dtype=np.int32)
+        return rows
+
+    def scores(self, postings: Sequence[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        # (postings, resumes) cosine similarities: each chunk of postings is scattered into the
+        # resume term space (other terms can't score) and multiplied with the whole matrix
+        import numpy as np
+
+        out = np.empty((len(postings), len(self.resume_ids)), dtype=np.float32)
+        rows = self._rows()
+        for start in range(0, len(postings), _CHUNK_POSTINGS):
+            chunk = postings[start : start + _CHUNK_POSTINGS]
+            lengths = np.fromiter((len(ids) for ids, _ in chunk), dtype=np.int64, count=len(chunk))
+            dense = np.zeros((len(chunk), len(self.terms) + 1), dtype=np.float32)
+            if lengths.sum():
+                ids = np.concatenate([ids for ids, _ in chunk])
+                values = np.concatenate([values for _, values in chunk])
+                dense[np.repeat(np.arange(len(chunk)), lengths), rows[ids]] = values
+            np.matmul(dense, self.weights, out=out[start : start + len(chunk)])
+        return out
+
+    def best(self, postings: Sequence[Tuple[np.ndarray, np.ndarray]]) -> List[uuid.UUID]:
+        if len(self.resume_ids) == 1:
+            return [self.resume_ids[0]] * len(postings)
+        return [self.resume_ids[i] for i in self.scores(postings).argmax(axis=1).tolist()]
+
+
+class ResumeMatcher:
+    def __init__(self) -> None:
+        self._matrices: "OrderedDict[uuid.UUID, ResumeMatrix]" = OrderedDict()
+        # posting key -> vector, only for postings whose text was read
+        self._postings: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+
+    async def _matrix(self, db: AsyncSession, user_id: uuid.UUID) -> Optional[ResumeMatrix]:
+        # Revalidated against (id, updated_at) of the parsed resumes on every call, so a
+        # re-parse or upload on another worker is picked up without a notification
+        res = await db.execute(
+            select(Resume.id, Resume.updated_at)
+            .where(Resume.user_id == user_id, Resume.parsed_profile.is_not(None))
+            .order_by(Resume.created_at.desc(), Resume.id)
+        )
+        signature = tuple((row.id, row.updated_at) for row in res.all())
+        if not signature:
+            return None
+        matrix = self._matrices.get(user_id)
+        if matrix is None or matrix.signature != signature:
+            ids = [resume_id for resume_id, _ in signature]
+            res = await db.execute(select(Resume.id, Resume.parsed_profile).where(Resume.id.in_(ids)))
+            profiles = dict(res.all())
+            matrix = ResumeMatrix.build(ids, [resume_vector(profiles.get(i) or {}) for i in ids], signature)
+            self._matrices[user_id] = matrix
+        self._matrices.move_to_end(user_id)
+        while len(self._matrices) > get_settings().RESUME_MATCH_CACHE_USERS:
+            self._matrices.popitem(last=False)
+        return matrix
+
+    async def _posting_vectors(self, urls: Sequence[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        settings = get_settings()
+        by_key = {posting_key(url): url for url in urls}
+        vectors: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        missing: List[str] = []
+        for key in by_key:
+            cached = self._postings.get(key)
+            if cached is None:
+                missing.append(key)
+            else:
+                self._postings.move_to_end(key)
+                vectors[key] = cached
+        texts = [""] * len(missing)
+        if missing and settings.PREFLIGHT_ENABLED:
+            # Fetched inline, so a bulk request only waits on the first few; the others are
+            # matched on the URL alone and read when a later request names them again. The
+            # runner's preflight of these jobs is then answered from the checker's cache
+            fetched = missing[: settings.RESUME_MATCH_MAX_FETCHES]
+            results = await asyncio.gather(*(checker.check(by_key[key]) for key in fetched))
+            texts[: len(fetched)] = [result.text for result in results]
+        for key, text in zip(missing, texts):
+            vectors[key] = posting_vector(by_key[key], text)
+            # Unread postings (fetch failed or disabled) are retried next time
+            if text:
+                self._postings[key] = vectors[key]
+        while len(self._postings) > settings.RESUME_MATCH_CACHE_POSTINGS:
+            self._postings.popitem(last=False)
+        return {url: vectors[posting_key(url)] for url in urls}
+
+    async def choose(self, db: AsyncSession, user_id: uuid.UUID, urls: Sequence[str]) -> Dict[str, uuid.UUID]:
+        # url -> best parsed resume; {} when the user has none
+        matrix = await self._matrix(db, user_id)
+        if matrix is None:
+            return {}
+        if len(matrix.resume_ids) == 1:
+            return {url: matrix.resume_ids[0] for url in urls}
+        # Don't hold a pooled connection open across posting fetches
+        await db.commit()
+        vectors = await self._posting_vectors(urls)
+        distinct = list(vectors)
+        return dict(zip(distinct, matrix.best([vectors[url] for url in distinct])))
+
+
+matcher = ResumeMatcher()
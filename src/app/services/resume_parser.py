@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import re
+from dataclasses import dataclass
 from io import BytesIO
-from typing import Any, Dict
-
-import httpx
-from openai import AzureOpenAI
-from pypdf import PdfReader
+from typing import IO, TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from ..config import get_settings
-from .storage_r2 import get_presigned_get_url
+from .resume_extract import extract_local, split_sections
+from .resume_text import count_tokens, normalize_pages, truncate_to_tokens
+from .blob_cache import cache as blob_cache
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
+
+# openai and pypdf are imported on first parse: together they are most of the app's import time
 
 
 def _extract_json(text: str) -> Dict[str, Any]:
@@ -24,8 +29,10 @@ def _extract_json(text: str) -> Dict[str, Any]:
     return json.loads(candidate)
 
 
-def _pdf_bytes_to_text(pdf_bytes: bytes) -> str:
-    reader = PdfReader(BytesIO(pdf_bytes))
+def _pdf_to_text(stream: IO[bytes]) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(stream)
     parts: list[str] = []
     for page in reader.pages:
         try:
@@ -33,20 +40,35 @@ def _pdf_bytes_to_text(pdf_bytes: bytes) -> str:
         except Exception:
             # Continue on minor extraction failures
             continue
-    text = "\n".join(parts)
-    # Trim to a large but bounded size to avoid context overflows
-    return text[:200_000]
+    # Repeated headers/footers, whitespace runs and hyphenation breaks only cost tokens
+    return normalize_pages(parts)
 
 
-def _get_azure_client() -> AzureOpenAI:
-    settings = get_settings()
-    if not settings.AZURE_OPENAI_ENDPOINT or not settings.AZURE_OPENAI_API_KEY:
-        raise RuntimeError("Azure OpenAI not configured")
-    return AzureOpenAI(
-        api_key=settings.AZURE_OPENAI_API_KEY,
-        api_version=settings.AZURE_OPENAI_API_VERSION or "2024-10-21",
-        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-    )
+_azure_client: Optional[AsyncAzureOpenAI] = None
+
+
+def get_azure_client() -> AsyncAzureOpenAI:
+    # Created on first use and shared, so parses reuse its connection pool; closed by the lifespan
+    global _azure_client
+    if _azure_client is None:
+        settings = get_settings()
+        if not settings.AZURE_OPENAI_ENDPOINT or not settings.AZURE_OPENAI_API_KEY:
+            raise RuntimeError("Azure OpenAI not configured")
+        from openai import AsyncAzureOpenAI
+
+        _azure_client = AsyncAzureOpenAI(
+            api_key=settings.AZURE_OPENAI_API_KEY,
+            api_version=settings.AZURE_OPENAI_API_VERSION or "2024-10-21",
+            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+        )
+    return _azure_client
+
+
+async def close_client() -> None:
+    global _azure_client
+    client, _azure_client = _azure_client, None
+    if client is not None:
+        await client.close()
 
 
 SYSTEM_PROMPT = (
@@ -57,34 +79,216 @@ SYSTEM_PROMPT = (
 )
 
 
-async def parse_resume_from_r2_key(r2_key: str) -> Dict[str, Any]:
-    settings = get_settings()
-    # Fetch file from R2 via presigned URL
-    url = get_presigned_get_url(r2_key)
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.get(url)
-        resp.raise_for_status()
-        pdf_bytes = resp.content
+# Section-chunked parsing: each section kind is parsed with a prompt for its slice of the schema
+SECTION_PROMPTS: Dict[str, str] = {
+    "contact": (
+        "You are an expert resume parser. From this resume header, extract JSON with fields: "
+        "{ name, email, phone, links: string[], address?, work_auth? }. Return ONLY JSON."
+    ),
+    "experience": (
+        "You are an expert resume parser. From this part of a resume's work history, extract JSON: "
+        "{ experience: { company, title, start, end, location?, bullets: string[] }[] }. Return ONLY JSON."
+    ),
+    "education": (
+        "You are an expert resume parser. From this resume education section, extract JSON: "
+        "{ education: { school, degree, start, end }[] }. Return ONLY JSON."
+    ),
+    "skills": (
+        "You are an expert resume parser. From this resume skills section, extract JSON: "
+        "{ skills: string[] }. Return ONLY JSON."
+    ),
+}
 
-    text = _pdf_bytes_to_text(pdf_bytes)
+# Fields each section may contribute; anything else a chunk returns is ignored when merging.
+# "profile" is a whole-profile result (local extraction or a single completion).
+SECTION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "contact": ("name", "email", "phone", "links", "address", "work_auth"),
+    "experience": ("experience",),
+    "education": ("education",),
+    "skills": ("skills",),
+}
+SECTION_FIELDS["profile"] = tuple(f for fields in SECTION_FIELDS.values() for f in fields)
+
+# Merge identity for list entries, so overlapping chunks do not duplicate them
+_ENTRY_KEYS: Dict[str, Tuple[str, ...]] = {
+    "experience": ("company", "title", "start"),
+    "education": ("school", "degree", "start"),
+}
+
+
+@dataclass
+class ParseResult:
+    profile: Dict[str, Any]
+    mode: str  # local | single | sectioned
+    input_tokens: int = 0  # normalized resume text sent to the model, after local extraction
+    llm_calls: int = 0
+    prompt_tokens: int = 0  # as reported by the completions' usage
+    completion_tokens: int = 0
+
+    def add_usage(self, usage: Any) -> None:
+        self.llm_calls += 1
+        if usage is not None:
+            self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+
+def _pack_lines(text: str, max_tokens: int) -> List[str]:
+    # Greedy split on line boundaries so no chunk exceeds max_tokens (unless one line does)
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.splitlines():
+        line_tokens = count_tokens(line) + 1
+        if current and size + line_tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += line_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def build_chunks(sections: List[Tuple[str, str]], max_tokens: int) -> List[Tuple[str, str]]:
+    # Same-kind sections are parsed together (a CV may repeat "Experience" per page), then
+    # oversized kinds are split; order is kept so merging is deterministic
+    by_kind: Dict[str, List[str]] = {}
+    for kind, body in sections:
+        by_kind.setdefault(kind, []).append(body)
+    chunks: List[Tuple[str, str]] = []
+    for kind in SECTION_PROMPTS:
+        if kind in by_kind:
+            chunks.extend((kind, chunk) for chunk in _pack_lines("\n".join(by_kind[kind]), max_tokens))
+    return chunks
+
+
+def _entry_key(field: str, item: Any) -> Any:
+    if isinstance(item, dict):
+        keys = _ENTRY_KEYS.get(field)
+        if keys:
+            return tuple(str(item.get(k) or "").strip().casefold() for k in keys)
+        return json.dumps(item, sort_keys=True)
+    return str(item).strip().casefold()
 
-    # Call Azure OpenAI (GPT-5 deployment) to extract JSON
-    client = _get_azure_client()
-    deployment = settings.AZURE_OPENAI_DEPLOYMENT
-    if not deployment:
-        raise RuntimeError("AZURE_OPENAI_DEPLOYMENT not configured")
 
-    completion = client.chat.completions.create(
+def merge_profiles(parts: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    # First non-empty scalar wins; lists are concatenated in chunk order without duplicates
+    profile: Dict[str, Any] = {
+        "name": None,
+        "email": None,
+        "phone": None,
+        "links": [],
+        "education": [],
+        "experience": [],
+        "skills": [],
+    }
+    seen: Dict[str, set] = {}
+    for kind, part in parts:
+        for field in SECTION_FIELDS[kind]:
+            value = part.get(field)
+            if isinstance(value, list):
+                bucket = profile.setdefault(field, [])
+                keys = seen.setdefault(field, {_entry_key(field, item) for item in bucket})
+                for item in value:
+                    key = _entry_key(field, item)
+                    if item and key not in keys:
+                        keys.add(key)
+                        bucket.append(item)
+            elif value not in (None, "") and profile.get(field) in (None, ""):
+                profile[field] = value
+    return profile
+
+
+async def _complete_json(
+    client: AsyncAzureOpenAI, deployment: str, system_prompt: str, text: str, result: ParseResult
+) -> Dict[str, Any]:
+    completion = await client.chat.completions.create(
         model=deployment,
         messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "system", "content": system_prompt},
             {"role": "user", "content": text},
         ],
         temperature=0.0,
         response_format={"type": "json_object"},
     )
-
+    result.add_usage(getattr(completion, "usage", None))
     content = completion.choices[0].message.content
     return _extract_json(content)
 
 
+async def _parse_sectioned(
+    client: AsyncAzureOpenAI, deployment: str, chunks: List[Tuple[str, str]], max_parallel: int, result: ParseResult
+) -> List[Tuple[str, Dict[str, Any]]]:
+    sem = asyncio.Semaphore(max(1, max_parallel))
+
+    async def parse_chunk(kind: str, chunk: str) -> Dict[str, Any]:
+        async with sem:
+            return await _complete_json(client, deployment, SECTION_PROMPTS[kind], chunk, result)
+
+    results = await asyncio.gather(*(parse_chunk(kind, chunk) for kind, chunk in chunks))
+    return [(kind, part) for (kind, _), part in zip(chunks, results)]
+
+
+def _wants_sections(input_tokens: int) -> bool:
+    settings = get_settings()
+    mode = settings.RESUME_PARSE_MODE
+    if mode == "single":
+        return False
+    return mode == "sectioned" or input_tokens >= settings.RESUME_PARSE_SECTIONED_MIN_TOKENS
+
+
+def _sections_text(sections: List[Tuple[str, str]]) -> str:
+    # Headings are re-emitted so split_sections recovers the same sections from the result
+    return "\n\n".join(f"{kind.upper()}\n{body}" if kind != "contact" else body for kind, body in sections)
+
+
+async def parse_resume_text(text: str, *, local_extract: Optional[bool] = None) -> ParseResult:
+    settings = get_settings()
+    if local_extract is None:
+        local_extract = settings.RESUME_PARSE_LOCAL_EXTRACT
+    parts: List[Tuple[str, Dict[str, Any]]] = []
+    if local_extract:
+        # Regex-found fields go first so they win the merge; simple resumes never reach the model
+        local = extract_local(text)
+        parts.append(("profile", local.profile))
+        if local.complete:
+            return ParseResult(profile=merge_profiles(parts), mode="local")
+        sections = local.remaining
+        text = _sections_text(sections)
+    else:
+        sections = split_sections(text)
+
+    # Budget by tokens rather than characters; the tail of an oversized resume is dropped
+    input_tokens = count_tokens(text)
+    if input_tokens > settings.RESUME_PARSE_MAX_INPUT_TOKENS:
+        text = truncate_to_tokens(text, settings.RESUME_PARSE_MAX_INPUT_TOKENS)
+        sections = split_sections(text)
+        input_tokens = settings.RESUME_PARSE_MAX_INPUT_TOKENS
+
+    # Call Azure OpenAI (GPT-5 deployment) to extract JSON
+    client = get_azure_client()
+    deployment = settings.AZURE_OPENAI_DEPLOYMENT
+    if not deployment:
+        raise RuntimeError("AZURE_OPENAI_DEPLOYMENT not configured")
+
+    result = ParseResult(profile={}, mode="single", input_tokens=input_tokens)
+    chunks = build_chunks(sections, settings.RESUME_PARSE_CHUNK_TOKENS) if _wants_sections(input_tokens) else []
+    # Without recognizable headings there is nothing to split on
+    if len(chunks) > 1:
+        result.mode = "sectioned"
+        parts.extend(await _parse_sectioned(client, deployment, chunks, settings.RESUME_PARSE_MAX_PARALLEL, result))
+    else:
+        parts.append(("profile", await _complete_json(client, deployment, SYSTEM_PROMPT, text, result)))
+    result.profile = merge_profiles(parts)
+    return result
+
+
+async def parse_resume_pdf(pdf_bytes: bytes, *, local_extract: Optional[bool] = None) -> ParseResult:
+    return await parse_resume_text(_pdf_to_text(BytesIO(pdf_bytes)), local_extract=local_extract)
+
+
+async def parse_resume_from_r2_key(r2_key: str) -> ParseResult:
+    # Read from the local blob cache; only the first access of a resume downloads it from R2
+    async with blob_cache.open(r2_key) as pdf:
+        text = _pdf_to_text(pdf)
+    return await parse_resume_text(text)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from .resume_extract import section_kind
+
+# Compaction of pypdf output before it is prompted, and token counting for budgets.
+# Tokens are counted with tiktoken; only while its encoding file can't be loaded (it is
+# downloaded on first use) are they estimated at 4 characters each.
+
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n(?=[a-z])")
+_INLINE_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+_PAGE_NUMBER_RE = re.compile(r"^[-–—\s]*(?:page\s*)?\d+(?:\s*(?:of|/)\s*\d+)?[-–—\s]*$", re.IGNORECASE)
+
+# Header/footer candidates are the first and last lines of each page
+_EDGE_LINES = 2
+CHARS_PER_TOKEN = 4
+
+
+def _line_signature(line: str) -> str:
+    # Page numbers ("Page 2 of 5", "- 3 -") all share one signature; other lines match exactly
+    line = _INLINE_SPACE_RE.sub(" ", line).strip()
+    return "#page" if _PAGE_NUMBER_RE.match(line) else line.casefold()
+
+
+def _edge_indexes(lines: List[str]) -> List[int]:
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return sorted(set(filled[:_EDGE_LINES] + filled[-_EDGE_LINES:]))
+
+
+def strip_repeated_edges(pages: List[str]) -> List[str]:
+    # Drop header/footer lines that recur on at least half the pages (and at least two), and
+    # page numbers. Section headings are kept: "Experience (continued)" still marks a boundary.
+    if len(pages) < 2:
+        return pages
+    page_lines = [page.splitlines() for page in pages]
+    counts: Counter = Counter()
+    for lines in page_lines:
+        counts.update({_line_signature(lines[i]) for i in _edge_indexes(lines)})
+    threshold = max(2, (len(pages) + 1) // 2)
+    repeated = {sig for sig, n in counts.items() if n >= threshold}
+    if not repeated:
+        return pages
+    # The first occurrence stays (a repeated name/contact header is still the resume's header)
+    kept = {"#page"}
+    cleaned: List[str] = []
+    for lines in page_lines:
+        drop = set()
+        for i in _edge_indexes(lines):
+            sig = _line_signature(lines[i])
+            if sig not in repeated or section_kind(lines[i]) is not None:
+                continue
+            if sig in kept:
+                drop.add(i)
+            else:
+                kept.add(sig)
+        cleaned.append("\n".join(line for i, line in enumerate(lines) if i not in drop))
+    return cleaned
+
+
+def normalize_text(text: str) -> str:
+    text = _CONTROL_RE.sub("", text.replace("\r\n", "\n").replace("\r", "\n"))
+    text = "\n".join(_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.split("\n"))
+    # "distri-\nbuted" -> "distributed"; a capitalized next line is more likely a new item
+    text = _HYPHEN_BREAK_RE.sub(r"\1", text)
+    return _BLANK_RUN_RE.sub("\n\n", text).strip()
+
+
+def normalize_pages(pages: List[str]) -> str:
+    return normalize_text("\n".join(strip_repeated_edges(pages)))
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Optional[Any]:
+    # Imported on first count, not at module import (bench.import_bench)
+    import tiktoken
+
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Encoding files are downloaded on first use (or read from TIKTOKEN_CACHE_DIR); hosts
+        # that can reach neither fall back to estimates
+        return None
+
+
+def count_tokens(text: str) -> int:
+    enc = _encoding()
+    if enc is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    enc = _encoding()
+    if enc is None:
+        return text[: max_tokens * CHARS_PER_TOKEN]
+    tokens = enc.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else enc.decode(tokens[:max_tokens])
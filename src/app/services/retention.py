@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, false, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..models import ApplicationArtifact, CoverLetter, JobApplication, JobStatus, KernelCallback, Resume
+from .storage_r2 import delete_objects, list_objects
+from .version_cache import publish_change
+
+# Deletes old job history in bounded batches and finds R2 objects no row points to.
+# Rows are deleted first and objects after the commit: an interrupted run can leave an
+# orphaned object (found by find_orphans), never a row whose object is gone.
+
+TERMINAL_STATUSES = (JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled)
+
+# R2 prefix -> columns holding the keys written under it. Jobs point at cover letters too: a
+# generated letter's key, or one passed in when the job was created.
+ORPHAN_PREFIXES: Tuple[Tuple[str, Tuple[Any, ...]], ...] = (
+    ("resumes/", (Resume.r2_key,)),
+    ("cover-letters/", (CoverLetter.r2_key, JobApplication.cover_letter_r2_key)),
+    ("artifacts/", (ApplicationArtifact.r2_key,)),
+)
+
+
+@dataclass
+class RetentionPolicy:
+    max_age_days: Dict[str, int]
+    max_jobs_per_resume: Optional[int] = None
+    batch_size: int = 1000
+    # Stored Kernel callbacks are only read while their run waits
+    callback_max_age_days: int = 7
+
+    @classmethod
+    def from_settings(cls) -> RetentionPolicy:
+        settings = get_settings()
+        return cls(
+            max_age_days=dict(settings.RETENTION_MAX_AGE_DAYS),
+            max_jobs_per_resume=settings.RETENTION_MAX_JOBS_PER_RESUME,
+            batch_size=settings.RETENTION_BATCH_SIZE,
+            callback_max_age_days=settings.RETENTION_KERNEL_CALLBACK_DAYS,
+        )
+
+
+@dataclass
+class RetentionReport:
+    jobs: int = 0
+    artifacts: int = 0
+    objects: int = 0
+    batches: int = 0
+    callbacks: int = 0
+
+
+@dataclass
+class OrphanReport:
+    prefix: str
+    listed: int = 0
+    # Objects without a row, and rows whose object is missing
+    orphaned: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+
+def _aged(status: Any, created_at: Any, policy: RetentionPolicy, now: datetime) -> List[Any]:
+    return [
+        and_(status == JobStatus(name), created_at < now - timedelta(days=days))
+        for name, days in policy.max_age_days.items()
+        if JobStatus(name) in TERMINAL_STATUSES
+    ]
+
+
+def _expired_jobs(policy: RetentionPolicy, now: datetime):
+    # (id, created_at) of terminal jobs matched by any rule
+    if policy.max_jobs_per_resume is None:
+        aged = _aged(JobApplication.status, JobApplication.created_at, policy, now)
+        return select(JobApplication.id, JobApplication.created_at).where(or_(false(), *aged))
+    ranked = (
+        select(
+            JobApplication.id,
+            JobApplication.created_at,
+            JobApplication.status,
+            func.row_number()
+            .over(partition_by=JobApplication.resume_id, order_by=JobApplication.created_at.desc())
+            .label("rank"),
+        )
+        .where(JobApplication.status.in_(TERMINAL_STATUSES))
+        .subquery()
+    )
+    aged = _aged(ranked.c.status, ranked.c.created_at, policy, now)
+    return select(ranked.c.id, ranked.c.created_at).where(or_(ranked.c.rank > policy.max_jobs_per_resume, *aged))
+
+
+async def count_expired(db: AsyncSession, policy: RetentionPolicy) -> int:
+    expired = _expired_jobs(policy, datetime.now(timezone.utc)).subquery()
+    return (await db.execute(select(func.count()).select_from(expired))).scalar_one()
+
+
+async def apply_retention(db: AsyncSession, policy: RetentionPolicy) -> RetentionReport:
+    report = RetentionReport()
+    # Fixed cutoff: jobs aging past it mid-run wait for the next run
+    stmt = _expired_jobs(policy, datetime.now(timezone.utc)).limit(policy.batch_size)
+    while True:
+        batch = [tuple(row) for row in (await db.execute(stmt)).all()]
+        if not batch:
+            break
+        # Artifacts would cascade too; deleting them explicitly returns their object keys
+        r2_keys = list(
+            (
+                await db.execute(
+                    delete(ApplicationArtifact)
+                    .where(tuple_(ApplicationArtifact.job_application_id, ApplicationArtifact.job_created_at).in_(batch))
+                    .returning(ApplicationArtifact.r2_key)
+                    .execution_options(synchronize_session=False)
+                )
+            ).scalars()
+        )
+        # job_runs cascade from job_applications
+        await db.execute(
+            delete(JobApplication)
+            .where(tuple_(JobApplication.id, JobApplication.created_at).in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        # Workers drop all cached job versions; a deleted job must not answer 304
+        await publish_change(db, "job")
+        await db.commit()
+        if r2_keys:
+            report.objects += await asyncio.to_thread(delete_objects, r2_keys)
+        report.jobs += len(batch)
+        report.artifacts += len(r2_keys)
+        report.batches += 1
+    res = await db.execute(
+        delete(KernelCallback).where(
+            KernelCallback.created_at < datetime.now(timezone.utc) - timedelta(days=policy.callback_max_age_days)
+        )
+    )
+    report.callbacks = res.rowcount
+    await db.commit()
+    return report
+
+
+async def find_orphans(db: AsyncSession, prefix: str, columns: Tuple[Any, ...], grace: timedelta) -> OrphanReport:
+    report = OrphanReport(prefix=prefix)
+    known = set()
+    for column in columns:
+        stmt = select(column).where(column.startswith(prefix, autoescape=True)).distinct()
+        known.update((await db.execute(stmt)).scalars())
+    listed = await asyncio.to_thread(lambda: list(list_objects(prefix)))
+    report.listed = len(listed)
+    cutoff = datetime.now(timezone.utc) - grace
+    report.orphaned = sorted(key for key, modified in listed if key not in known and modified < cutoff)
+    report.missing = sorted(known - {key for key, _ in listed})
+    return report
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..models import JobApplication, JobStatus
+
+logger = logging.getLogger(__name__)
+
+Runner = Callable[[str], Awaitable[None]]
+
+# NOTIFY payload is the job id; every worker drops the queued entry or cancels its running task
+CANCEL_CHANNEL = "job_cancel"
+
+
+def effective_deadline(priority: int, deadline: Optional[datetime], queued_at: datetime) -> datetime:
+    # Earliest-deadline-first key. Jobs without a deadline get a virtual one that is fixed at
+    # enqueue time, so a waiting job's key never moves while newer jobs keep arriving later:
+    # that is the aging that keeps low-priority work from starving.
+    settings = get_settings()
+    slack_s = settings.SCHEDULER_SLACK_S - priority * settings.SCHEDULER_PRIORITY_STEP_S
+    virtual = queued_at + timedelta(seconds=slack_s)
+    return min(deadline, virtual) if deadline is not None else virtual
+
+
+@dataclass(order=True)
+class _Entry:
+    key: datetime
+    seq: int
+    job_id: str = field(compare=False)
+    removed: bool = field(default=False, compare=False)
+
+
+class JobScheduler:
+    # In-process EDF queue in front of Kernel browser capacity. Dispatch is limited to
+    # KERNEL_MAX_CONCURRENCY concurrent runs; the runner claims the row (queued -> running)
+    # so a job enqueued by several workers still runs once.
+
+    def __init__(self, runner: Runner) -> None:
+        self._runner = runner
+        self._heap: List[_Entry] = []
+        self._entries: Dict[str, _Entry] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def holds(self, job_id: str) -> bool:
+        # Queued here, or a run (possibly cancelled and still winding down) hasn't finished
+        return job_id in self._entries or job_id in self._running
+
+    def submit(self, job_id: str, *, priority: int = 0, deadline: Optional[datetime] = None, queued_at: Optional[datetime] = None) -> None:
+        if self.holds(job_id):
+            return
+        key = effective_deadline(priority, deadline, queued_at or datetime.now(timezone.utc))
+        entry = _Entry(key=key, seq=next(self._seq), job_id=job_id)
+        self._entries[job_id] = entry
+        heapq.heappush(self._heap, entry)
+        self._wakeup.set()
+
+    def submit_job(self, job: JobApplication) -> None:
+        self.submit(str(job.id), priority=job.priority, deadline=job.deadline, queued_at=job.queued_at)
+
+    def queued(self) -> List[str]:
+        # Job ids in dispatch order
+        return [e.job_id for e in sorted(self._heap) if not e.removed]
+
+    def cancel(self, job_id: str) -> bool:
+        # Drop a queued entry (lazily, it stays in the heap) or cancel the running task
+        entry = self._entries.pop(job_id, None)
+        if entry is not None:
+            entry.removed = True
+            return True
+        task = self._running.get(job_id)
+        if task is not None and not task.done():
+            task.cancel()
+            return True
+        return False
+
+    def on_cancel_notification(self, payload: Optional[str]) -> None:
+        if payload:
+            self.cancel(payload)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._slots = asyncio.Semaphore(max(1, get_settings().KERNEL_MAX_CONCURRENCY))
+            self._wakeup = asyncio.Event()
+            if self._heap:
+                self._wakeup.set()
+            self._task = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self) -> None:
+        # Queued jobs stay `queued` in the database and are re-enqueued on the next start
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        running = list(self._running.values())
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    def _pop(self) -> Optional[_Entry]:
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if not entry.removed:
+                self._entries.pop(entry.job_id, None)
+                return entry
+        return None
+
+    async def _dispatch_loop(self) -> None:
+        assert self._slots is not None
+        while True:
+            await self._slots.acquire()
+            entry = self._pop()
+            while entry is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                entry = self._pop()
+            task = asyncio.create_task(self._run(entry.job_id))
+            self._running[entry.job_id] = task
+
+    async def _run(self, job_id: str) -> None:
+        try:
+            await self._runner(job_id)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("Job %s failed outside the graph", job_id)
+        finally:
+            self._running.pop(job_id, None)
+            assert self._slots is not None
+            self._slots.release()
+
+
+async def enqueue_pending(db: AsyncSession, sched: JobScheduler) -> int:
+    # Jobs accepted by /run but not yet dispatched when the process stopped
+    stmt = (
+        select(JobApplication)
+        .where(JobApplication.status == JobStatus.queued, JobApplication.queued_at.is_not(None))
+        .order_by(JobApplication.queued_at)
+    )
+    res = await db.execute(stmt)
+    jobs = res.scalars().all()
+    for job in jobs:
+        sched.submit_job(job)
+    return len(jobs)
+
+
+def _run_job(job_id: str) -> Awaitable[None]:
+    from .job_runner import run_job
+
+    return run_job(job_id)
+
+
+scheduler = JobScheduler(_run_job)
@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import re
 import uuid
-from typing import Optional
-
-import boto3
-from botocore.client import Config
-from botocore.exceptions import BotoCoreError, ClientError
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, Tuple
 
 from ..config import get_settings
 
+# boto3 is imported when the first client is built, not with the routers
+
+# DeleteObjects accepts at most this many keys per request
+DELETE_BATCH_SIZE = 1000
+
 
 def _get_endpoint_url(settings) -> Optional[str]:
     if settings.R2_ENDPOINT:
@@ -19,7 +22,12 @@ def _get_endpoint_url(settings) -> Optional[str]:
     return None
 
 
+@lru_cache(maxsize=1)
 def get_s3_client():
+    # One client per process: boto3 clients are thread-safe and building one is slow
+    import boto3
+    from botocore.client import Config
+
     settings = get_settings()
     if not settings.R2_ACCESS_KEY_ID or not settings.R2_SECRET_ACCESS_KEY:
         raise RuntimeError("R2 credentials not configured")
@@ -36,7 +44,7 @@ def get_s3_client():
         aws_access_key_id=settings.R2_ACCESS_KEY_ID,
         aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
         endpoint_url=endpoint_url,
-        config=Config(signature_version="s3v4"),
+        config=Config(signature_version="s3v4", max_pool_connections=settings.R2_MAX_POOL_CONNECTIONS),
     )
     return client
 
@@ -47,13 +55,22 @@ def sanitize_filename(filename: str) -> str:
     return name or "file"
 
 
-def build_resume_key(original_filename: str) -> str:
+def build_resume_key(original_filename: str, user_id: Optional[uuid.UUID] = None) -> str:
     settings = get_settings()
     safe_name = sanitize_filename(original_filename)
+    if user_id is not None:
+        return f"resumes/{user_id}/{uuid.uuid4()}-{safe_name}"
     return f"resumes/{uuid.uuid4()}-{safe_name}"
 
 
+def build_artifact_key(job_id: uuid.UUID, kind: str, filename: str) -> str:
+    # Screenshots/HTML/PDFs captured during a run; retention scans artifacts/ for orphans
+    return f"artifacts/{job_id}/{kind}/{uuid.uuid4()}-{sanitize_filename(filename)}"
+
+
 def put_file(fileobj, key: str, content_type: Optional[str] = None) -> None:
+    from botocore.exceptions import BotoCoreError, ClientError
+
     settings = get_settings()
     bucket = settings.R2_BUCKET
     if not bucket:
@@ -67,6 +84,51 @@ def put_file(fileobj, key: str, content_type: Optional[str] = None) -> None:
         raise RuntimeError(f"Failed to upload to R2: {e}")
 
 
+def list_objects(prefix: str) -> Iterator[Tuple[str, datetime]]:
+    # (key, last modified) for every object under prefix, one ListObjectsV2 page at a time
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    settings = get_settings()
+    bucket = settings.R2_BUCKET
+    if not bucket:
+        raise RuntimeError("R2_BUCKET is not configured")
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    try:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"], obj["LastModified"]
+    except (BotoCoreError, ClientError) as e:
+        raise RuntimeError(f"Failed to list R2 objects: {e}")
+
+
+def delete_objects(keys: Sequence[str]) -> int:
+    # Batched DeleteObjects; deleting a missing key succeeds. Returns the number deleted.
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    settings = get_settings()
+    bucket = settings.R2_BUCKET
+    if not bucket:
+        raise RuntimeError("R2_BUCKET is not configured")
+    client = get_s3_client()
+    deleted = 0
+    failed: List[str] = []
+    for i in range(0, len(keys), DELETE_BATCH_SIZE):
+        chunk = keys[i : i + DELETE_BATCH_SIZE]
+        try:
+            resp = client.delete_objects(
+                Bucket=bucket, Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True}
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"Failed to delete from R2: {e}")
+        # Quiet mode lists only the failures
+        errors = resp.get("Errors", [])
+        failed.extend(f"{err.get('Key')}: {err.get('Code')}" for err in errors)
+        deleted += len(chunk) - len(errors)
+    if failed:
+        raise RuntimeError(f"Failed to delete {len(failed)} R2 objects, e.g. {failed[0]}")
+    return deleted
+
+
 def get_public_url(key: str) -> Optional[str]:
     settings = get_settings()
     if settings.R2_PUBLIC_BASE_URL:
@@ -76,6 +138,8 @@ def get_public_url(key: str) -> Optional[str]:
 
 
 def get_presigned_get_url(key: str, expires_seconds: int = 900) -> str:
+    from botocore.exceptions import BotoCoreError, ClientError
+
     settings = get_settings()
     bucket = settings.R2_BUCKET
     if not bucket:
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import contextvars
+import secrets
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..config import get_settings
+
+
+# Lightweight OpenTelemetry-style spans. Spans are collected in-process per job run,
+# persisted as JSONB on `job_runs` and optionally exported to an OTLP/HTTP collector.
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return round((self.end_ns - self.start_ns) / 1_000_000, 3)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.attributes["error.type"] = type(exc).__name__
+        self.attributes["error.message"] = str(exc)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+@dataclass
+class Trace:
+    trace_id: str = field(default_factory=lambda: secrets.token_hex(16))
+    spans: List[Span] = field(default_factory=list)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [s.to_dict() for s in self.spans]
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+@contextmanager
+def start_trace() -> Iterator[Trace]:
+    trace = Trace()
+    token_trace = _current_trace.set(trace)
+    token_span = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(token_span)
+        _current_trace.reset(token_trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    # Outside of an active trace spans are still usable but not recorded anywhere
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    sp = Span(
+        name=name,
+        trace_id=trace.trace_id if trace else "",
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        attributes=dict(attributes),
+    )
+    if trace is not None:
+        trace.spans.append(sp)
+    token = _current_span.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        sp.record_exception(e)
+        raise
+    finally:
+        sp.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def to_otlp_json(trace: Trace, service_name: str) -> Dict[str, Any]:
+    spans = []
+    for s in trace.spans:
+        spans.append(
+            {
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                "attributes": _otlp_attributes(s.attributes),
+                "events": [
+                    {
+                        "name": e["name"],
+                        "timeUnixNano": str(e["time_ns"]),
+                        "attributes": _otlp_attributes(e.get("attributes") or {}),
+                    }
+                    for e in s.events
+                ],
+                "status": {"code": 2 if s.status == "error" else 1},
+            }
+        )
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "kernel-job-agent"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+async def export_trace(trace: Trace) -> None:
+    # Best-effort export to a local OTLP/HTTP collector (e.g. otel-collector, Jaeger, Tempo)
+    settings = get_settings()
+    endpoint = settings.OTEL_EXPORTER_OTLP_ENDPOINT
+    if not endpoint or not trace.spans:
+        return
+    import httpx
+
+    body = to_otlp_json(trace, settings.APP_NAME)
+    try:
+        async with httpx.AsyncClient(timeout=5) as client:
+            await client.post(f"{endpoint.rstrip('/')}/v1/traces", json=body)
+    except Exception:
+        # Tracing must never fail a job
+        pass
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from .notifications import notify
+
+# Row versions behind conditional GETs of detail endpoints. A cached version lets a poll with a
+# matching If-None-Match get its 304 without a query. Only rows that change through the API are
+# cached (terminal jobs, resumes); the writer publishes on CHANNEL so every worker drops the
+# entry, with a TTL as the fallback when notifications are missed.
+
+CHANNEL = "version_changed"
+
+
+def version_of(updated_at: datetime) -> str:
+    return format(int(updated_at.timestamp() * 1_000_000), "x")
+
+
+def weak_etag(kind: str, version: str) -> str:
+    return f'W/"{kind}-{version}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+class VersionCache:
+    def __init__(self) -> None:
+        # (kind, id) -> (owner, version, stored at)
+        self._entries: "OrderedDict[Tuple[str, uuid.UUID], Tuple[uuid.UUID, str, float]]" = OrderedDict()
+
+    def get(self, kind: str, row_id: uuid.UUID, user_id: uuid.UUID) -> Optional[str]:
+        entry = self._entries.get((kind, row_id))
+        if entry is None:
+            return None
+        owner, version, stored_at = entry
+        if time.monotonic() - stored_at >= get_settings().VERSION_CACHE_TTL_S:
+            del self._entries[(kind, row_id)]
+            return None
+        # Another user's id must look exactly like an unknown one
+        return version if owner == user_id else None
+
+    def remember(self, kind: str, row_id: uuid.UUID, user_id: uuid.UUID, version: str) -> None:
+        self._entries[(kind, row_id)] = (user_id, version, time.monotonic())
+        self._entries.move_to_end((kind, row_id))
+        while len(self._entries) > get_settings().VERSION_CACHE_SIZE:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, payload: Optional[str] = None) -> None:
+        # payload is "<kind>:<id>"; None (reconnect), "" (bulk change) or garbage clears everything
+        kind, _, raw_id = (payload or "").partition(":")
+        try:
+            key = (kind, uuid.UUID(raw_id))
+        except ValueError:
+            self._entries.clear()
+            return
+        self._entries.pop(key, None)
+
+
+cache = VersionCache()
+
+
+async def publish_change(db: AsyncSession, kind: str, row_id: Optional[uuid.UUID] = None) -> None:
+    # Drops the local entry now and, once the caller commits, the entries of other workers
+    payload = f"{kind}:{row_id}" if row_id is not None else ""
+    cache.invalidate(payload)
+    await notify(db, CHANNEL, payload)
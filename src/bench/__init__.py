@@ -0,0 +1 @@
+"""Load-test and benchmark harness with local fakes for Kernel, R2 and Azure OpenAI."""
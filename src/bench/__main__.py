@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+from pathlib import Path
+from typing import List
+
+from .fakes import LatencyModel, create_fake_kernel, create_fake_openai, create_fake_s3
+from .harness import (
+    ThreadedServer,
+    WorkloadResult,
+    compare_to_baseline,
+    config_dict,
+    format_report,
+    free_port,
+    save_baseline,
+)
+from .workloads import (
+    WorkloadConfig,
+    bulk_cover_letters,
+    bulk_submit,
+    concurrent_runs,
+    dashboard_polling,
+    parse_burst,
+    upload_resume,
+)
+
+WORKLOADS = ("submit", "runs", "parse", "letters", "dashboard")
+BENCH_BUCKET = "bench"
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench", description="Benchmark the API against local fakes for Kernel, R2 and Azure OpenAI"
+    )
+    parser.add_argument(
+        "--database-url",
+        default=os.environ.get("BENCH_DATABASE_URL"),
+        help="Local Postgres URL (default: $BENCH_DATABASE_URL). Tables are recreated with --reset-db.",
+    )
+    parser.add_argument("--reset-db", action="store_true", help="Drop and recreate all tables before running")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help=f"Comma-separated subset of {WORKLOADS}")
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs created by the submit workload")
+    parser.add_argument("--runs", type=int, default=20, help="Concurrent job runs")
+    parser.add_argument("--parses", type=int, default=20, help="Resumes parsed in the parse burst")
+    parser.add_argument("--resume-pages", type=int, default=2, help="Pages per generated resume in the parse burst")
+    parser.add_argument("--letter-batches", type=int, default=4, help="Bulk submissions in the letters workload")
+    parser.add_argument("--letter-batch-size", type=int, default=25, help="Postings per bulk submission")
+    parser.add_argument("--dashboard-seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--pollers", type=int, default=10)
+    parser.add_argument(
+        "--kernel-concurrency", type=int, default=20, help="KERNEL_MAX_CONCURRENCY for the scheduler (default 20)"
+    )
+    parser.add_argument("--kernel-latency", default="median=3000,sigma=0.6,fail=0.02")
+    parser.add_argument(
+        "--no-kernel-callbacks", action="store_true", help="Discover Kernel completion by polling only (the old path)"
+    )
+    parser.add_argument(
+        "--kernel-callback-drop", type=float, default=0.0, help="Fraction of callbacks the fake Kernel never sends"
+    )
+    parser.add_argument("--s3-latency", default="median=20,sigma=0.4,fail=0")
+    parser.add_argument("--openai-latency", default="median=1500,sigma=0.5,fail=0")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write the JSON summary to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against a baseline file; exit 1 on regression")
+    parser.add_argument("--save-baseline", type=Path, help="Write this run's summary as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    return parser.parse_args(argv)
+
+
+def configure_environment(
+    args: argparse.Namespace, kernel: ThreadedServer, s3: ThreadedServer, openai: ThreadedServer, api_url: str
+) -> None:
+    # Must run before `app` settings are first read: they are cached for the process
+    os.environ.update(
+        {
+            "DATABASE_URL": args.database_url,
+            "DATABASE_SSL": "false",
+            "R2_ACCESS_KEY_ID": "bench",
+            "R2_SECRET_ACCESS_KEY": "bench",
+            "R2_BUCKET": BENCH_BUCKET,
+            "R2_ENDPOINT": s3.url,
+            "AZURE_OPENAI_ENDPOINT": openai.url,
+            "AZURE_OPENAI_API_KEY": "bench",
+            "AZURE_OPENAI_DEPLOYMENT": "bench-deployment",
+            "AZURE_OPENAI_API_VERSION": "2024-10-21",
+            "KERNEL_API_KEY": "bench",
+            "KERNEL_BASE_URL": kernel.url,
+            "KERNEL_MAX_CONCURRENCY": str(args.kernel_concurrency),
+            # Bench job URLs are not served by any fake; don't fetch them before each run
+            "PREFLIGHT_ENABLED": "false",
+        }
+    )
+    if not args.no_kernel_callbacks:
+        os.environ.update({"KERNEL_CALLBACK_BASE_URL": api_url, "KERNEL_CALLBACK_SECRET": "bench"})
+
+
+async def prepare_database(reset: bool) -> None:
+    from app import models  # noqa: F401  (register tables)
+    from app.db import Base, get_engine
+    from app.services.partitions import ensure_partitions
+
+    # A throwaway engine: the server's own is created by its lifespan on its event loop
+    engine = get_engine()
+    async with engine.begin() as conn:
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await ensure_partitions(conn)
+    await engine.dispose()
+
+
+async def drive(base_url: str, selected: List[str], cfg: WorkloadConfig) -> List[WorkloadResult]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(cfg.concurrency, cfg.pollers, cfg.runs) * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        # Requests are scoped by X-User-Id, as set by the proxy in front of a deployment
+        resp = await client.post("/users", json={"email": f"bench-{uuid.uuid4().hex[:12]}@localhost"})
+        resp.raise_for_status()
+        client.headers["X-User-Id"] = resp.json()["id"]
+        results: List[WorkloadResult] = []
+        resume_id = None
+        if "submit" in selected or "runs" in selected:
+            resume_id = await upload_resume(client, 0)
+        if "submit" in selected:
+            results.append(await bulk_submit(client, cfg, resume_id))
+        if "runs" in selected:
+            results.append(await concurrent_runs(client, cfg, resume_id))
+        if "parse" in selected:
+            results.append(await parse_burst(client, cfg))
+        if "letters" in selected:
+            results.append(await bulk_cover_letters(client, cfg))
+        if "dashboard" in selected:
+            results.append(await dashboard_polling(client, cfg))
+        return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if not args.database_url:
+        print("A local Postgres is required: pass --database-url or set BENCH_DATABASE_URL", file=sys.stderr)
+        return 2
+    selected = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = set(selected) - set(WORKLOADS)
+    if unknown:
+        print(f"Unknown workloads: {sorted(unknown)}", file=sys.stderr)
+        return 2
+
+    cfg = WorkloadConfig(
+        jobs=args.jobs,
+        runs=args.runs,
+        parses=args.parses,
+        resume_pages=args.resume_pages,
+        letter_batches=args.letter_batches,
+        letter_batch_size=args.letter_batch_size,
+        dashboard_seconds=args.dashboard_seconds,
+        concurrency=args.concurrency,
+        pollers=args.pollers,
+    )
+    kernel_app = create_fake_kernel(
+        LatencyModel.parse(args.kernel_latency), seed=args.seed, callback_drop=args.kernel_callback_drop
+    )
+    kernel = ThreadedServer(kernel_app).start()
+    s3 = ThreadedServer(create_fake_s3(LatencyModel.parse(args.s3_latency), seed=args.seed)).start()
+    openai = ThreadedServer(create_fake_openai(LatencyModel.parse(args.openai_latency), seed=args.seed)).start()
+    # The API's address goes into each invocation's callback URL, so pick it before it starts
+    api_port = free_port()
+    configure_environment(args, kernel, s3, openai, f"http://127.0.0.1:{api_port}")
+
+    asyncio.run(prepare_database(args.reset_db))
+
+    from app.main import app
+
+    api = ThreadedServer(app, port=api_port).start()
+    try:
+        results = asyncio.run(drive(api.url, selected, cfg))
+    finally:
+        for server in (api, openai, s3, kernel):
+            server.stop()
+
+    print(format_report(results))
+    if "runs" in selected:
+        stats = kernel_app.state.callback_stats
+        print("\nkernel callbacks: " + ", ".join(f"{k}={v}" for k, v in stats.items()))
+    run_config = {
+        **config_dict(cfg),
+        "kernel_latency": args.kernel_latency,
+        "s3_latency": args.s3_latency,
+        "openai_latency": args.openai_latency,
+        "seed": args.seed,
+        "kernel_concurrency": args.kernel_concurrency,
+        "kernel_callbacks": not args.no_kernel_callbacks,
+        "kernel_callback_drop": args.kernel_callback_drop,
+    }
+    if args.output:
+        args.output.write_text(
+            json.dumps({"config": run_config, "workloads": {r.name: r.summary() for r in results}}, indent=2) + "\n"
+        )
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, run_config)
+    if args.baseline:
+        regressions = compare_to_baseline(args.baseline, results, args.tolerance)
+        if regressions:
+            print("\nRegressions vs baseline:", file=sys.stderr)
+            for reg in regressions:
+                print(f"  {reg.describe()}", file=sys.stderr)
+            return 1
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
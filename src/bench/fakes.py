@@ -0,0 +1,450 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape as xml_escape
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class LatencyModel:
+    # Log-normal latency around `median_ms`; `failure_rate` in [0, 1]. `per_ktok_ms` adds
+    # latency per 1000 prompt tokens (only meaningful for the OpenAI fake).
+    median_ms: float = 50.0
+    sigma: float = 0.5
+    failure_rate: float = 0.0
+    per_ktok_ms: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        # "median=800,sigma=0.5,fail=0.05,per_ktok=200"
+        model = cls()
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            key, _, value = part.partition("=")
+            if key == "median":
+                model.median_ms = float(value)
+            elif key == "sigma":
+                model.sigma = float(value)
+            elif key == "fail":
+                model.failure_rate = float(value)
+            elif key == "per_ktok":
+                model.per_ktok_ms = float(value)
+            else:
+                raise ValueError(f"Unknown latency option: {key}")
+        return model
+
+    def sample_s(self, rng: random.Random) -> float:
+        return rng.lognormvariate(0.0, self.sigma) * self.median_ms / 1000.0
+
+    def fails(self, rng: random.Random) -> bool:
+        return rng.random() < self.failure_rate
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ---------------------------------------------------------------------------
+# Kernel
+# ---------------------------------------------------------------------------
+
+
+def _fake_mapping(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # One form layout per host; a known mapping is confirmed, otherwise one is "learned" from the answers
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    fingerprint = hashlib.sha256(urlparse(payload.get("url") or "").netloc.encode()).hexdigest()[:32]
+    for known in payload.get("knownMappings") or []:
+        if known.get("fingerprint") == fingerprint:
+            return known
+    # Bench resumes are usually unparsed (empty answers); report the standard contact fields then
+    keys = list((payload.get("answers") or {}).get("answers") or {}) or ["first_name", "last_name", "email", "phone"]
+    return {"fingerprint": fingerprint, "fields": [{"selector": f'[name="{key}"]', "key": key} for key in keys]}
+
+
+async def _send_callback(inv_id: str, callback: Dict[str, Any], output: Dict[str, Any], stats: Dict[str, int]) -> None:
+    # What the fill_job_form action does on finish: POST its output to the backend
+    import httpx
+
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.post(
+                f"{callback['url']}/{inv_id}", json=output, headers={"Authorization": f"Bearer {callback['token']}"}
+            )
+        stats["sent" if resp.status_code < 300 else "rejected"] += 1
+    except httpx.HTTPError:
+        stats["failed"] += 1
+
+
+def create_fake_kernel(latency: LatencyModel, *, seed: int = 0, callback_drop: float = 0.0) -> FastAPI:
+    # Invocations whose payload carries a callback are called back on completion, except a
+    # `callback_drop` fraction, which only polling can discover
+    app = FastAPI(title="fake-kernel")
+    rng = random.Random(seed)
+    invocations: Dict[str, Dict[str, Any]] = {}
+    app.state.invocations = invocations
+    callback_stats = {"sent": 0, "rejected": 0, "failed": 0, "dropped": 0}
+    app.state.callback_stats = callback_stats
+
+    async def complete(inv_id: str, delay_s: float, fail: bool) -> None:
+        await asyncio.sleep(delay_s)
+        inv = invocations[inv_id]
+        if inv["status"] != "running":
+            return
+        output = {
+            "status": "failed" if fail else "succeeded",
+            "summary": "Fake failure" if fail else "Navigation and basic autofill completed",
+            "liveViewUrl": f"https://live.fake-kernel.local/{inv_id}",
+            "screenshots": [],
+            "notes": ["Detected ATS: fake", f"Simulated {delay_s * 1000:.0f}ms"],
+        }
+        if not fail:
+            output["mapping"] = _fake_mapping(inv.get("payload") or {})
+        inv["status"] = "failed" if fail else "succeeded"
+        inv["output"] = json.dumps(output)
+        inv["finished_at"] = _now_iso()
+        payload = inv.get("payload") or {}
+        callback = (json.loads(payload) if isinstance(payload, str) else payload).get("callback")
+        if callback:
+            if rng.random() < callback_drop:
+                callback_stats["dropped"] += 1
+            else:
+                await _send_callback(inv_id, callback, output, callback_stats)
+
+    @app.post("/invocations")
+    async def create_invocation(request: Request):
+        body = await request.json()
+        inv_id = uuid.uuid4().hex
+        invocations[inv_id] = {
+            "id": inv_id,
+            "action_name": body.get("action_name"),
+            "app_name": body.get("app_name"),
+            "version": body.get("version") or "latest",
+            "payload": body.get("payload"),
+            "status": "running",
+            "started_at": _now_iso(),
+            "finished_at": None,
+            "output": None,
+            "status_reason": None,
+        }
+        asyncio.create_task(complete(inv_id, latency.sample_s(rng), latency.fails(rng)))
+        inv = invocations[inv_id]
+        return {"id": inv_id, "action_name": inv["action_name"], "status": "running"}
+
+    @app.get("/invocations/{inv_id}")
+    async def retrieve_invocation(inv_id: str):
+        inv = invocations.get(inv_id)
+        if inv is None:
+            return JSONResponse({"code": "not_found", "message": "Invocation not found"}, status_code=404)
+        return inv
+
+    @app.patch("/invocations/{inv_id}")
+    async def update_invocation(inv_id: str, request: Request):
+        inv = invocations.get(inv_id)
+        if inv is None:
+            return JSONResponse({"code": "not_found", "message": "Invocation not found"}, status_code=404)
+        body = await request.json()
+        if inv["status"] == "running":
+            inv["status"] = body.get("status") or inv["status"]
+            inv["output"] = body.get("output", inv["output"])
+            inv["finished_at"] = _now_iso()
+        return inv
+
+    @app.delete("/invocations/{inv_id}/browsers")
+    async def delete_invocation_browsers(inv_id: str):
+        inv = invocations.get(inv_id)
+        if inv is None:
+            return JSONResponse({"code": "not_found", "message": "Invocation not found"}, status_code=404)
+        inv["browsers_deleted"] = True
+        return Response(status_code=204)
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# R2 (S3-compatible, path-style addressing)
+# ---------------------------------------------------------------------------
+
+
+def _decode_aws_chunked(body: bytes) -> bytes:
+    # botocore may stream uploads as aws-chunked with a trailing checksum
+    out = bytearray()
+    pos = 0
+    while pos < len(body):
+        line_end = body.index(b"\r\n", pos)
+        size = int(body[pos:line_end].split(b";", 1)[0], 16)
+        pos = line_end + 2
+        if size == 0:
+            break
+        out += body[pos : pos + size]
+        pos += size + 2
+    return bytes(out)
+
+
+def create_fake_s3(latency: LatencyModel, *, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="fake-r2")
+    rng = random.Random(seed)
+    objects: Dict[str, Dict[str, Any]] = {}
+    app.state.objects = objects
+    delete_stats = {"requests": 0, "keys": 0}
+    app.state.delete_stats = delete_stats
+
+    async def delay() -> Optional[Response]:
+        await asyncio.sleep(latency.sample_s(rng))
+        if latency.fails(rng):
+            return Response(status_code=503, content=b"<Error><Code>SlowDown</Code></Error>")
+        return None
+
+    @app.put("/{bucket}/{key:path}")
+    async def put_object(bucket: str, key: str, request: Request):
+        failure = await delay()
+        if failure is not None:
+            return failure
+        body = await request.body()
+        if "aws-chunked" in request.headers.get("content-encoding", "") or request.headers.get(
+            "x-amz-content-sha256", ""
+        ).startswith("STREAMING-"):
+            body = _decode_aws_chunked(body)
+        etag = hashlib.md5(body).hexdigest()
+        objects[f"{bucket}/{key}"] = {
+            "body": body,
+            "content_type": request.headers.get("content-type", "application/octet-stream"),
+            "etag": etag,
+            "last_modified": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        }
+        return Response(status_code=200, headers={"ETag": f'"{etag}"'})
+
+    @app.get("/{bucket}")
+    async def list_objects_v2(bucket: str, prefix: str = ""):
+        # ListObjectsV2, one page holding everything under the prefix
+        failure = await delay()
+        if failure is not None:
+            return failure
+        contents = "".join(
+            f"<Contents><Key>{xml_escape(name.split('/', 1)[1])}</Key>"
+            f"<LastModified>{obj['last_modified']}</LastModified><ETag>&quot;{obj['etag']}&quot;</ETag>"
+            f"<Size>{len(obj['body'])}</Size><StorageClass>STANDARD</StorageClass></Contents>"
+            for name, obj in sorted(objects.items())
+            if name.startswith(f"{bucket}/{prefix}")
+        )
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"<Name>{bucket}</Name><Prefix>{xml_escape(prefix)}</Prefix><IsTruncated>false</IsTruncated>{contents}"
+            "</ListBucketResult>"
+        )
+        return Response(content=body, media_type="application/xml")
+
+    @app.post("/{bucket}")
+    async def delete_objects(bucket: str, request: Request):
+        # DeleteObjects (POST ?delete); counts requests so benchmarks can check batching
+        failure = await delay()
+        if failure is not None:
+            return failure
+        keys = [el.text or "" for el in ElementTree.fromstring(await request.body()).iter() if el.tag.endswith("Key")]
+        for key in keys:
+            objects.pop(f"{bucket}/{key}", None)
+        delete_stats["requests"] += 1
+        delete_stats["keys"] += len(keys)
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<DeleteResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/"></DeleteResult>'
+        )
+        return Response(content=body, media_type="application/xml")
+
+    @app.get("/{bucket}/{key:path}")
+    async def get_object(bucket: str, key: str):
+        failure = await delay()
+        if failure is not None:
+            return failure
+        obj = objects.get(f"{bucket}/{key}")
+        if obj is None:
+            return Response(status_code=404, content=b"<Error><Code>NoSuchKey</Code></Error>")
+        return Response(
+            content=obj["body"], media_type=obj["content_type"], headers={"ETag": f'"{obj["etag"]}"'}
+        )
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Azure OpenAI
+# ---------------------------------------------------------------------------
+
+
+FAKE_PROFILE: Dict[str, Any] = {
+    "name": "Jordan Example",
+    "email": "jordan@example.com",
+    "phone": "+1 555 0100",
+    "links": ["https://linkedin.com/in/jordan-example", "https://github.com/jordan-example"],
+    "education": [{"school": "State University", "degree": "BSc Computer Science", "start": "2012", "end": "2016"}],
+    "experience": [
+        {
+            "company": "Acme Corp",
+            "title": "Software Engineer",
+            "start": "2016-06",
+            "end": None,
+            "location": "Remote",
+            "bullets": ["Built things", "Fixed things"],
+        }
+    ],
+    "skills": ["python", "sql", "aws"],
+    "address": "Springfield, IL, 62701",
+    "work_auth": "Yes",
+}
+
+
+FAKE_LETTER = "\n\n".join(
+    [
+        "Dear Hiring Team,",
+        "I am excited to apply for this role. Over the past seven years I have built and operated "
+        "backend services in Python and SQL, most recently leading a migration that cut p95 latency "
+        "by forty percent.",
+        "I enjoy owning systems end to end, from schema design to on-call, and I would bring the same "
+        "care to your team.",
+        "Thank you for your consideration.",
+        "Jordan Example",
+    ]
+)
+
+
+def create_fake_openai(latency: LatencyModel, *, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="fake-azure-openai")
+    rng = random.Random(seed)
+    # Running totals, read by benchmarks to attribute token usage to each parse
+    usage_totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    app.state.usage = usage_totals
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request):
+        body = await request.json()
+        prompt_chars = sum(len(str(m.get("content") or "")) for m in body.get("messages", []))
+        await asyncio.sleep(latency.sample_s(rng) + latency.per_ktok_ms * prompt_chars / 4 / 1_000_000)
+        if latency.fails(rng):
+            return JSONResponse({"error": {"code": "429", "message": "Rate limit"}}, status_code=429)
+        # JSON mode is resume parsing; plain completions are cover letters
+        content = json.dumps(FAKE_PROFILE) if body.get("response_format") else FAKE_LETTER
+        usage_totals["calls"] += 1
+        usage_totals["prompt_tokens"] += prompt_chars // 4
+        usage_totals["completion_tokens"] += len(content) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": deployment,
+            "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_chars // 4 + len(content) // 4,
+            },
+        }
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Sample resume PDFs
+# ---------------------------------------------------------------------------
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_text_pdf(pages: list[list[str]]) -> bytes:
+    # Minimal single-font PDF; each page is a list of text lines
+    objects: list[bytes] = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, lines in enumerate(pages):
+        content_id = page_ids[i] + 1
+        objects.append(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+            ).encode()
+        )
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 750 Td"]
+        for line in lines:
+            ops.append(f"({_pdf_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def make_resume_pdf(seed: int = 0, *, pages: int = 2) -> bytes:
+    rng = random.Random(seed)
+    header = ["Jordan Example", "jordan@example.com | +1 555 0100 | linkedin.com/in/jordan-example"]
+    body: list[list[str]] = []
+    for p in range(pages):
+        lines = list(header) if p == 0 else []
+        lines.append("EXPERIENCE" if p == 0 else "EXPERIENCE (continued)")
+        for j in range(8):
+            lines.append(f"Software Engineer, Company {rng.randint(1, 999)}  {2010 + j} - {2011 + j}")
+            lines.extend(f"- Delivered project {rng.randint(1, 10_000)} improving latency by {rng.randint(5, 60)}%" for _ in range(4))
+        if p == pages - 1:
+            lines += ["EDUCATION", "State University - BSc Computer Science 2012 - 2016", "SKILLS", "Python, SQL, AWS"]
+        body.append(lines)
+    return make_text_pdf(body)
+
+
+def make_messy_resume_pdf(seed: int = 0, *, pages: int = 2) -> bytes:
+    # Layout the local pre-extractor cannot fully account for: address line, prose, entries
+    # without a recognizable title, an unknown heading
+    rng = random.Random(seed)
+    body: list[list[str]] = []
+    for p in range(pages):
+        lines: list[str] = []
+        if p == 0:
+            lines += [
+                "Jordan Example",
+                "Springfield, IL 62701 | jordan@example.com | +1 555 0100",
+                "SUMMARY",
+                "Engineer who enjoys turning slow systems into fast ones and mentoring teams along the way.",
+            ]
+        lines.append("WORK HISTORY")
+        for j in range(6):
+            lines.append(f"Company {rng.randint(1, 999)}, Platform Team  {2010 + j} - {2011 + j}")
+            lines.append(f"Owned the ingestion pipeline serving {rng.randint(2, 90)} million events per day")
+            lines.extend(f"- Cut p99 latency by {rng.randint(5, 60)}% on service {rng.randint(1, 99)}" for _ in range(3))
+        if p == pages - 1:
+            lines += [
+                "VOLUNTEERING",
+                "Taught weekend coding classes at the public library",
+                "EDUCATION",
+                "State University - BSc Computer Science 2012 - 2016",
+                "SKILLS",
+                "Distributed systems design with a focus on observability and incident response",
+            ]
+        body.append(lines)
+    return make_text_pdf(body)
+
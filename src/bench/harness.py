@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import math
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ThreadedServer:
+    # Runs an ASGI app under uvicorn in its own thread (and event loop), so fakes keep
+    # serving while the app under test makes blocking SDK calls.
+
+    def __init__(self, app: Any, *, port: Optional[int] = None) -> None:
+        import uvicorn
+
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="on")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self, timeout_s: float = 15.0) -> "ThreadedServer":
+        self._thread.start()
+        deadline = time.monotonic() + timeout_s
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Server on port {self.port} failed to start")
+            time.sleep(0.02)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    # Linear interpolation between closest ranks
+    if not sorted_values:
+        return float("nan")
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo, hi = math.floor(k), math.ceil(k)
+    if lo == hi:
+        return sorted_values[lo]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+@dataclass
+class WorkloadResult:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed_s: float = 0.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        values = sorted(self.latencies_ms)
+        ops = len(values)
+        return {
+            "ops": ops,
+            "errors": self.errors,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "throughput_ops_s": round(ops / self.elapsed_s, 3) if self.elapsed_s > 0 else 0.0,
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3) if values else float("nan"),
+            **self.extra,
+        }
+
+
+def format_report(results: List[WorkloadResult]) -> str:
+    header = f"{'workload':<12} {'ops':>6} {'err':>5} {'ops/s':>9} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        s = r.summary()
+        lines.append(
+            f"{r.name:<12} {s['ops']:>6} {s['errors']:>5} {s['throughput_ops_s']:>9.2f} "
+            f"{s['p50_ms']:>10.1f} {s['p95_ms']:>10.1f} {s['p99_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+@dataclass
+class Regression:
+    workload: str
+    metric: str
+    baseline: float
+    current: float
+
+    def describe(self) -> str:
+        return f"{self.workload}.{self.metric}: baseline={self.baseline:.2f} current={self.current:.2f}"
+
+
+def save_baseline(path: Path, results: List[WorkloadResult], config: Dict[str, Any]) -> None:
+    doc = {"config": config, "workloads": {r.name: r.summary() for r in results}}
+    path.write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n")
+
+
+def compare_to_baseline(path: Path, results: List[WorkloadResult], tolerance: float) -> List[Regression]:
+    # Latency percentiles may grow and throughput may shrink by at most `tolerance` (fraction)
+    baseline = json.loads(path.read_text()).get("workloads", {})
+    regressions: List[Regression] = []
+    for r in results:
+        base = baseline.get(r.name)
+        if not base:
+            continue
+        current = r.summary()
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(Regression(r.name, metric, base[metric], current[metric]))
+        if current["throughput_ops_s"] < base["throughput_ops_s"] * (1 - tolerance):
+            regressions.append(
+                Regression(r.name, "throughput_ops_s", base["throughput_ops_s"], current["throughput_ops_s"])
+            )
+    return regressions
+
+
+def config_dict(obj: Any) -> Dict[str, Any]:
+    return {k: (str(v) if not isinstance(v, (int, float, str, bool, type(None))) else v) for k, v in asdict(obj).items()}
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Cold import cost of the app, from `python -X importtime` in fresh interpreters.
+# Run from src/:  python -m bench.import_bench [--budget-ms 900]
+# Exits 1 if a heavy dependency is imported eagerly or the median exceeds --budget-ms.
+
+DEFAULT_FORBID = "openai,pypdf,boto3,botocore,httpx,langgraph,langchain_core,kernel,numpy,tiktoken"
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.import_bench",
+        description="Measure the import time of the app and check heavy dependencies stay lazy",
+    )
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to sample")
+    parser.add_argument("--top", type=int, default=10, help="Top-level packages to list")
+    parser.add_argument(
+        "--forbid", default=DEFAULT_FORBID, help="Comma-separated packages that must not be imported ('' to disable)"
+    )
+    parser.add_argument("--budget-ms", type=float, help="Fail if the median import time exceeds this")
+    parser.add_argument("--output", type=Path, help="Write samples and per-package times as JSON")
+    return parser.parse_args(argv)
+
+
+def sample(module: str) -> List[Tuple[str, int, int]]:
+    # (module, self us, cumulative us) rows for one cold import
+    env = dict(os.environ)
+    # Settings need a URL to validate; importing must not connect to it
+    env.setdefault("DATABASE_URL", "postgresql://bench@127.0.0.1/unused")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows: List[Tuple[str, int, int]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   <self> | <cumulative> | <indent><module>"
+        head, cumulative_us, name = line.split("|")
+        rows.append((name.strip(), int(head.split(":", 1)[1]), int(cumulative_us)))
+    return rows
+
+
+def summarize(samples: List[List[Tuple[str, int, int]]], module: str) -> Dict[str, Any]:
+    totals_ms = [next(cum for name, _, cum in rows if name == module) / 1000 for rows in samples]
+    per_package: Dict[str, List[float]] = defaultdict(list)
+    for rows in samples:
+        self_by_package: Dict[str, int] = defaultdict(int)
+        for name, self_us, _ in rows:
+            self_by_package[name.split(".")[0]] += self_us
+        for package, us in self_by_package.items():
+            per_package[package].append(us / 1000)
+    packages = {package: statistics.median(ms) for package, ms in per_package.items()}
+    return {
+        "module": module,
+        "median_ms": statistics.median(totals_ms),
+        "samples_ms": [round(ms, 3) for ms in totals_ms],
+        "packages_ms": dict(sorted(packages.items(), key=lambda kv: kv[1], reverse=True)),
+        "imported": sorted({name.split(".")[0] for rows in samples for name, _, _ in rows}),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    # The first run also warms the filesystem cache; it is not counted
+    sample(args.module)
+    summary = summarize([sample(args.module) for _ in range(args.repeat)], args.module)
+
+    print(
+        f"import {args.module}: median {summary['median_ms']:.1f} ms over {args.repeat} runs "
+        f"(min {min(summary['samples_ms']):.1f}, max {max(summary['samples_ms']):.1f})"
+    )
+    print(f"{'package':<24} {'self ms':>9}")
+    for package, ms in list(summary["packages_ms"].items())[: args.top]:
+        print(f"{package:<24} {ms:>9.1f}")
+
+    failures: List[str] = []
+    forbidden = [p.strip() for p in args.forbid.split(",") if p.strip()]
+    eager = [p for p in forbidden if p in summary["imported"]]
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if args.budget_ms is not None and summary["median_ms"] > args.budget_ms:
+        failures.append(f"median {summary['median_ms']:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2) + "\n")
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
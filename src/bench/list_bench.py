@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .harness import ThreadedServer, percentile
+
+# Response time and payload size of the dashboard list endpoints over a large history.
+# Run from src/:  python -m bench.list_bench --database-url postgresql://... [--jobs 10000]
+# Seeds one user directly in Postgres (the database is reset), then times each variant.
+
+VARIANTS: List[Tuple[str, str]] = [
+    ("jobs default", "/jobs"),
+    ("jobs limit=1000", "/jobs?limit=1000"),
+    ("jobs sparse limit=1000", "/jobs?fields=status,target_url,created_at&limit=1000"),
+    ("resumes default", "/resumes"),
+    ("resumes sparse", "/resumes?fields=file_name,created_at"),
+]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.list_bench",
+        description="Measure /jobs and /resumes list latency and payload size for a large history",
+    )
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL"))
+    parser.add_argument("--jobs", type=int, default=10_000, help="Job applications in the seeded history")
+    parser.add_argument("--resumes", type=int, default=100, help="Resumes, each with a parsed profile")
+    parser.add_argument("--profile-entries", type=int, default=12, help="Experience entries per parsed profile")
+    parser.add_argument("--requests", type=int, default=50, help="Sequential requests per variant")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def _profile(rng: random.Random, entries: int) -> Dict[str, Any]:
+    words = ["built", "scaled", "led", "shipped", "migrated", "designed", "reduced", "latency", "pipeline", "service"]
+    return {
+        "name": f"Bench User {rng.randint(1, 9999)}",
+        "email": "bench@example.com",
+        "skills": [f"skill-{i}" for i in range(30)],
+        "experience": [
+            {
+                "company": f"Company {i}",
+                "title": "Software Engineer",
+                "start": "2019-01",
+                "end": None,
+                "bullets": [" ".join(rng.choice(words) for _ in range(25)) for _ in range(5)],
+            }
+            for i in range(entries)
+        ],
+    }
+
+
+async def seed(args: argparse.Namespace, user_id: uuid.UUID) -> None:
+    from sqlalchemy import text
+
+    from app.db import get_engine
+
+    rng = random.Random(args.seed)
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO users (id, email) VALUES (:id, :email)"),
+            {"id": user_id, "email": f"list-bench-{user_id.hex[:8]}@example.com"},
+        )
+        resume_ids = [uuid.uuid4() for _ in range(args.resumes)]
+        await conn.execute(
+            text(
+                "INSERT INTO resumes (id, user_id, r2_key, file_name, content_type, parsed_profile) "
+                "VALUES (:id, :user_id, :r2_key, :file_name, 'application/pdf', CAST(:profile AS jsonb))"
+            ),
+            [
+                {
+                    "id": rid,
+                    "user_id": user_id,
+                    "r2_key": f"resumes/{user_id}/{rid}.pdf",
+                    "file_name": f"resume-{i}.pdf",
+                    "profile": json.dumps(_profile(rng, args.profile_entries)),
+                }
+                for i, rid in enumerate(resume_ids)
+            ],
+        )
+        # One job a minute going back in time; older rows land in the DEFAULT partition
+        await conn.execute(
+            text(
+                "INSERT INTO job_applications (id, user_id, target_url, resume_id, status, result_summary, created_at) "
+                "SELECT gen_random_uuid(), :user_id, 'https://boards.greenhouse.io/benchco/jobs/' || g, :resume_id, "
+                "(ARRAY['succeeded', 'failed', 'cancelled', 'queued'])[1 + g % 4]::job_status, "
+                "'Navigation and basic autofill completed', now() - g * interval '1 minute' "
+                "FROM generate_series(1, :n) AS g"
+            ),
+            {"user_id": user_id, "resume_id": resume_ids[0], "n": args.jobs},
+        )
+    await engine.dispose()
+
+
+async def measure(base_url: str, user_id: uuid.UUID, requests: int) -> List[Dict[str, Any]]:
+    import httpx
+
+    rows: List[Dict[str, Any]] = []
+    async with httpx.AsyncClient(base_url=base_url, headers={"X-User-Id": str(user_id)}, timeout=60) as client:
+        for name, path in VARIANTS:
+            (await client.get(path)).raise_for_status()  # warm-up
+            latencies: List[float] = []
+            size = count = 0
+            for _ in range(requests):
+                started = time.perf_counter()
+                resp = await client.get(path)
+                resp.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+                size, count = len(resp.content), len(resp.json())
+            latencies.sort()
+            rows.append(
+                {
+                    "variant": name,
+                    "path": path,
+                    "rows": count,
+                    "bytes": size,
+                    "p50_ms": round(percentile(latencies, 50), 3),
+                    "p95_ms": round(percentile(latencies, 95), 3),
+                }
+            )
+    return rows
+
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    header = f"{'variant':<24} {'rows':>6} {'KiB':>9} {'p50 ms':>9} {'p95 ms':>9}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(f"{r['variant']:<24} {r['rows']:>6} {r['bytes'] / 1024:>9.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if not args.database_url:
+        print("A local Postgres is required: pass --database-url or set BENCH_DATABASE_URL", file=sys.stderr)
+        return 2
+    os.environ.update({"DATABASE_URL": args.database_url, "DATABASE_SSL": "false"})
+
+    from .__main__ import prepare_database
+
+    user_id = uuid.uuid4()
+    asyncio.run(prepare_database(reset=True))
+    asyncio.run(seed(args, user_id))
+
+    from app.main import app
+
+    api = ThreadedServer(app).start()
+    try:
+        rows = asyncio.run(measure(api.url, user_id, args.requests))
+    finally:
+        api.stop()
+
+    print(f"history: {args.jobs} jobs, {args.resumes} resumes")
+    print(format_rows(rows))
+    if args.output:
+        args.output.write_text(json.dumps({"jobs": args.jobs, "resumes": args.resumes, "results": rows}, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
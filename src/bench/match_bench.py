@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Resume auto-selection cost and accuracy over synthetic postings and resumes.
+# Run from src/:  python -m bench.match_bench [--postings 5000 --resumes 40]
+# In-process; no database or network. Each resume and posting is drawn from one specialty, so
+# a pick is correct when the chosen resume shares the posting's specialty.
+
+SPECIALTIES: Dict[str, List[str]] = {
+    "backend": ["python", "go", "postgresql", "kafka", "grpc", "microservices", "redis", "api design", "django"],
+    "frontend": ["react", "typescript", "css", "next.js", "accessibility", "webpack", "design systems", "vue"],
+    "data": ["spark", "airflow", "dbt", "snowflake", "etl", "data modeling", "bigquery", "sql", "pipelines"],
+    "ml": ["pytorch", "tensorflow", "llm", "embeddings", "model training", "mlops", "cuda", "inference"],
+    "infra": ["kubernetes", "terraform", "aws", "observability", "sre", "ci/cd", "linux", "networking"],
+    "mobile": ["swift", "kotlin", "ios", "android", "react native", "jetpack compose", "app store"],
+    "security": ["threat modeling", "appsec", "penetration testing", "siem", "iam", "cryptography", "soc2"],
+    "embedded": ["c++", "rtos", "firmware", "embedded linux", "can bus", "microcontrollers", "fpga"],
+}
+TITLES = {
+    "backend": "Backend Engineer",
+    "frontend": "Frontend Engineer",
+    "data": "Data Engineer",
+    "ml": "Machine Learning Engineer",
+    "infra": "Site Reliability Engineer",
+    "mobile": "Mobile Engineer",
+    "security": "Security Engineer",
+    "embedded": "Embedded Software Engineer",
+}
+FILLER = (
+    "collaborate cross functional stakeholders deliver impact fast paced environment ownership mentor "
+    "communication customers product roadmap scale reliable quality growth remote hybrid office"
+).split()
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.match_bench",
+        description="Measure resume auto-selection latency and accuracy over synthetic postings",
+    )
+    parser.add_argument("--postings", type=int, default=5000)
+    parser.add_argument("--resumes", type=int, default=40)
+    parser.add_argument("--posting-words", type=int, default=400, help="Words of posting text")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def _profile(rng: random.Random, specialty: str) -> Dict[str, Any]:
+    skills = SPECIALTIES[specialty]
+    return {
+        "name": "Bench User",
+        "skills": rng.sample(skills, k=min(6, len(skills))) + ["git", "agile"],
+        "experience": [
+            {
+                "company": f"Company {i}",
+                "title": TITLES[specialty],
+                "bullets": [
+                    " ".join(rng.choice(skills + FILLER) for _ in range(18)) for _ in range(4)
+                ],
+            }
+            for i in range(3)
+        ],
+        "education": [{"school": "State University", "degree": "BS Computer Science"}],
+    }
+
+
+def _posting(rng: random.Random, specialty: str, words: int, n: int) -> Tuple[str, str]:
+    # Generic slugs, so the text has to carry the signal
+    url = f"https://boards.greenhouse.io/benchco/jobs/{4000 + n}"
+    pool = SPECIALTIES[specialty] * 2 + FILLER * 3 + [w for s in SPECIALTIES.values() for w in s]
+    text = f"{TITLES[specialty]}. " + " ".join(rng.choice(pool) for _ in range(words))
+    return url, text
+
+
+def naive_best(
+    resume_ids: List[uuid.UUID], resumes: List[Tuple[Any, Any]], postings: List[Tuple[Any, Any]]
+) -> List[uuid.UUID]:
+    # Reference: one Python dot product per (posting, resume) pair over dict vectors
+    resume_dicts = [dict(zip(ids.tolist(), values.tolist())) for ids, values in resumes]
+    picks: List[uuid.UUID] = []
+    for ids, values in postings:
+        posting = list(zip(ids.tolist(), values.tolist()))
+        scores = [sum(v * r.get(i, 0.0) for i, v in posting) for r in resume_dicts]
+        picks.append(resume_ids[max(range(len(scores)), key=lambda k: (scores[k], -k))])
+    return picks
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.services.resume_matching import ResumeMatrix, posting_vector, resume_vector
+
+    rng = random.Random(args.seed)
+    names = list(SPECIALTIES)
+    resume_specialties = [names[i % len(names)] for i in range(args.resumes)]
+    profiles = [_profile(rng, s) for s in resume_specialties]
+    posting_specialties = [rng.choice(names) for _ in range(args.postings)]
+    postings = [_posting(rng, s, args.posting_words, n) for n, s in enumerate(posting_specialties)]
+    resume_ids = [uuid.uuid4() for _ in profiles]
+    specialty_of = dict(zip(resume_ids, resume_specialties))
+
+    started = time.perf_counter()
+    resume_vectors = [resume_vector(p) for p in profiles]
+    matrix = ResumeMatrix.build(resume_ids, resume_vectors)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    posting_vectors = [posting_vector(url, text) for url, text in postings]
+    vectorize_ms = (time.perf_counter() - started) * 1000
+
+    matrix.best(posting_vectors[:10])  # warm-up
+    started = time.perf_counter()
+    picks = matrix.best(posting_vectors)
+    score_ms = (time.perf_counter() - started) * 1000
+
+    sample = min(len(postings), 500)
+    started = time.perf_counter()
+    naive = naive_best(resume_ids, resume_vectors, posting_vectors[:sample])
+    naive_ms = (time.perf_counter() - started) * 1000 * len(postings) / max(sample, 1)
+
+    correct = sum(specialty_of[pick] == s for pick, s in zip(picks, posting_specialties))
+    return {
+        "postings": args.postings,
+        "resumes": args.resumes,
+        "matrix_terms": int(len(matrix.terms)),
+        "build_ms": round(build_ms, 3),
+        "vectorize_ms": round(vectorize_ms, 3),
+        "score_ms": round(score_ms, 3),
+        "naive_score_ms_est": round(naive_ms, 3),
+        "agrees_with_naive": picks[:sample] == naive,
+        "accuracy": round(correct / max(len(postings), 1), 4),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    result = run(args)
+    print(f"{result['postings']} postings x {result['resumes']} resumes ({result['matrix_terms']} resume terms)")
+    print(f"  resume matrix build   {result['build_ms']:>10.1f} ms")
+    print(f"  posting vectors       {result['vectorize_ms']:>10.1f} ms  (cached per posting after the first fetch)")
+    print(f"  scoring (vectorized)  {result['score_ms']:>10.1f} ms")
+    print(f"  scoring (per pair)    {result['naive_score_ms_est']:>10.1f} ms  (estimated from 500 postings)")
+    print(f"  agrees with per-pair  {result['agrees_with_naive']}")
+    print(f"  specialty accuracy    {result['accuracy']:>10.2%}")
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .fakes import LatencyModel, create_fake_openai, make_messy_resume_pdf, make_resume_pdf
+from .harness import ThreadedServer, percentile
+
+# Per-resume parse latency and token usage, with and without the local pre-extractor.
+# Run from src/:  python -m bench.parse_bench [--corpus DIR]
+# Calls the parser in-process against the OpenAI fake; no database or R2 needed.
+
+MODES = {"llm": False, "local": True}
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.parse_bench",
+        description="Measure resume parse latency and prompt tokens with and without local extraction",
+    )
+    parser.add_argument("--corpus", type=Path, help="Directory of PDFs (default: generated sample corpus)")
+    parser.add_argument("--per-variant", type=int, default=5, help="Generated resumes per layout variant")
+    parser.add_argument("--openai-latency", default="median=800,sigma=0.2,fail=0,per_ktok=400")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write per-resume results as JSON")
+    return parser.parse_args(argv)
+
+
+def sample_corpus(per_variant: int) -> List[Tuple[str, str, bytes]]:
+    # (variant, name, pdf) for clean short/long layouts and a messy one
+    corpus: List[Tuple[str, str, bytes]] = []
+    for i in range(per_variant):
+        corpus.append(("simple-1p", f"simple-{i}.pdf", make_resume_pdf(i, pages=1)))
+        corpus.append(("standard-2p", f"standard-{i}.pdf", make_resume_pdf(100 + i, pages=2)))
+        corpus.append(("long-8p", f"long-{i}.pdf", make_resume_pdf(200 + i, pages=8)))
+        corpus.append(("messy-2p", f"messy-{i}.pdf", make_messy_resume_pdf(300 + i, pages=2)))
+    return corpus
+
+
+def load_corpus(path: Path) -> List[Tuple[str, str, bytes]]:
+    return [("corpus", p.name, p.read_bytes()) for p in sorted(path.glob("*.pdf"))]
+
+
+async def measure(corpus: List[Tuple[str, str, bytes]], usage: Dict[str, int]) -> List[Dict[str, Any]]:
+    from app.services.resume_parser import close_client, parse_resume_pdf
+
+    rows: List[Dict[str, Any]] = []
+    for variant, name, pdf in corpus:
+        for mode, local_extract in MODES.items():
+            before = dict(usage)
+            started = time.perf_counter()
+            error = None
+            try:
+                await parse_resume_pdf(pdf, local_extract=local_extract)
+            except Exception as e:  # noqa: BLE001
+                error = f"{type(e).__name__}: {e}"
+            rows.append(
+                {
+                    "variant": variant,
+                    "resume": name,
+                    "mode": mode,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "llm_calls": usage["calls"] - before["calls"],
+                    "prompt_tokens": usage["prompt_tokens"] - before["prompt_tokens"],
+                    "completion_tokens": usage["completion_tokens"] - before["completion_tokens"],
+                    "error": error,
+                }
+            )
+    await close_client()
+    return rows
+
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    header = (
+        f"{'variant':<12} {'mode':<6} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'prompt tok':>11} {'compl tok':>10} {'calls':>6} {'bypass':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault((row["variant"], row["mode"]), []).append(row)
+    for (variant, mode), group in groups.items():
+        latencies = sorted(r["latency_ms"] for r in group)
+        n = len(group)
+        lines.append(
+            f"{variant:<12} {mode:<6} {n:>4} {percentile(latencies, 50):>9.1f} {percentile(latencies, 95):>9.1f} "
+            f"{sum(r['prompt_tokens'] for r in group) / n:>11.0f} {sum(r['completion_tokens'] for r in group) / n:>10.0f} "
+            f"{sum(r['llm_calls'] for r in group) / n:>6.1f} {sum(r['llm_calls'] == 0 for r in group) / n:>7.0%}"
+        )
+    errors = [r for r in rows if r["error"]]
+    if errors:
+        lines.append(f"\n{len(errors)} parse errors, first: {errors[0]['error']}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    corpus = load_corpus(args.corpus) if args.corpus else sample_corpus(args.per_variant)
+    if not corpus:
+        print(f"No PDFs found in {args.corpus}", file=sys.stderr)
+        return 2
+
+    fake = create_fake_openai(LatencyModel.parse(args.openai_latency), seed=args.seed)
+    openai = ThreadedServer(fake).start()
+    # Must run before `app` is imported; the parser only needs the Azure settings
+    os.environ.setdefault("DATABASE_URL", "postgresql://bench@127.0.0.1/unused")
+    os.environ.update(
+        {
+            "AZURE_OPENAI_ENDPOINT": openai.url,
+            "AZURE_OPENAI_API_KEY": "bench",
+            "AZURE_OPENAI_DEPLOYMENT": "bench-deployment",
+            "AZURE_OPENAI_API_VERSION": "2024-10-21",
+        }
+    )
+    try:
+        rows = asyncio.run(measure(corpus, fake.state.usage))
+    finally:
+        openai.stop()
+
+    print(format_rows(rows))
+    if args.output:
+        args.output.write_text(json.dumps({"openai_latency": args.openai_latency, "results": rows}, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from .fakes import make_resume_pdf
+from .harness import WorkloadResult
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+
+@dataclass
+class WorkloadConfig:
+    jobs: int = 200
+    runs: int = 20
+    parses: int = 20
+    resume_pages: int = 2
+    dashboard_seconds: float = 10.0
+    concurrency: int = 20
+    pollers: int = 10
+    poll_interval_s: float = 0.5
+    letter_batches: int = 4
+    letter_batch_size: int = 25
+    run_timeout_s: float = 300.0
+
+
+async def _timed(result: WorkloadResult, fn: Callable[[], Awaitable[None]]) -> None:
+    started = time.perf_counter()
+    try:
+        await fn()
+    except Exception:
+        result.errors += 1
+        return
+    result.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+
+async def _bounded(n: int, concurrency: int, make: Callable[[int], Awaitable[None]]) -> None:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            await make(i)
+
+    await asyncio.gather(*(one(i) for i in range(n)))
+
+
+async def upload_resume(client: httpx.AsyncClient, seed: int, pages: int = 2) -> str:
+    pdf = make_resume_pdf(seed, pages=pages)
+    resp = await client.post("/resumes", files={"file": (f"resume-{seed}.pdf", pdf, "application/pdf")})
+    resp.raise_for_status()
+    return resp.json()["id"]
+
+
+async def create_job(client: httpx.AsyncClient, resume_id: str, i: int) -> str:
+    url = f"https://boards.greenhouse.io/benchco/jobs/{i}"
+    resp = await client.post("/jobs", json={"url": url, "resume_id": resume_id})
+    resp.raise_for_status()
+    return resp.json()["id"]
+
+
+async def bulk_submit(client: httpx.AsyncClient, cfg: WorkloadConfig, resume_id: str) -> WorkloadResult:
+    result = WorkloadResult("submit")
+    started = time.perf_counter()
+
+    async def make(i: int) -> None:
+        async def op() -> None:
+            await create_job(client, resume_id, i)
+
+        await _timed(result, op)
+
+    await _bounded(cfg.jobs, cfg.concurrency, make)
+    result.elapsed_s = time.perf_counter() - started
+    return result
+
+
+async def concurrent_runs(client: httpx.AsyncClient, cfg: WorkloadConfig, resume_id: str) -> WorkloadResult:
+    # End-to-end latency from POST /run until the job reaches a terminal status
+    result = WorkloadResult("runs")
+    job_ids = [await create_job(client, resume_id, 100_000 + i) for i in range(cfg.runs)]
+    outcomes = {"succeeded": 0, "failed": 0}
+    started = time.perf_counter()
+
+    async def run_one(job_id: str) -> None:
+        resp = await client.post(f"/jobs/{job_id}/run")
+        resp.raise_for_status()
+        deadline = time.perf_counter() + cfg.run_timeout_s
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(cfg.poll_interval_s)
+            job = (await client.get(f"/jobs/{job_id}")).json()
+            if job["status"] in TERMINAL_STATUSES:
+                outcomes[job["status"]] += 1
+                if job["status"] == "failed":
+                    raise RuntimeError(job.get("error") or "failed")
+                return
+        raise TimeoutError(job_id)
+
+    await asyncio.gather(*(_timed(result, lambda j=j: run_one(j)) for j in job_ids))
+    result.elapsed_s = time.perf_counter() - started
+    result.extra.update(outcomes)
+    return result
+
+
+async def parse_burst(client: httpx.AsyncClient, cfg: WorkloadConfig) -> WorkloadResult:
+    result = WorkloadResult("parse")
+    resume_ids = [await upload_resume(client, 1_000 + i, cfg.resume_pages) for i in range(cfg.parses)]
+    started = time.perf_counter()
+
+    async def make(i: int) -> None:
+        async def op() -> None:
+            resp = await client.post(f"/resumes/{resume_ids[i]}/parse")
+            resp.raise_for_status()
+
+        await _timed(result, op)
+
+    await _bounded(len(resume_ids), cfg.concurrency, make)
+    result.elapsed_s = time.perf_counter() - started
+    return result
+
+
+async def bulk_cover_letters(client: httpx.AsyncClient, cfg: WorkloadConfig) -> WorkloadResult:
+    # POST /jobs/bulk with cover letters; each batch is sent twice and the second must hit the cache
+    result = WorkloadResult("letters")
+    resume_id = await upload_resume(client, 2_000)
+    (await client.post(f"/resumes/{resume_id}/parse")).raise_for_status()
+    cold_ms: List[float] = []
+    warm_ms: List[float] = []
+    started = time.perf_counter()
+    for b in range(cfg.letter_batches):
+        base = 200_000 + b * cfg.letter_batch_size
+        urls = [f"https://boards.greenhouse.io/benchco/jobs/{base + i}?gh_src=bench" for i in range(cfg.letter_batch_size)]
+        for timings in (cold_ms, warm_ms):
+
+            async def op() -> None:
+                t0 = time.perf_counter()
+                resp = await client.post(
+                    "/jobs/bulk", json={"urls": urls, "resume_id": resume_id, "generate_cover_letters": True}
+                )
+                resp.raise_for_status()
+                if any(job["cover_letter_r2_key"] is None for job in resp.json()):
+                    raise RuntimeError("job created without a cover letter")
+                timings.append((time.perf_counter() - t0) * 1000)
+
+            await _timed(result, op)
+    result.elapsed_s = time.perf_counter() - started
+    result.extra.update(
+        {
+            "batch_size": cfg.letter_batch_size,
+            "cold_avg_ms": round(sum(cold_ms) / len(cold_ms), 1) if cold_ms else None,
+            "cached_avg_ms": round(sum(warm_ms) / len(warm_ms), 1) if warm_ms else None,
+        }
+    )
+    return result
+
+
+async def dashboard_polling(client: httpx.AsyncClient, cfg: WorkloadConfig) -> WorkloadResult:
+    # Each poller mimics the dashboard: jobs list, resumes list, preferences and recent job
+    # details on a loop, revalidating with the last ETag like a browser fetch with "no-cache"
+    result = WorkloadResult("dashboard")
+    paths: List[str] = ["/jobs", "/resumes", "/preferences"]
+    recent = (await client.get("/jobs", params={"fields": "id", "limit": 5})).json()
+    paths += [f"/jobs/{job['id']}" for job in recent]
+    not_modified = 0
+    stop_at = time.perf_counter() + cfg.dashboard_seconds
+    started = time.perf_counter()
+
+    async def poller(offset: int) -> None:
+        etags: Dict[str, str] = {}
+        i = offset
+        while time.perf_counter() < stop_at:
+            path = paths[i % len(paths)]
+
+            async def op() -> None:
+                nonlocal not_modified
+                headers = {"If-None-Match": etags[path]} if path in etags else {}
+                resp = await client.get(path, headers=headers)
+                if resp.status_code == 304:
+                    not_modified += 1
+                    return
+                resp.raise_for_status()
+                if "etag" in resp.headers:
+                    etags[path] = resp.headers["etag"]
+
+            await _timed(result, op)
+            i += 1
+
+    await asyncio.gather(*(poller(i) for i in range(cfg.pollers)))
+    result.elapsed_s = time.perf_counter() - started
+    result.extra["not_modified"] = not_modified
+    return result
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+# Settings require a database URL; nothing under test connects to it
+os.environ.setdefault("DATABASE_URL", "postgresql://tests@127.0.0.1/unused")
+
+
+@pytest.fixture
+def settings_env(monkeypatch):
+    # Override settings through the environment: set(NAME=value) and read get_settings() again
+    from app.config import get_settings
+
+    def set_env(**values: str) -> None:
+        for name, value in values.items():
+            monkeypatch.setenv(name, value)
+        get_settings.cache_clear()
+
+    get_settings.cache_clear()
+    yield set_env
+    monkeypatch.undo()
+    get_settings.cache_clear()
@@ -0,0 +1,54 @@
+from app.services.answer_index import INDEX_VERSION, build_answer_index, normalize_phrase, profile_hash
+
+PROFILE = {
+    "name": "Jane Q Doe",
+    "email": "jane@example.com",
+    "phone": "+1 555 123 4567",
+    "links": ["https://www.linkedin.com/in/jane", "https://github.com/jane", "https://jane.dev"],
+    "address": "Austin, TX 78701",
+    "experience": [{"company": "Acme", "title": "Engineer", "start": "Jun 2019", "end": None}],
+    "education": [{"school": "State University", "degree": "BS", "start": "2014", "end": "2018"}],
+}
+
+
+def test_profile_answers():
+    answers = build_answer_index(PROFILE, {})["answers"]
+    assert answers["first_name"] == "Jane"
+    assert answers["last_name"] == "Q Doe"
+    assert answers["linkedin"] == "https://www.linkedin.com/in/jane"
+    assert answers["github"] == "https://github.com/jane"
+    assert answers["website"] == "https://jane.dev"
+    assert (answers["city"], answers["state"], answers["postal_code"]) == ("Austin", "TX", "78701")
+    assert answers["location"] == "Austin, TX"
+    assert answers["company"] == "Acme"
+    # Latest role is open-ended: a start date and no end date
+    assert answers["start_date"] == "2019-06"
+    assert "end_date" not in answers
+
+
+def test_preferences_alias_and_format_answers():
+    index = build_answer_index(
+        PROFILE,
+        {"work_auth": "US Citizen", "veteran": False, "desired_salary_min": 150000, "favorite_color": "Blue", "notes": None},
+    )
+    answers = index["answers"]
+    assert answers["work_authorization"] == "US Citizen"
+    assert answers["veteran_status"] == "No"
+    assert answers["desired_salary"] == "150000"
+    assert answers["favorite_color"] == "Blue"
+    assert "notes" not in answers
+    assert index["synonyms"]["favorite color"] == "favorite_color"
+    assert {"work_authorization", "veteran_status"} <= set(index["choices"])
+
+
+def test_only_answerable_synonyms_are_shipped():
+    index = build_answer_index({"name": "Jane Doe"}, {})
+    assert index["version"] == INDEX_VERSION
+    assert set(index["synonyms"].values()) <= set(index["answers"])
+    assert index["choices"] == []
+
+
+def test_normalize_phrase_and_profile_hash():
+    assert normalize_phrase("  LinkedIn Profile URL: ") == "linkedin profile url"
+    assert profile_hash({"a": 1, "b": [2]}) == profile_hash({"b": [2], "a": 1})
+    assert profile_hash({"a": 1}) != profile_hash({"a": 2})
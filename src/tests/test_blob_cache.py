@@ -0,0 +1,25 @@
+import asyncio
+from io import BytesIO
+
+from app.services.blob_cache import BlobCache
+
+
+def test_staged_upload_is_cached_only_once_linked(settings_env, tmp_path):
+    settings_env(BLOB_CACHE_DIR=str(tmp_path))
+    cache = BlobCache()
+
+    async def run():
+        upload = BytesIO(b"%PDF-1.4 resume")
+        digest = await cache.stage(upload)
+        assert upload.tell() == 0
+        # The upload hasn't succeeded yet: a read must go to R2, not to the staged copy
+        before = await asyncio.to_thread(cache._lookup, "resumes/a.pdf")
+        await cache.link("resumes/a.pdf", digest)
+        async with cache.open("resumes/a.pdf") as view:
+            return before, view.read()
+
+    before, data = asyncio.run(run())
+    assert before is None
+    assert data == b"%PDF-1.4 resume"
+    # Another process sees the key through refs/
+    assert asyncio.run(asyncio.to_thread(BlobCache()._lookup, "resumes/a.pdf")) is not None
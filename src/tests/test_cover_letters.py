@@ -0,0 +1,52 @@
+import re
+
+import uuid
+
+from app.services.cover_letters import company_name, letter_r2_key, posting_hash, posting_key, render_letter_pdf
+
+
+def test_posting_key_ignores_how_the_posting_was_linked():
+    key = posting_key("https://boards.greenhouse.io/acme/jobs/123")
+    assert key == "boards.greenhouse.io/acme/jobs/123"
+    assert posting_key("http://www.Boards.Greenhouse.io/acme/jobs/123/?gh_src=abc&utm_source=x#apply") == key
+
+
+def test_posting_key_keeps_identifying_query_in_stable_order():
+    a = posting_key("https://acme.com/careers?job=7&team=eng&ref=feed")
+    b = posting_key("https://acme.com/careers?team=eng&job=7")
+    assert a == b == "acme.com/careers?job=7&team=eng"
+    assert posting_key("https://acme.com/careers?job=8") != a
+
+
+def test_company_name():
+    assert company_name("https://boards.greenhouse.io/acme-robotics/jobs/1") == "Acme Robotics"
+    assert company_name("https://jobs.lever.co/globex/abc") == "Globex"
+    assert company_name("https://careers.initech.com/jobs/1") == "Initech"
+    assert company_name("https://hooli.wd5.myworkdayjobs.com/en-US/jobs") == "Hooli"
+
+
+def test_render_letter_pdf_structure():
+    pdf = render_letter_pdf("Dear team,\n\nI build (reliable) systems.\\")
+    assert pdf.startswith(b"%PDF-1.4\n") and pdf.endswith(b"%%EOF\n")
+    assert b"(I build \\(reliable\\) systems.\\\\) Tj" in pdf
+    # Every xref offset points at its object
+    offsets = [int(m) for m in re.findall(rb"^(\d{10}) 00000 n $", pdf, re.M)]
+    for num, offset in enumerate(offsets, start=1):
+        assert pdf[offset:].startswith(f"{num} 0 obj".encode())
+    start = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    assert pdf[start:].startswith(b"xref")
+
+
+def test_render_letter_pdf_paginates():
+    pdf = render_letter_pdf("\n".join(f"Line {i}" for i in range(120)))
+    assert b"/Count 3" in pdf
+
+
+def test_letter_key_follows_posting_text():
+    user_id = uuid.UUID(int=1)
+    key = posting_key("https://boards.greenhouse.io/acme/jobs/123")
+    first = letter_r2_key(user_id, "a" * 64, key, posting_hash("Backend Engineer. Python, Postgres."))
+    assert first.startswith(f"cover-letters/{user_id}/aaaaaaaaaaaaaaaa-") and first.endswith(".pdf")
+    assert first == letter_r2_key(user_id, "a" * 64, key, posting_hash("Backend Engineer. Python, Postgres."))
+    # A rewritten posting gets a new letter rather than the one written for the old text
+    assert first != letter_r2_key(user_id, "a" * 64, key, posting_hash("Backend Engineer. Go, Kafka."))
@@ -0,0 +1,15 @@
+import os
+
+from bench.import_bench import DEFAULT_FORBID, sample, summarize
+
+# Cold `import app.main` (python -X importtime in fresh interpreters). The budget is loose so
+# slow CI machines pass; override with IMPORT_BUDGET_MS, or run bench.import_bench for detail.
+BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "2000"))
+
+
+def test_app_import_stays_lazy_and_within_budget():
+    sample("app.main")  # warms the filesystem cache
+    summary = summarize([sample("app.main") for _ in range(3)], "app.main")
+    eager = [package for package in DEFAULT_FORBID.split(",") if package in summary["imported"]]
+    assert eager == [], f"imported eagerly: {eager}"
+    assert summary["median_ms"] <= BUDGET_MS
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+from sqlalchemy import delete
+
+from app.services import kernel_callbacks
+
+# Postgres for the tests that store callbacks, e.g. postgresql://postgres@127.0.0.1/test
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+def test_disabled_without_secret(settings_env):
+    settings_env(KERNEL_CALLBACK_BASE_URL="https://api.example.com", KERNEL_CALLBACK_SECRET="")
+    assert not kernel_callbacks.enabled()
+    assert kernel_callbacks.verify_token("Bearer abc.def") is None
+
+
+def test_issued_token_verifies(settings_env):
+    settings_env(KERNEL_CALLBACK_BASE_URL="https://api.example.com/", KERNEL_CALLBACK_SECRET="s3cret")
+    key, callback = kernel_callbacks.new_callback(120)
+    assert callback["url"] == "https://api.example.com/kernel/callbacks"
+    assert kernel_callbacks.verify_token(f"Bearer {callback['token']}") == key
+
+
+def test_forged_or_malformed_tokens_are_rejected(settings_env):
+    settings_env(KERNEL_CALLBACK_BASE_URL="https://api.example.com", KERNEL_CALLBACK_SECRET="s3cret")
+    key, callback = kernel_callbacks.new_callback(120)
+    _, expires, signature = callback["token"].split(".")
+    later = int(expires) + 3600
+    for authorization in (
+        None,
+        "",
+        "Bearer ",
+        f"Bearer {key}",
+        f"Bearer {key}.{expires}.{'0' * 64}",
+        f"Bearer other.{expires}.{signature}",
+        f"Bearer {key}.{later}.{signature}",
+        f"Bearer {key}.{signature}",
+    ):
+        assert kernel_callbacks.verify_token(authorization) is None
+
+
+def test_expired_token_is_rejected(settings_env):
+    settings_env(KERNEL_CALLBACK_BASE_URL="https://api.example.com", KERNEL_CALLBACK_SECRET="s3cret")
+    _, callback = kernel_callbacks.new_callback(-kernel_callbacks.TOKEN_GRACE_S - 1)
+    assert kernel_callbacks.verify_token(f"Bearer {callback['token']}") is None
+
+
+def test_token_is_bound_to_the_secret(settings_env):
+    settings_env(KERNEL_CALLBACK_BASE_URL="https://api.example.com", KERNEL_CALLBACK_SECRET="s3cret")
+    _, callback = kernel_callbacks.new_callback(120)
+    settings_env(KERNEL_CALLBACK_SECRET="rotated")
+    assert kernel_callbacks.verify_token(f"Bearer {callback['token']}") is None
+
+
+def test_waiters_wake_one_or_all():
+    waiters = kernel_callbacks.CallbackWaiters()
+    a, b = waiters.register("inv-a"), waiters.register("inv-b")
+    waiters.wake("inv-a")
+    assert a.is_set() and not b.is_set()
+    waiters.wake("unknown")
+    a.clear()
+    waiters.wake(None)
+    assert a.is_set() and b.is_set()
+    waiters.discard("inv-a")
+    assert waiters.register("inv-a") is not a
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_callbacks_only_land_on_the_registered_invocation(settings_env):
+    # Valid tokens for other invocations, or for this one before it is registered, are refused;
+    # nothing can block the output the runner reads under the key it issued
+    settings_env(DATABASE_URL=TEST_DATABASE_URL, KERNEL_CALLBACK_SECRET="s3cret")
+
+    async def run():
+        from app.db import SessionLocal, dispose_engine, init_engine
+        from app.models import KernelCallback
+
+        invocation_id = f"inv-{uuid.uuid4()}"
+        try:
+            async with init_engine().begin() as conn:
+                await conn.run_sync(KernelCallback.__table__.create, checkfirst=True)
+            async with SessionLocal() as db:
+                early = await kernel_callbacks.record(db, invocation_id, "issued", {"status": "failed"})
+            await kernel_callbacks.register(invocation_id, "issued")
+            pending = await kernel_callbacks.fetch(invocation_id, "issued")
+            async with SessionLocal() as db:
+                accepted = [
+                    await kernel_callbacks.record(db, invocation_id, "other", {"status": "failed"}),
+                    await kernel_callbacks.record(db, invocation_id, "issued", {"status": "succeeded"}),
+                    await kernel_callbacks.record(db, invocation_id, "issued", {"status": "failed"}),
+                ]
+                await db.commit()
+            return early, pending, accepted, await kernel_callbacks.fetch(invocation_id, "issued")
+        finally:
+            async with SessionLocal() as db:
+                await db.execute(delete(KernelCallback).where(KernelCallback.invocation_id == invocation_id))
+                await db.commit()
+            await dispose_engine()
+
+    early, pending, accepted, output = asyncio.run(run())
+    assert early is False and pending is None
+    assert accepted == [False, True, True]
+    assert output == {"status": "succeeded"}
+
+
+def test_callback_status_is_kept():
+    from app.services.kernel_client import _from_callback
+
+    for status in ("succeeded", "failed", "cancelled"):
+        assert _from_callback({"status": status, "summary": "x"}, "inv")["status"] == status
+    assert _from_callback({"summary": "no status"}, "inv") == {
+        "status": "succeeded",
+        "result": {"summary": "no status"},
+        "invocation_id": "inv",
+    }
+
+
+def test_callback_body_is_capped(settings_env):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.routers.kernel import router
+
+    settings_env(KERNEL_CALLBACK_SECRET="s3cret", KERNEL_CALLBACK_MAX_BYTES="1024")
+    _, callback = kernel_callbacks.new_callback(120)
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {callback['token']}", "Content-Type": "application/json"}
+    # Refused before anything touches the database
+    resp = client.post("/kernel/callbacks/inv", content=b'{"notes": "' + b"x" * 2048 + b'"}', headers=headers)
+    assert resp.status_code == 413
+    assert client.post("/kernel/callbacks/inv", content=b"[1, 2]", headers=headers).status_code == 422
+    assert client.post("/kernel/callbacks/inv", content=b"{}", headers={}).status_code == 401
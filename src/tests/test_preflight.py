@@ -0,0 +1,132 @@
+import asyncio
+
+import httpx
+
+from app.services.preflight import PreflightChecker, closed_reason, public_address, visible_text
+
+OPEN_PAGE = "<html><body><h1>Backend Engineer</h1><p>Apply below.</p></body></html>"
+
+
+def _checker(handler, addresses=None):
+    # Checker over a mock transport; hosts resolve through `addresses` instead of DNS
+    addresses = addresses or {}
+    preflight = PreflightChecker()
+    preflight._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def resolve(host):
+        return addresses.get(host, ["93.184.215.14"])
+
+    preflight._resolve = resolve
+    return preflight
+
+
+def test_missing_postings_are_closed():
+    assert closed_reason(404, "https://jobs.example.com/1", "") == "HTTP 404"
+    assert closed_reason(410, "https://jobs.example.com/1", "") == "HTTP 410"
+
+
+def test_greenhouse_error_redirect_is_closed():
+    reason = closed_reason(200, "https://boards.greenhouse.io/acme?error=true", visible_text(OPEN_PAGE))
+    assert reason == "Redirected to job board error page"
+
+
+def test_closed_wording_on_page():
+    body = "<html><body><p>This job is no longer accepting applications.</p></body></html>"
+    reason = closed_reason(200, "https://jobs.example.com/1", visible_text(body))
+    assert reason == 'Posting says "no longer accepting applications"'
+
+
+def test_closed_wording_in_markup_only_is_ignored():
+    body = (
+        '<p>Backend Engineer</p><script>{"states": ["position has been filled"]}</script>'
+        "<template><p>This job is closed</p></template><!-- job has been removed -->"
+    )
+    assert closed_reason(200, "https://jobs.example.com/1", visible_text(body)) is None
+
+
+def test_open_posting_and_inconclusive_statuses_pass():
+    assert closed_reason(200, "https://jobs.example.com/1", visible_text(OPEN_PAGE)) is None
+    # Bot walls and server errors say nothing about the posting
+    assert closed_reason(403, "https://jobs.example.com/1", "position has been filled") is None
+    assert closed_reason(503, "https://jobs.example.com/1", "") is None
+
+
+def test_visible_text_drops_markup_and_scripts():
+    body = "<style>p{}</style><p>Senior&nbsp;Engineer</p><script>var x = 1;</script>\n<b>Remote</b>"
+    assert visible_text(body) == "Senior Engineer Remote"
+
+
+def test_fetch_errors_are_inconclusive():
+    def handler(request):
+        body = "<p>This job is closed</p>".encode()
+        return httpx.Response(200, content=body, headers={"content-type": "text/html; charset=bogus"})
+
+    async def run():
+        preflight = _checker(handler)
+        try:
+            invalid = await preflight._fetch("https://jobs\x00.example.com/1")
+            bogus_charset = await preflight._fetch("https://jobs.example.com/1")
+        finally:
+            await preflight.close()
+        return invalid, bogus_charset
+
+    invalid, bogus_charset = asyncio.run(run())
+    assert invalid.status_code is None and not invalid.closed
+    assert bogus_charset.closed and bogus_charset.reason == 'Posting says "This job is closed"'
+
+
+def test_public_address():
+    assert public_address("93.184.215.14") and public_address("2606:2800:21f:cb07:6820:80da:af6b:8b2c")
+    internal = ["127.0.0.1", "10.1.2.3", "172.16.0.1", "192.168.1.1", "169.254.169.254", "100.64.0.1", "0.0.0.0"]
+    internal += ["::1", "fe80::1%eth0", "fd00::1", "::ffff:127.0.0.1", "224.0.0.1"]
+    for address in internal:
+        assert not public_address(address), address
+
+
+def test_redirects_to_internal_hosts_are_refused():
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        if request.url.host == "jobs.example.com":
+            return httpx.Response(302, headers={"location": "http://127.0.0.1/admin"})
+        if request.url.host == "short.example.com":
+            return httpx.Response(301, headers={"location": "https://jobs.internal.example.com/1"})
+        return httpx.Response(200, content=OPEN_PAGE.encode(), headers={"content-type": "text/html"})
+
+    async def run():
+        preflight = _checker(handler, {"jobs.internal.example.com": ["93.184.215.14", "10.0.0.5"]})
+        try:
+            return [
+                await preflight._fetch(url)
+                for url in (
+                    "https://jobs.example.com/1",
+                    "https://short.example.com/1",
+                    "http://169.254.169.254/latest/meta-data/",
+                    "file:///etc/passwd",
+                )
+            ]
+        finally:
+            await preflight.close()
+
+    results = asyncio.run(run())
+    assert all(result.status_code is None and not result.closed and not result.text for result in results)
+    assert requested == ["https://jobs.example.com/1", "https://short.example.com/1"]
+
+
+def test_public_redirects_are_followed():
+    def handler(request):
+        if request.url.path == "/apply":
+            return httpx.Response(302, headers={"location": "/jobs/1"})
+        return httpx.Response(200, content=OPEN_PAGE.encode(), headers={"content-type": "text/html"})
+
+    async def run():
+        preflight = _checker(handler)
+        try:
+            return await preflight._fetch("https://jobs.example.com/apply")
+        finally:
+            await preflight.close()
+
+    result = asyncio.run(run())
+    assert result.status_code == 200 and result.final_url == "https://jobs.example.com/jobs/1"
+    assert result.text == "Backend Engineer Apply below."
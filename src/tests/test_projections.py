@@ -0,0 +1,68 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import JobStatus
+from app.routers.jobs import JOB_FIELDS
+from app.routers.resumes import RESUME_FIELDS
+from app.schemas import JobApplicationOut, ResumeOut
+from app.services.projections import parse_fields, rows_response
+
+NOW = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+
+
+def test_default_is_every_field():
+    assert parse_fields(None, RESUME_FIELDS) == list(RESUME_FIELDS)
+    assert "parsed_profile" in parse_fields("", RESUME_FIELDS)
+
+
+def test_sparse_fields_always_include_id():
+    assert parse_fields("file_name, created_at", RESUME_FIELDS) == ["id", "file_name", "created_at"]
+    assert parse_fields("created_at,id,created_at", RESUME_FIELDS) == ["id", "created_at"]
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as exc:
+        parse_fields("file_name,password", RESUME_FIELDS)
+    assert exc.value.status_code == 400
+    assert "password" in exc.value.detail
+
+
+def _encoded(names, row):
+    return json.loads(rows_response([row], names).body)[0]
+
+
+def test_default_resume_rows_match_the_response_model():
+    values = {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "r2_key": "resumes/a.pdf",
+        "file_name": "a.pdf",
+        "content_type": "application/pdf",
+        "parsed_profile": {"name": "Jane Doe", "skills": ["Python"]},
+        "created_at": NOW,
+        "updated_at": NOW,
+    }
+    row = tuple(values[name] for name in RESUME_FIELDS)
+    assert _encoded(RESUME_FIELDS, row) == json.loads(ResumeOut(**values).model_dump_json())
+
+
+def test_default_job_rows_match_the_response_model():
+    values = {name: None for name in JOB_FIELDS}
+    values.update(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        resume_id=uuid.uuid4(),
+        target_url="https://jobs.example.com/1",
+        status=JobStatus.succeeded,
+        priority=2,
+        deadline=NOW,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    row = tuple(values[name] for name in JOB_FIELDS)
+    expected = json.loads(JobApplicationOut(**{**values, "status": "succeeded"}).model_dump_json())
+    assert _encoded(JOB_FIELDS, row) == expected
@@ -0,0 +1,99 @@
+from app.services.resume_extract import extract_local, section_kind, split_sections
+from app.services.resume_parser import merge_profiles
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 (555) 123-4567 | linkedin.com/in/janedoe
+
+Summary
+Engineer who likes databases.
+
+Experience
+Senior Backend Engineer, Acme Corp  Jan 2021 - Present
+- Built the billing pipeline
+- Cut p99 latency by 40% across
+  the public API
+Globex - Software Engineer  2018 - 2020
+- Shipped search
+
+Education
+State University, BS Computer Science  2014 - 2018
+
+Skills
+Languages: Python, Go, SQL
+Tools: PostgreSQL | Kafka
+"""
+
+
+def test_section_kind_ignores_noise_and_body_lines():
+    assert section_kind("Work Experience:") == "experience"
+    assert section_kind("EDUCATION") == "education"
+    assert section_kind("Skills (cont'd)") == "skills"
+    assert section_kind("Built the billing pipeline for every customer") is None
+
+
+def test_split_sections_keeps_order_and_header():
+    kinds = [kind for kind, _ in split_sections(RESUME)]
+    assert kinds == ["contact", "summary", "experience", "education", "skills"]
+
+
+def test_extract_local_parses_well_formed_resume():
+    result = extract_local(RESUME)
+    assert result.complete
+    profile = result.profile
+    assert profile["name"] == "Jane Doe"
+    assert profile["email"] == "jane.doe@example.com"
+    assert profile["phone"] == "+1 (555) 123-4567"
+    assert profile["links"] == ["https://linkedin.com/in/janedoe"]
+    assert profile["experience"] == [
+        {
+            "company": "Acme Corp",
+            "title": "Senior Backend Engineer",
+            "start": "Jan 2021",
+            "end": None,
+            "bullets": ["Built the billing pipeline", "Cut p99 latency by 40% across the public API"],
+        },
+        {"company": "Globex", "title": "Software Engineer", "start": "2018", "end": "2020", "bullets": ["Shipped search"]},
+    ]
+    assert profile["education"] == [
+        {"school": "State University", "degree": "BS Computer Science", "start": "2014", "end": "2018"}
+    ]
+    assert profile["skills"] == ["Python", "Go", "SQL", "PostgreSQL", "Kafka"]
+
+
+def test_unrecognized_sections_are_left_for_the_model():
+    text = "Jane Doe\njane@example.com\n\nExperience\nI have worked at many places over the years.\n\nSkills\nPython, Go"
+    result = extract_local(text)
+    assert not result.complete
+    assert [kind for kind, _ in result.remaining] == ["experience"]
+    assert result.profile["skills"] == ["Python", "Go"]
+
+
+def test_ambiguous_title_and_company_are_left_for_the_model():
+    text = "Experience\nAcme, Globex  2019 - 2020\n"
+    assert [kind for kind, _ in extract_local(text).remaining] == ["experience"]
+
+
+def test_merge_profiles_first_scalar_wins_and_lists_dedupe():
+    job = {"company": "Acme", "title": "Engineer", "start": "2020", "bullets": ["a"]}
+    merged = merge_profiles(
+        [
+            ("contact", {"name": "Jane Doe", "email": "", "links": ["https://github.com/jane"]}),
+            ("contact", {"name": "Someone Else", "email": "jane@example.com"}),
+            ("experience", {"experience": [job]}),
+            # Overlapping chunk repeats the entry with different casing and bullets
+            ("experience", {"experience": [{**job, "company": "ACME ", "bullets": ["b"]}]}),
+            ("skills", {"skills": ["Python", "python", "Go"]}),
+        ]
+    )
+    assert merged["name"] == "Jane Doe"
+    assert merged["email"] == "jane@example.com"
+    assert merged["links"] == ["https://github.com/jane"]
+    assert merged["experience"] == [job]
+    assert merged["skills"] == ["Python", "Go"]
+    assert merged["education"] == []
+
+
+def test_merge_profiles_only_takes_fields_of_the_chunk_kind():
+    merged = merge_profiles([("skills", {"skills": ["SQL"], "name": "Not A Name"})])
+    assert merged["name"] is None
+    assert merged["skills"] == ["SQL"]
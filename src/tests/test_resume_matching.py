@@ -0,0 +1,69 @@
+import asyncio
+import uuid
+
+from app.services.resume_matching import ResumeMatrix, posting_vector, resume_vector
+
+BACKEND = {
+    "skills": ["Python", "PostgreSQL", "Kafka"],
+    "experience": [{"title": "Backend Engineer", "bullets": ["Built APIs in Python and Go"]}],
+}
+FRONTEND = {
+    "skills": ["React", "TypeScript", "CSS"],
+    "experience": [{"title": "Frontend Engineer", "bullets": ["Built design systems in React"]}],
+}
+
+
+def test_best_picks_the_closest_resume():
+    newest, older = uuid.uuid4(), uuid.uuid4()
+    matrix = ResumeMatrix.build([newest, older], [resume_vector(BACKEND), resume_vector(FRONTEND)])
+    postings = [
+        posting_vector("https://jobs.example.com/frontend-engineer-12", "React and TypeScript, CSS a plus"),
+        posting_vector("https://jobs.example.com/4012", "Python services on PostgreSQL and Kafka"),
+    ]
+    assert matrix.best(postings) == [older, newest]
+
+
+def test_ties_go_to_the_most_recent_resume():
+    newest, older = uuid.uuid4(), uuid.uuid4()
+    matrix = ResumeMatrix.build([newest, older], [resume_vector(BACKEND), resume_vector(FRONTEND)])
+    # Shares no terms with either resume
+    assert matrix.best([posting_vector("https://jobs.example.com/1", "Chef wanted for a busy kitchen")]) == [newest]
+    assert matrix.best([posting_vector("https://jobs.example.com/1")]) == [newest]
+
+
+def test_scores_are_cosine_similarities():
+    resume_id = uuid.uuid4()
+    other = uuid.uuid4()
+    vector = resume_vector(BACKEND)
+    matrix = ResumeMatrix.build([resume_id, other], [vector, resume_vector(FRONTEND)])
+    scores = matrix.scores([vector])
+    assert abs(float(scores[0, 0]) - 1.0) < 1e-5
+    assert 0.0 <= float(scores[0, 1]) < 1.0
+
+
+def test_single_resume_is_always_chosen():
+    resume_id = uuid.uuid4()
+    matrix = ResumeMatrix.build([resume_id], [resume_vector(BACKEND)])
+    assert matrix.best([posting_vector("https://x.com/a"), posting_vector("https://x.com/b")]) == [resume_id] * 2
+
+
+def test_inline_posting_fetches_are_capped(settings_env, monkeypatch):
+    from app.services import resume_matching
+    from app.services.preflight import PreflightResult
+
+    settings_env(RESUME_MATCH_MAX_FETCHES="2", PREFLIGHT_ENABLED="true")
+    fetched = []
+
+    async def check(url):
+        fetched.append(url)
+        return PreflightResult(url=url, final_url=url, text="Python services on PostgreSQL")
+
+    monkeypatch.setattr(resume_matching.checker, "check", check)
+    matcher = resume_matching.ResumeMatcher()
+    urls = [f"https://jobs.example.com/{i}" for i in range(5)]
+    vectors = asyncio.run(matcher._posting_vectors(urls))
+    assert fetched == urls[:2]
+    assert set(vectors) == set(urls)
+    # Unread postings are fetched by the next request that names them
+    asyncio.run(matcher._posting_vectors(urls))
+    assert fetched == urls[:4]
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from app.services.scheduler import JobScheduler, effective_deadline
+
+QUEUED_AT = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_without_deadline_uses_virtual_deadline(settings_env):
+    settings_env(SCHEDULER_SLACK_S="3600", SCHEDULER_PRIORITY_STEP_S="300")
+    assert effective_deadline(0, None, QUEUED_AT) == QUEUED_AT + timedelta(hours=1)
+
+
+def test_priority_moves_virtual_deadline_earlier(settings_env):
+    settings_env(SCHEDULER_SLACK_S="3600", SCHEDULER_PRIORITY_STEP_S="300")
+    assert effective_deadline(2, None, QUEUED_AT) == QUEUED_AT + timedelta(seconds=3000)
+    assert effective_deadline(-1, None, QUEUED_AT) == QUEUED_AT + timedelta(seconds=3900)
+
+
+def test_explicit_deadline_wins_when_earlier(settings_env):
+    settings_env(SCHEDULER_SLACK_S="3600", SCHEDULER_PRIORITY_STEP_S="300")
+    deadline = QUEUED_AT + timedelta(minutes=10)
+    assert effective_deadline(0, deadline, QUEUED_AT) == deadline
+    late = QUEUED_AT + timedelta(days=1)
+    assert effective_deadline(0, late, QUEUED_AT) == QUEUED_AT + timedelta(hours=1)
+
+
+def test_old_low_priority_job_outranks_new_urgent_job(settings_env):
+    settings_env(SCHEDULER_SLACK_S="3600", SCHEDULER_PRIORITY_STEP_S="300")
+    old = effective_deadline(0, None, QUEUED_AT)
+    new = effective_deadline(5, None, QUEUED_AT + timedelta(hours=1))
+    assert old < new
+
+
+def test_cancelled_run_is_held_until_it_finishes():
+    async def scenario():
+        release = asyncio.Event()
+        ran: List[str] = []
+
+        async def runner(job_id: str) -> None:
+            ran.append(job_id)
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                # Winding down: terminate the invocation, write the final status
+                await release.wait()
+                raise
+
+        sched = JobScheduler(runner)
+        await sched.start()
+        sched.submit("job-1")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert ran == ["job-1"]
+        sched.cancel("job-1")
+        await asyncio.sleep(0)
+        held_while_stopping = sched.holds("job-1")
+        release.set()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        held_after = sched.holds("job-1")
+        await sched.stop()
+        return held_while_stopping, held_after
+
+    assert asyncio.run(scenario()) == (True, False)
@@ -0,0 +1,58 @@
+import uuid
+
+from starlette.requests import Request
+
+from app.services.version_cache import VersionCache, etag_matches, weak_etag
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etag_matches():
+    etag = weak_etag("job", "abc")
+    assert etag == 'W/"job-abc"'
+    assert not etag_matches(_request(), etag)
+    assert etag_matches(_request(etag), etag)
+    # Strong form of the same tag, lists and wildcard
+    assert etag_matches(_request('"job-abc"'), etag)
+    assert etag_matches(_request('W/"job-old", W/"job-abc"'), etag)
+    assert etag_matches(_request("*"), etag)
+    assert not etag_matches(_request('W/"job-old"'), etag)
+
+
+def test_cache_is_scoped_to_the_owner():
+    cache = VersionCache()
+    row, owner = uuid.uuid4(), uuid.uuid4()
+    cache.remember("job", row, owner, "v1")
+    assert cache.get("job", row, owner) == "v1"
+    assert cache.get("job", row, uuid.uuid4()) is None
+    assert cache.get("resume", row, owner) is None
+
+
+def test_invalidate_one_entry():
+    cache = VersionCache()
+    owner, a, b = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    cache.remember("job", a, owner, "v1")
+    cache.remember("job", b, owner, "v1")
+    cache.invalidate(f"job:{a}")
+    assert cache.get("job", a, owner) is None
+    assert cache.get("job", b, owner) == "v1"
+
+
+def test_invalidate_without_a_valid_id_clears_everything():
+    for payload in (None, "", "job:not-a-uuid"):
+        cache = VersionCache()
+        owner, row = uuid.uuid4(), uuid.uuid4()
+        cache.remember("job", row, owner, "v1")
+        cache.invalidate(payload)
+        assert cache.get("job", row, owner) is None
+
+
+def test_entries_expire(settings_env):
+    settings_env(VERSION_CACHE_TTL_S="0")
+    cache = VersionCache()
+    owner, row = uuid.uuid4(), uuid.uuid4()
+    cache.remember("job", row, owner, "v1")
+    assert cache.get("job", row, owner) is None